@@ -0,0 +1,246 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+import bundle
+import constants
+
+# формат экрана: глубина цвета и маски каналов (None - окна нет)
+DisplayFormat = Optional[Tuple[int, Tuple[int, int, int, int]]]
+# ключ кэша: имя файла, цвет фона, целевой размер
+CacheKey = Tuple[str, Optional[int], Optional[Tuple[int, int]]]
+# ключ поверхности: ключ кэша и формат экрана, в который она переведена
+SurfaceKey = Tuple[str, Optional[int], Optional[Tuple[int, int]],
+                   DisplayFormat]
+
+
+class AssetCache:
+    """
+    Общий для всего процесса кэш изображений и звуков.
+        Хранит декодированные и преобразованные в формат экрана поверхности,
+        их масштабированные варианты и маски. Одна и та же поверхность
+        (и маска) отдается всем спрайтам, поэтому рисовать на полученных
+        поверхностях нельзя. Звуки загружаются при первом обращении,
+        тогда же инициализируется микшер. Поверхности хранятся вместе
+        с форматом экрана, в который они переведены: изображения,
+        загруженные до открытия окна (или в другом режиме), после смены
+        режима один раз загружаются заново. Если собран пакет ресурсов,
+        изображения (в том числе масштабированные) и звуки берутся
+        из него, иначе декодируются из исходных файлов.
+        Свойства:
+    bundle: Optional[bundle.Bundle] - пакет ресурсов, открывается при промахе
+    bundle_path: str
+    hits: int
+    misses: int
+    masks: Dict[CacheKey, pygame.mask.Mask]
+    path: str
+    sound_path: str
+    sounds: Dict[str, pygame.mixer.Sound]
+    surfaces: Dict[SurfaceKey, pygame.Surface]
+        Методы:
+    clear - очищает кэш и статистику
+    display_format - возвращает формат текущего экрана
+    get_image - возвращает поверхность из кэша (при промахе загружает файл)
+    get_mask - возвращает маску поверхности из кэша
+    get_sound - возвращает звук из кэша (при промахе загружает файл)
+    preload - заранее загружает изображения в кэш
+    stats - возвращает статистику попаданий в кэш
+    """
+
+    def __init__(self, path: str = constants.IMAGES_PATH,
+                 sound_path: str = constants.MUSIC_PATH,
+                 bundle_path: str = constants.BUNDLE_PATH) -> None:
+        """
+        :param path: str - каталог с изображениями
+        :param sound_path: str - каталог со звуками
+        :param bundle_path: str - файл пакета ресурсов
+        """
+        self.path: str = path
+        self.sound_path: str = sound_path
+        self.bundle_path: str = bundle_path
+        self._bundle: Optional[bundle.Bundle] = None
+        self._is_bundle_opened: bool = False
+        self.surfaces: Dict[SurfaceKey, pygame.Surface] = {}
+        self.masks: Dict[CacheKey, pygame.mask.Mask] = {}
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def bundle(self) -> Optional[bundle.Bundle]:
+        """
+        Возвращает пакет ресурсов, при первом обращении отображает его в память
+        :return Optional[bundle.Bundle]: None, если пакет не собран
+        """
+        if not self._is_bundle_opened:
+            self._bundle = bundle.Bundle.open(self.bundle_path)
+            self._is_bundle_opened = True
+        return self._bundle
+
+    @staticmethod
+    def display_format() -> DisplayFormat:
+        """
+        Возвращает формат экрана, в который переводятся изображения
+        :return DisplayFormat: None, если окно не открыто
+        """
+        surface = pygame.display.get_surface()
+        if surface is None:
+            return None
+        return surface.get_bitsize(), surface.get_masks()
+
+    def _decode(self, name: str, color_key: Optional[int]) -> pygame.Surface:
+        """
+        Читает файл с диска и преобразует его в формат экрана
+        :param name: str
+        :param color_key: int
+        :return image: pygame.Surface
+        """
+        fullname: str = os.path.join(self.path, name)
+        try:
+            image = pygame.image.load(fullname)
+        except pygame.error as message:
+            print('Cannot load image:', name)
+            raise SystemExit(message)
+        except FileNotFoundError as message:
+            print('Cannot found file:', name)
+            raise SystemExit(message)
+        return self._prepare(image, color_key)
+
+    @staticmethod
+    def _prepare(image: pygame.Surface,
+                 color_key: Optional[int]) -> pygame.Surface:
+        """
+        Преобразует изображение в формат экрана и задает цвет фона.
+            Без открытого окна (headless-движок) изображение остается
+            в исходном формате
+        :param image: pygame.Surface
+        :param color_key: int
+        :return image: pygame.Surface
+        """
+        is_display = pygame.display.get_surface() is not None
+        if is_display:
+            image = image.convert()
+        if color_key is not None:
+            if color_key == -1:
+                color_key = image.get_at((0, 0))
+            image.set_colorkey(color_key)
+        elif is_display:
+            image = image.convert_alpha()
+        return image
+
+    def clear(self) -> None:
+        """
+        Очищает кэш и статистику (например, при смене режима экрана)
+        :return None:
+        """
+        self.surfaces.clear()
+        self.masks.clear()
+        # пакет перечитывается: его могли пересобрать
+        self._bundle = None
+        self._is_bundle_opened = False
+        self.sounds.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_image(self, name: str, color_key: int = None,
+                  size: Tuple[int, int] = None) -> pygame.Surface:
+        """
+        Возвращает поверхность по ключу (имя, цвет фона, размер)
+            в формате текущего экрана.
+            Масштабированный вариант строится из закэшированного оригинала
+        :param name: str
+        :param color_key: int
+        :param size: Tuple[int, int]
+        :return image: pygame.Surface
+        """
+        key: SurfaceKey = (name, color_key, size, self.display_format())
+        image = self.surfaces.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        packed = self.bundle.image(name, size) if self.bundle else None
+        if packed is not None:
+            image = self._prepare(packed, color_key)
+        elif size is None:
+            image = self._decode(name, color_key)
+        else:
+            image = pygame.transform.scale(self.get_image(name, color_key),
+                                           size)
+        self.surfaces[key] = image
+        return image
+
+    def get_mask(self, name: str, color_key: int = None,
+                 size: Tuple[int, int] = None) -> pygame.mask.Mask:
+        """
+        Возвращает общую маску для поверхности с тем же ключом
+        :param name: str
+        :param color_key: int
+        :param size: Tuple[int, int]
+        :return mask: pygame.mask.Mask
+        """
+        key: CacheKey = (name, color_key, size)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(
+                self.get_image(name, color_key, size))
+            self.masks[key] = mask
+        return mask
+
+    def get_sound(self, name: str,
+                  volume: Optional[float] = None) -> pygame.mixer.Sound:
+        """
+        Возвращает звук, при первом обращении инициализирует микшер
+            и загружает файл
+        :param name: str
+        :param volume: Optional[float] - громкость, задается при загрузке
+        :return sound: pygame.mixer.Sound
+        """
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        sound = self.bundle.sound(name) if self.bundle else None
+        if sound is None:
+            sound = pygame.mixer.Sound(os.path.join(self.sound_path, name))
+        if volume is not None:
+            sound.set_volume(volume)
+        self.sounds[name] = sound
+        return sound
+
+    def preload(self, names, color_key: int = None,
+                size: Tuple[int, int] = None) -> None:
+        """
+        Заранее загружает изображения, чтобы игровой цикл не обращался к диску.
+            Уже загруженные изображения не учитываются в статистике
+        :param names: Iterable[str]
+        :param color_key: int
+        :param size: Tuple[int, int]
+        :return None:
+        """
+        display_format = self.display_format()
+        for name in names:
+            if (name, color_key, size, display_format) not in self.surfaces:
+                self.get_image(name, color_key, size)
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику работы кэша (пакет при этом не открывается)
+        :return dict:
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.surfaces),
+            'bundled': self._bundle.hits if self._bundle else 0,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+# общий кэш изображений процесса
+cache = AssetCache()
@@ -0,0 +1,530 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import pygame
+
+import constants
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SpatialHash:
+    """
+    Равномерная сетка с ячейками размером с клетку игрового поля.
+        Спрайт заносится во все ячейки, которые задевает его rect,
+        расширенный на margin, поэтому запрос проверяет только ячейки
+        самого прямоугольника и находит спрайты, успевшие сдвинуться
+        не дальше margin с момента заполнения сетки.
+        Свойства:
+    cells: Dict[Tuple[int, int], List[pygame.sprite.Sprite]]
+    margin: Tuple[int, int]
+        Методы:
+    clear - очищает сетку
+    insert - добавляет спрайт в сетку
+    query - возвращает спрайты, пересекающиеся с прямоугольником
+    rebuild - заполняет сетку заново
+    """
+
+    def __init__(self, margin: Tuple[int, int] = (constants.tile_width,
+                                                  constants.tile_height)
+                 ) -> None:
+        """
+        :param margin: Tuple[int, int] - допустимый сдвиг спрайта по x и y
+        """
+        self.cells: Dict[Tuple[int, int], List[pygame.sprite.Sprite]] = {}
+        self.margin: Tuple[int, int] = margin
+
+    @staticmethod
+    def _keys(rect: pygame.Rect) -> Iterable[Tuple[int, int]]:
+        """
+        Возвращает ключи ячеек, которые задевает прямоугольник
+        :param rect: pygame.Rect
+        :return Iterable[Tuple[int, int]]:
+        """
+        for col in range(rect.left // constants.tile_width,
+                         (rect.right - 1) // constants.tile_width + 1):
+            for row in range(rect.top // constants.tile_height,
+                             (rect.bottom - 1) // constants.tile_height + 1):
+                yield col, row
+
+    def clear(self) -> None:
+        """
+        Очищает сетку
+        :return None:
+        """
+        self.cells.clear()
+
+    def insert(self, sprite: pygame.sprite.Sprite) -> None:
+        """
+        Добавляет спрайт во все ячейки его расширенного прямоугольника
+        :param sprite: pygame.sprite.Sprite
+        :return None:
+        """
+        area = sprite.rect.inflate(2 * self.margin[0], 2 * self.margin[1])
+        for key in self._keys(area):
+            self.cells.setdefault(key, []).append(sprite)
+
+    def query(self, rect: pygame.Rect) -> List[pygame.sprite.Sprite]:
+        """
+        Возвращает живые спрайты, пересекающиеся с прямоугольником
+        :param rect: pygame.Rect
+        :return List[pygame.sprite.Sprite]:
+        """
+        found = {}
+        for key in self._keys(rect):
+            for sprite in self.cells.get(key, ()):
+                if sprite.rect.colliderect(rect) and sprite.alive():
+                    found[sprite] = None
+        return list(found)
+
+    def rebuild(self, sprites: Iterable[pygame.sprite.Sprite]) -> None:
+        """
+        Заполняет сетку заново
+        :param sprites: Iterable[pygame.sprite.Sprite]
+        :return None:
+        """
+        self.cells.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+
+class TileIndex:
+    """
+    Индекс коробок для запросов соседей вместо spritecollide по всем спрайтам.
+        Лежащие коробки хранятся в сетке, которая пересобирается только
+        при смене версии игрового поля, падающие - в сетке, которая
+        пересобирается каждый кадр. Результаты запросов упорядочены так же,
+        как коробки в tiles_group (по порядку создания).
+        Методы:
+    collide - возвращает коробки, пересекающиеся с прямоугольником
+    update - обновляет сетки перед обработкой кадра
+    """
+
+    def __init__(self) -> None:
+        self.settled: SpatialHash = SpatialHash()
+        self.falling: SpatialHash = SpatialHash()
+        self.version: Optional[int] = None
+
+    def collide(self, rect: pygame.Rect) -> List[pygame.sprite.Sprite]:
+        """
+        Возвращает коробки, пересекающиеся с прямоугольником
+        :param rect: pygame.Rect
+        :return List[pygame.sprite.Sprite]:
+        """
+        found = self.settled.query(rect)
+        found.extend(tile for tile in self.falling.query(rect)
+                     if tile not in found)
+        found.sort(key=lambda tile: tile.serial)
+        return found
+
+    def update(self, tiles: Iterable[pygame.sprite.Sprite],
+               falling: Iterable[pygame.sprite.Sprite], version: int) -> None:
+        """
+        Обновляет сетки: лежащие коробки - при смене версии поля,
+            падающие - всегда
+        :param tiles: Iterable[pygame.sprite.Sprite] - все коробки
+        :param falling: Iterable[pygame.sprite.Sprite] - падающие коробки
+        :param version: int - версия игрового поля
+        :return None:
+        """
+        if version != self.version:
+            self.settled.rebuild(tile for tile in tiles if not tile.is_in_air)
+            self.version = version
+        self.falling.rebuild(falling)
+
+
+class Board:
+    """
+    Игровое поле: сетка клеток с лежащими коробками.
+        Вместе с сеткой поддерживает высоты столбцов, счетчики заполнения
+        строк и индекс коробок, поэтому запросы героя и коробок не
+        перебирают все спрайты, а заполненные строки и выход за верхнюю
+        границу отмечаются в момент записи в клетку.
+        Свойства:
+    cells: Deque[List[Union[int, pygame.sprite.Sprite]]] - строки поля сверху вниз
+    full_rows: List[int] - заполненные строки, ожидающие удаления
+    heights: List[int] - верхняя занятая строка каждого столбца
+                         (rows, если столбец пуст)
+    index: TileIndex
+    is_overflow: bool - коробки дошли до строки overflow_row
+    overflow_row: int
+    row_fill: Deque[int] - количество коробок в каждой строке
+    version: int - меняется при каждом изменении лежащих коробок
+        Методы:
+    clear_rows - удаляет заполненные строки со смещением коробок
+    place - кладет коробку в клетку
+    remove - освобождает клетку
+    surface_y - возвращает верхнюю границу столбца коробок в пикселях
+    tile - возвращает коробку клетки
+    touch - отмечает изменение лежащих коробок
+    """
+
+    def __init__(self, rows: int = constants.ROWS,
+                 columns: int = constants.COLUMNS,
+                 overflow_row: int = constants.OVERFLOW_ROW) -> None:
+        """
+        :param rows: int
+        :param columns: int
+        :param overflow_row: int - строка, заполнение которой
+                                   означает конец игры
+        """
+        self.rows: int = rows
+        self.columns: int = columns
+        self.overflow_row: int = overflow_row
+        self.cells: Deque[List[Union[int, pygame.sprite.Sprite]]] = deque(
+            [0] * columns for _ in range(rows))
+        self.full_rows: List[int] = []
+        self.heights: List[int] = [rows] * columns
+        self.index: TileIndex = TileIndex()
+        self.is_overflow: bool = False
+        self.row_fill: Deque[int] = deque([0] * rows)
+        self.version: int = 0
+
+    def __getitem__(self, row: int) -> List[Union[int, pygame.sprite.Sprite]]:
+        return self.cells[row]
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _update_height(self, col: int) -> None:
+        """
+        Пересчитывает высоту столбца
+        :param col: int
+        :return None:
+        """
+        for row in range(self.rows):
+            if self.cells[row][col]:
+                self.heights[col] = row
+                return
+        self.heights[col] = self.rows
+
+    def clear_rows(self, rows: Iterable[int]) -> List[pygame.sprite.Sprite]:
+        """
+        Удаляет строки за один проход: строки выбрасываются из очереди,
+            сверху добавляются пустые, а каждая коробка выше удаленных
+            строк один раз переносится на свое новое место
+        :param rows: Iterable[int]
+        :return List[pygame.sprite.Sprite]: коробки из удаленных строк
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return []
+        removed = [tile for row in rows for tile in self.cells[row] if tile]
+        for row in reversed(rows):
+            del self.cells[row]
+            del self.row_fill[row]
+        for _ in rows:
+            self.cells.appendleft([0] * self.columns)
+            self.row_fill.appendleft(0)
+        # ниже последней удаленной строки ничего не сдвигается
+        for r in range(rows[-1] + 1):
+            for tile in self.cells[r]:
+                if tile:
+                    tile.row = r
+                    tile.rect.y = constants.tile_height * (r + 1) - \
+                        constants.DOWN_BORDER
+        for col in range(self.columns):
+            self._update_height(col)
+        self.full_rows = []
+        self.is_overflow = self.row_fill[self.overflow_row] > 0
+        self.touch()
+        return removed
+
+    def place(self, row: int, col: int, tile: pygame.sprite.Sprite) -> None:
+        """
+        Кладет коробку в клетку
+        :param row: int
+        :param col: int
+        :param tile: pygame.sprite.Sprite
+        :return None:
+        """
+        if not self.cells[row][col]:
+            self.row_fill[row] += 1
+            if self.row_fill[row] == self.columns:
+                self.full_rows.append(row)
+                self.full_rows.sort()
+            if row == self.overflow_row:
+                self.is_overflow = True
+        self.cells[row][col] = tile
+        if row < self.heights[col]:
+            self.heights[col] = row
+        self.touch()
+
+    def remove(self, row: int, col: int) -> None:
+        """
+        Освобождает клетку
+        :param row: int
+        :param col: int
+        :return None:
+        """
+        if self.cells[row][col]:
+            if self.row_fill[row] == self.columns:
+                self.full_rows.remove(row)
+            self.row_fill[row] -= 1
+            if row == self.overflow_row:
+                self.is_overflow = self.row_fill[row] > 0
+        self.cells[row][col] = 0
+        if self.heights[col] == row:
+            self._update_height(col)
+        self.touch()
+
+    def surface_y(self, col: int) -> Optional[int]:
+        """
+        Возвращает верхнюю границу столбца лежащих коробок в пикселях
+        :param col: int
+        :return Optional[int]: None, если столбец пуст или вне поля
+        """
+        if not 0 <= col < self.columns or self.heights[col] >= self.rows:
+            return None
+        return constants.tile_height * (self.heights[col] + 1) - \
+            constants.DOWN_BORDER
+
+    def tile(self, row: int, col: int) -> Optional[pygame.sprite.Sprite]:
+        """
+        Возвращает коробку клетки
+        :param row: int
+        :param col: int
+        :return Optional[pygame.sprite.Sprite]: None, если клетка пуста
+        """
+        return self.cells[row][col] or None
+
+    def touch(self) -> None:
+        """
+        Отмечает изменение лежащих коробок (слой и индекс будут пересобраны)
+        :return None:
+        """
+        self.version += 1
+
+
+class ArrayBoard:
+    """
+    Игровое поле на массивах numpy с тем же интерфейсом, что у Board.
+        Клетки хранятся двумя массивами: занятость (int8) и номер коробки
+        (int32, 0 - пусто), сами коробки ищутся по номеру в словаре только
+        там, где они нужны. Номера выдает само поле, а освобожденные
+        номера выдаются снова, поэтому они не превышают числа клеток
+        и не переполняют int32 при сколь угодно долгой симуляции. Заполненные строки, высоты столбцов и выход
+        за строку overflow_row считаются одной операцией над массивом
+        после изменения клеток, удаление строк сдвигает массивы целиком.
+        Рассчитано на большие поля и пакетную симуляцию без окна.
+        Свойства:
+    full_rows: List[int] - заполненные строки, ожидающие удаления
+    heights: List[int] - верхняя занятая строка каждого столбца
+                         (rows, если столбец пуст)
+    ids: numpy.ndarray - номера коробок в клетках (rows x columns, int32)
+    index: TileIndex
+    is_overflow: bool - коробки дошли до строки overflow_row
+    occupied: numpy.ndarray - занятость клеток (rows x columns, int8)
+    overflow_row: int
+    row_fill: List[int] - количество коробок в каждой строке
+    tiles: Dict[int, pygame.sprite.Sprite] - коробки по номеру
+    version: int - меняется при каждом изменении лежащих коробок
+        Методы:
+    clear_rows - удаляет заполненные строки со смещением коробок
+    place - кладет коробку в клетку
+    remove - освобождает клетку
+    surface_y - возвращает верхнюю границу столбца коробок в пикселях
+    tile - возвращает коробку клетки
+    touch - отмечает изменение лежащих коробок
+    """
+
+    def __init__(self, rows: int = constants.ROWS,
+                 columns: int = constants.COLUMNS,
+                 overflow_row: int = constants.OVERFLOW_ROW) -> None:
+        """
+        :param rows: int
+        :param columns: int
+        :param overflow_row: int - строка, заполнение которой
+                                   означает конец игры
+        """
+        self.rows: int = rows
+        self.columns: int = columns
+        self.overflow_row: int = overflow_row
+        self.occupied: 'numpy.ndarray' = numpy.zeros((rows, columns),
+                                                     numpy.int8)
+        self.ids: 'numpy.ndarray' = numpy.zeros((rows, columns), numpy.int32)
+        self.tiles: Dict[int, pygame.sprite.Sprite] = {}
+        self.index: TileIndex = TileIndex()
+        self.version: int = 0
+        self._free_ids: List[int] = []
+        self._last_id: int = 0
+        # производные величины пересчитываются после изменения клеток,
+        # а не при каждом touch (сдвинутые коробки трогают поле каждый кадр)
+        self._is_changed: bool = False
+        self._full_rows: List[int] = []
+        self._heights: List[int] = [rows] * columns
+        self._is_overflow: bool = False
+
+    def __getitem__(self, row: int) -> 'numpy.ndarray':
+        return self.occupied[row]
+
+    def __iter__(self):
+        return iter(self.occupied)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _refresh(self) -> None:
+        """
+        Пересчитывает заполненные строки, высоты столбцов и выход
+            за верхнюю границу, если клетки менялись
+        :return None:
+        """
+        if not self._is_changed:
+            return
+        occupied = self.occupied.astype(bool)
+        self._full_rows = numpy.flatnonzero(occupied.all(axis=1)).tolist()
+        self._heights = numpy.where(occupied.any(axis=0),
+                                    occupied.argmax(axis=0),
+                                    self.rows).tolist()
+        self._is_overflow = bool(occupied[self.overflow_row].any())
+        self._is_changed = False
+
+    def _allocate_id(self) -> int:
+        """
+        Выдает номер для новой коробки, сначала из освобожденных
+        :return int:
+        """
+        if self._free_ids:
+            return self._free_ids.pop()
+        self._last_id += 1
+        return self._last_id
+
+    def _release_id(self, id_: int) -> None:
+        """
+        Забывает коробку с номером id_ и возвращает номер в запас
+            (0 - пустая клетка - пропускается)
+        :param id_: int
+        :return None:
+        """
+        if self.tiles.pop(id_, None) is not None:
+            self._free_ids.append(id_)
+
+    @property
+    def full_rows(self) -> List[int]:
+        self._refresh()
+        return self._full_rows
+
+    @property
+    def heights(self) -> List[int]:
+        self._refresh()
+        return self._heights
+
+    @property
+    def is_overflow(self) -> bool:
+        self._refresh()
+        return self._is_overflow
+
+    @property
+    def row_fill(self) -> List[int]:
+        return self.occupied.sum(axis=1).tolist()
+
+    def clear_rows(self, rows: Iterable[int]) -> List[pygame.sprite.Sprite]:
+        """
+        Удаляет строки: оставшиеся строки сдвигаются вниз одним
+            копированием массивов, затем коробкам выше последней
+            удаленной строки записываются новые координаты
+        :param rows: Iterable[int]
+        :return List[pygame.sprite.Sprite]: коробки из удаленных строк
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return []
+        removed_ids = self.ids[rows]
+        removed_ids = removed_ids[removed_ids != 0].tolist()
+        removed = [self.tiles[id_] for id_ in removed_ids]
+        for id_ in removed_ids:
+            self._release_id(id_)
+        keep = numpy.ones(self.rows, bool)
+        keep[rows] = False
+        for cells in (self.occupied, self.ids):
+            cells[len(rows):] = cells[keep]
+            cells[:len(rows)] = 0
+        # ниже последней удаленной строки ничего не сдвигается
+        moved_rows, moved_cols = numpy.nonzero(self.ids[:rows[-1] + 1])
+        for r, c in zip(moved_rows.tolist(), moved_cols.tolist()):
+            tile = self.tiles[int(self.ids[r, c])]
+            tile.row = r
+            tile.rect.y = constants.tile_height * (r + 1) - \
+                constants.DOWN_BORDER
+        self._is_changed = True
+        self.touch()
+        return removed
+
+    def place(self, row: int, col: int, tile: pygame.sprite.Sprite) -> None:
+        """
+        Кладет коробку в клетку
+        :param row: int
+        :param col: int
+        :param tile: pygame.sprite.Sprite
+        :return None:
+        """
+        self._release_id(int(self.ids[row, col]))
+        id_ = self._allocate_id()
+        self.occupied[row, col] = 1
+        self.ids[row, col] = id_
+        self.tiles[id_] = tile
+        self._is_changed = True
+        self.touch()
+
+    def remove(self, row: int, col: int) -> None:
+        """
+        Освобождает клетку
+        :param row: int
+        :param col: int
+        :return None:
+        """
+        self._release_id(int(self.ids[row, col]))
+        self.occupied[row, col] = 0
+        self.ids[row, col] = 0
+        self._is_changed = True
+        self.touch()
+
+    def surface_y(self, col: int) -> Optional[int]:
+        """
+        Возвращает верхнюю границу столбца лежащих коробок в пикселях
+        :param col: int
+        :return Optional[int]: None, если столбец пуст или вне поля
+        """
+        if not 0 <= col < self.columns or self.heights[col] >= self.rows:
+            return None
+        return constants.tile_height * (self.heights[col] + 1) - \
+            constants.DOWN_BORDER
+
+    def tile(self, row: int, col: int) -> Optional[pygame.sprite.Sprite]:
+        """
+        Возвращает коробку клетки по ее номеру
+        :param row: int
+        :param col: int
+        :return Optional[pygame.sprite.Sprite]: None, если клетка пуста
+        """
+        return self.tiles.get(int(self.ids[row, col]))
+
+    def touch(self) -> None:
+        """
+        Отмечает изменение лежащих коробок (слой и индекс будут пересобраны)
+        :return None:
+        """
+        self.version += 1
+
+
+def create(rows: int = constants.ROWS, columns: int = constants.COLUMNS,
+           overflow_row: int = constants.OVERFLOW_ROW
+           ) -> Union[Board, ArrayBoard]:
+    """
+    Создает игровое поле выбранного в constants.BOARD_BACKEND устройства.
+        Если numpy не установлен, используется поле на списках
+    :param rows: int
+    :param columns: int
+    :param overflow_row: int
+    :return Union[Board, ArrayBoard]:
+    """
+    if constants.BOARD_BACKEND == 'numpy' and numpy is not None:
+        return ArrayBoard(rows, columns, overflow_row)
+    return Board(rows, columns, overflow_row)
@@ -0,0 +1,234 @@
+"""
+Пакет ресурсов: заранее декодированные (и масштабированные) изображения
+    и звуки в одном файле, который игра отображает в память.
+    Сборка пакета: python bundle.py
+"""
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+
+import constants
+
+MAGIC = b'PBOX'
+VERSION = 1
+# заголовок: сигнатура, версия, длина оглавления
+HEADER = struct.Struct('<4sHI')
+# начало каждого буфера выравнивается по этой границе
+ALIGN = 16
+
+
+class Bundle:
+    """
+    Отображенный в память пакет ресурсов.
+        Поверхности создаются прямо поверх буферов пакета, без чтения
+        и распаковки файлов. При открытом окне кэш ресурсов один раз
+        переводит такую поверхность в формат экрана (это копия буфера),
+        без окна она остается поверх пакета. Запись идет в закрытое
+        отображение (копирование при записи), поэтому файл пакета
+        не меняется.
+        Запись пакета устаревает, если исходный файл изменился
+        (другие размер или время изменения), тогда ресурс
+        загружается из исходного файла.
+        Свойства:
+    hits: int - сколько ресурсов отдано из пакета
+    images: Dict[Tuple[str, int, int], dict] - записи изображений
+    path: str
+    sounds: Dict[str, dict] - записи звуков
+    sources: Dict[str, Tuple[int, int]] - размер и время исходных файлов
+    stale: int - сколько запросов пришлось на устаревшие записи
+        Методы:
+    image - возвращает поверхность из пакета
+    open - открывает пакет, если он есть
+    sound - возвращает звук из пакета
+    """
+
+    def __init__(self, path: str, index: dict, data: mmap.mmap) -> None:
+        """
+        :param path: str
+        :param index: dict - оглавление пакета
+        :param data: mmap.mmap - отображение файла пакета
+        """
+        self.path: str = path
+        self.sources: Dict[str, Tuple[int, int]] = {
+            name: tuple(stat) for name, stat in index['sources'].items()}
+        self.images: Dict[Tuple[str, int, int], dict] = {
+            (entry['name'], *entry['size']): entry
+            for entry in index['images']}
+        self.sounds: Dict[str, dict] = {
+            entry['name']: entry for entry in index['sounds']}
+        self.hits: int = 0
+        self.stale: int = 0
+        # исходные размеры изображений: запрос без размера отдает оригинал
+        self._native: Dict[str, Tuple[int, int]] = {
+            entry['name']: tuple(entry['size'])
+            for entry in index['images'] if entry['native']}
+        self._data: mmap.mmap = data
+        self._view: memoryview = memoryview(data)[index['base']:]
+
+    @classmethod
+    def open(cls, path: str = constants.BUNDLE_PATH) -> Optional['Bundle']:
+        """
+        Отображает пакет в память
+        :param path: str
+        :return Optional[Bundle]: None, если пакета нет или он другой версии
+        """
+        try:
+            with open(path, 'rb') as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, version, size = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(version)
+            index = json.loads(bytes(data[HEADER.size:HEADER.size + size]))
+            # буферы начинаются с выровненной границы после оглавления
+            index['base'] = HEADER.size + size + -(HEADER.size + size) % ALIGN
+        except (struct.error, ValueError):
+            print('Asset bundle is outdated, rebuild it:', path)
+            data.close()
+            return None
+        return cls(path, index, data)
+
+    def _is_fresh(self, source: str) -> bool:
+        """
+        Проверяет, что исходный файл не менялся после сборки пакета
+        :param source: str - путь к исходному файлу
+        :return bool:
+        """
+        try:
+            fresh = self.sources.get(source) == _stat(source)
+        except OSError:
+            fresh = False
+        if not fresh:
+            self.stale += 1
+        return fresh
+
+    def image(self, name: str,
+              size: Tuple[int, int] = None) -> Optional[pygame.Surface]:
+        """
+        Возвращает поверхность поверх буфера пакета
+            (в формате исходного файла, без преобразования в формат экрана)
+        :param name: str
+        :param size: Tuple[int, int] - размер, по умолчанию исходный
+        :return Optional[pygame.Surface]: None, если записи нет или она устарела
+        """
+        if size is None:
+            size = self._native.get(name)
+        entry = self.images.get((name, *size)) if size else None
+        if entry is None or not self._is_fresh(entry['source']):
+            return None
+        self.hits += 1
+        offset = entry['offset']
+        return pygame.image.frombuffer(
+            self._view[offset:offset + entry['length']], tuple(size),
+            entry['format'])
+
+    def sound(self, name: str) -> Optional[pygame.mixer.Sound]:
+        """
+        Возвращает звук из декодированных отсчетов пакета.
+            Отсчеты подходят только микшеру с теми же параметрами,
+            что и при сборке
+        :param name: str
+        :return Optional[pygame.mixer.Sound]: None, если записи нет,
+            она устарела или микшер настроен иначе
+        """
+        entry = self.sounds.get(name)
+        if entry is None or tuple(entry['mixer']) != pygame.mixer.get_init() \
+                or not self._is_fresh(entry['source']):
+            return None
+        self.hits += 1
+        offset = entry['offset']
+        return pygame.mixer.Sound(
+            buffer=self._view[offset:offset + entry['length']])
+
+
+def _stat(path: str) -> Tuple[int, int]:
+    """
+    Размер и время изменения файла для проверки устаревания
+    :param path: str
+    :return Tuple[int, int]:
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build(path: str = constants.BUNDLE_PATH,
+          image_path: str = constants.IMAGES_PATH,
+          sound_path: str = constants.MUSIC_PATH,
+          scaled: Iterable[Tuple[str, Tuple[int, int]]] =
+          constants.BUNDLE_SCALED) -> dict:
+    """
+    Собирает пакет: все изображения каталога в исходном размере,
+        масштабированные варианты из scaled и декодированные звуки.
+        Звуки декодируются под микшер с параметрами по умолчанию
+    :param path: str - файл пакета
+    :param image_path: str
+    :param sound_path: str
+    :param scaled: Iterable[Tuple[str, Tuple[int, int]]] - (имя, размер)
+    :return dict: оглавление пакета (смещения от начала буферов)
+    """
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    index = {'sources': {}, 'images': [], 'sounds': []}
+    blobs = []
+    offset = 0
+
+    def add(entries: list, entry: dict, source: str, blob: bytes) -> None:
+        nonlocal offset
+        index['sources'][source] = _stat(source)
+        entry.update(source=source, offset=offset, length=len(blob))
+        entries.append(entry)
+        blobs.append(blob)
+        offset += len(blob) + -len(blob) % ALIGN
+
+    originals = {}
+    for name in sorted(os.listdir(image_path)):
+        source = os.path.join(image_path, name)
+        try:
+            image = pygame.image.load(source)
+        except pygame.error:
+            continue
+        originals[name] = image
+        fmt = 'RGBA' if image.get_flags() & pygame.SRCALPHA else 'RGB'
+        add(index['images'], {'name': name, 'size': image.get_size(),
+                              'format': fmt, 'native': True},
+            source, pygame.image.tostring(image, fmt))
+    for name, size in scaled:
+        image = originals.get(name)
+        if image is None or image.get_size() == tuple(size):
+            continue
+        fmt = 'RGBA' if image.get_flags() & pygame.SRCALPHA else 'RGB'
+        add(index['images'], {'name': name, 'size': tuple(size),
+                              'format': fmt, 'native': False},
+            os.path.join(image_path, name),
+            pygame.image.tostring(pygame.transform.scale(image, size), fmt))
+    for name in sorted(os.listdir(sound_path)):
+        source = os.path.join(sound_path, name)
+        try:
+            sound = pygame.mixer.Sound(source)
+        except pygame.error:
+            continue
+        add(index['sounds'], {'name': name, 'mixer': pygame.mixer.get_init()},
+            source, sound.get_raw())
+
+    header = json.dumps(index).encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(header)))
+        file.write(header)
+        file.write(bytes(-(HEADER.size + len(header)) % ALIGN))
+        for blob in blobs:
+            file.write(blob)
+            file.write(bytes(-len(blob) % ALIGN))
+    return index
+
+
+if __name__ == '__main__':
+    pygame.init()
+    result = build()
+    print(f"Bundle saved: {constants.BUNDLE_PATH}, "
+          f"{len(result['images'])} images, {len(result['sounds'])} sounds")
@@ -1,13 +1,42 @@
 import os
 import pygame
-import sqlite3
 
 SIZE = SCREEN_WIDTH, SCREEN_HEIGHT = 550, 500
 tile_width = tile_height = 50
 ROWS = SCREEN_HEIGHT // tile_height
 COLUMNS = SCREEN_WIDTH // tile_width
+# строка поля, заполнение которой означает конец игры
+OVERFLOW_ROW = 1
+# устройство игрового поля: 'list' - списки спрайтов,
+# 'numpy' - массивы numpy (если numpy не установлен, используется 'list')
+BOARD_BACKEND = 'list'
 GRAVITY = 0.4
+# частота шагов симуляции: скорости коробок и героя заданы на шаг
 FPS = 30
+# наибольшая частота отрисовки кадров (0 - без ограничения)
+RENDER_FPS = 60
+# наибольшее число шагов симуляции за один кадр отрисовки
+SIM_MAX_STEPS = 5
+# отрисовка только изменившихся областей экрана
+DIRTY_RECTS = False
+# доля экрана, при превышении которой выполняется полная перерисовка
+DIRTY_MAX_FRACTION = 0.5
+# вывод времени этапов запуска
+BOOT_LOG = False
+# сколько меню перерисовывается после последнего события, мс
+MENU_ACTIVE_MS = 1000
+# наибольшее время сна меню в ожидании события, мс
+MENU_IDLE_TIMEOUT = 1000
+# сбор замеров фаз кадра с запуска (таблица включает его сама)
+PROFILER_ENABLED = False
+# сколько последних кадров хранит профилировщик
+PROFILER_FRAMES = 300
+# имя CSV-файла с замерами (формат time.strftime)
+PROFILER_CSV = 'profile_%Y%m%d_%H%M%S.csv'
+# запись каждой игровой сессии в файл (для воспроизведения и замеров)
+REPLAY_RECORD = False
+# имя файла записи сессии (формат time.strftime)
+REPLAY_PATH = os.path.join('replays', 'session_%Y%m%d_%H%M%S.rpl')
 STEP = 5
 DOWN_BORDER = 30
 screen_rect = (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT - tile_height - DOWN_BORDER)
@@ -16,10 +45,31 @@ LINE_PER_LEVEL = 3
 START_V = 15
 BOMBS_INTERVALS = 500
 INSTERVALS_PITCH = 200
+# кривая интервала появления коробок: уменьшение за уровень
+# и наименьший интервал, мс (у каждой сложности своя в таблице difficult)
+SPAWN_CURVE = (INSTERVALS_PITCH, 400)
+# сколько ближайших коробок показывает расписание появления
+SPAWN_LOOKAHEAD = 3
 IMAGES_PATH = os.path.join('data', 'images')
 MUSIC_PATH = os.path.join('data', 'music')
+# пакет декодированных ресурсов (собирается командой python bundle.py)
+BUNDLE_PATH = os.path.join('data', 'assets.bundle')
+# масштабированные варианты изображений, которые кладутся в пакет
+BUNDLE_SCALED = (
+    ('background-start.jpg', SIZE),
+    ('results.jpg', SIZE),
+    ('gameover.png', (SCREEN_WIDTH, 300)),
+)
 DB_NAME = os.path.join('data', 'db.db')
+# сколько подготовленных запросов хранит соединение с базой
+DB_CACHED_STATEMENTS = 32
+BACKGROUND_IMAGE = 'background.png'
 DEFAULT_DIFFICULT = 'Средне'
+# сколько лучших результатов хранит таблица рекордов
+LEADERBOARD_SIZE = 7
+# длина очереди потока записи в базу и наибольшая пачка одной транзакции
+WRITER_QUEUE = 64
+WRITER_BATCH = 32
 MARGIN_STATUS = 25
 HEALTHS = 10
 
@@ -27,22 +77,19 @@ HEALTHS = 10
 RIGHT_KEY = pygame.K_RIGHT
 LEFT_KEY = pygame.K_LEFT
 UP_KEY = pygame.K_SPACE
+# таблица замеров фаз кадра и сохранение их в CSV
+PROFILER_KEY = pygame.K_F3
+PROFILER_DUMP_KEY = pygame.K_F4
 
 
-def setup_controller() -> None:
+def setup_controller(controls: dict) -> None:
     """
     переопределяет кнопки управления
+    :param controls: Dict[str, int] - клавиши действий (таблица controller)
     :return None:
     """
-    con = sqlite3.connect(DB_NAME)
-    cur = con.cursor()
-    keys_in_db = cur.execute(
-        'SELECT key '
-        'FROM controller '
-        'ORDER BY id'
-    ).fetchall()
     global UP_KEY, RIGHT_KEY, LEFT_KEY
-    RIGHT_KEY = keys_in_db[0][0]
-    LEFT_KEY = keys_in_db[1][0]
-    UP_KEY = keys_in_db[2][0]
+    RIGHT_KEY = controls['move_right']
+    LEFT_KEY = controls['move_left']
+    UP_KEY = controls['move_up']
 
@@ -0,0 +1,239 @@
+import sqlite3
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import constants
+import storage
+
+# строка таблицы рекордов без id: имя, очки, уровень, сложность, итог
+Record = Tuple[str, int, int, int, int]
+# наименьшие интервалы появления коробок по id сложности: ими миграция
+# заполняет столбец difficult_spawn_floor в базах прежних версий
+SPAWN_FLOORS = {1: 1500, 2: 1000, 3: 800, 4: 600, 5: 400}
+
+
+class Difficult(NamedTuple):
+    """
+    Строка таблицы difficult
+    """
+    id: int
+    name: str
+    start_v: int
+    bomb_interval: int
+    # кривая интервала появления коробок: уменьшение за уровень
+    # и наименьший интервал, мс
+    spawn_pitch: int
+    spawn_floor: int
+
+
+class Database:
+    """
+    Единственная точка доступа игры к базе.
+        Владеет одним соединением для чтения, все запросы параметризованы,
+        поэтому sqlite повторно использует их подготовленные выражения.
+        Небольшие неизменные таблицы difficult и controller читаются
+        один раз при загрузке и дальше отдаются из памяти. Перед первым
+        чтением схема базы прежних версий дополняется (migrate), изменения
+        управления и таблицы рекордов записываются через поток записи
+        storage.writer. Рекорды сортируются по индексу records_total,
+        который создает миграция.
+        Свойства:
+    controls: Dict[str, int] - клавиша каждого действия (name_action)
+    difficults: Dict[str, Difficult] - уровни сложности по названию
+    path: str
+    queries: int - сколько запросов выполнено через execute
+    writer: storage.Writer
+        Методы:
+    close - закрывает соединение
+    con - возвращает соединение, открывая его при первом обращении
+    control - возвращает клавишу действия
+    difficult - возвращает уровень сложности по названию
+    difficult_names - возвращает названия уровней сложности по порядку
+    execute - выполняет параметризованный запрос чтения
+    load - читает таблицы настроек в память
+    migrate - дополняет схему базы прежних версий и создает индексы
+    records_add - ставит результат в очередь записи
+    records_clear - ставит удаление всех результатов в очередь записи
+    records_cutoff - возвращает итог результата на заданном месте
+    records_top - возвращает лучшие результаты
+    set_control - переназначает клавишу действия
+    """
+
+    def __init__(self, path: str = constants.DB_NAME,
+                 writer: Optional[storage.Writer] = None) -> None:
+        """
+        :param path: str - файл базы
+        :param writer: Optional[storage.Writer] - по умолчанию storage.writer
+        """
+        self.path: str = path
+        self.writer: storage.Writer = writer or storage.writer
+        self.controls: Dict[str, int] = {}
+        self.difficults: Dict[str, Difficult] = {}
+        self.queries: int = 0
+        self._con: Optional[sqlite3.Connection] = None
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        """
+        Возвращает соединение, при первом обращении открывает его
+        :return sqlite3.Connection:
+        """
+        if self._con is None:
+            self._con = sqlite3.connect(
+                self.path, cached_statements=constants.DB_CACHED_STATEMENTS)
+        return self._con
+
+    def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        """
+        Выполняет запрос чтения. Значения передаются только параметрами
+        :param query: str
+        :param params: tuple
+        :return sqlite3.Cursor:
+        """
+        self.queries += 1
+        return self.con.execute(query, params)
+
+    def migrate(self) -> None:
+        """
+        Дополняет схему базы прежних версий: добавляет в таблицу difficult
+            столбцы кривой появления коробок и создает индекс рекордов
+            по итогу. Повторный вызов ничего не меняет. Выполняется сразу
+            на соединении чтения, поэтому первый же запрос рекордов
+            идет по индексу
+        :return None:
+        """
+        columns = {row[1] for row in self.con.execute(
+            'PRAGMA table_info(difficult)')}
+        pitch, floor = constants.SPAWN_CURVE
+        with self.con:
+            if 'difficult_spawn_pitch' not in columns:
+                self.con.execute(
+                    'ALTER TABLE difficult ADD COLUMN difficult_spawn_pitch '
+                    f'INTEGER NOT NULL DEFAULT {int(pitch)}')
+            if 'difficult_spawn_floor' not in columns:
+                self.con.execute(
+                    'ALTER TABLE difficult ADD COLUMN difficult_spawn_floor '
+                    f'INTEGER NOT NULL DEFAULT {int(floor)}')
+                self.con.executemany(
+                    'UPDATE difficult SET difficult_spawn_floor=? WHERE id=?',
+                    [(value, id_) for id_, value in SPAWN_FLOORS.items()])
+            self.con.execute('CREATE INDEX IF NOT EXISTS records_total '
+                             'ON records(total)')
+
+    def load(self) -> None:
+        """
+        Дополняет схему базы и читает таблицы difficult и controller
+            в память (повторный вызов ничего не читает)
+        :return None:
+        """
+        if self.difficults and self.controls:
+            return
+        self.migrate()
+        self.difficults = {
+            name: Difficult(id_, name, start_v, int(interval), pitch, floor)
+            for id_, name, start_v, interval, pitch, floor in self.execute(
+                'SELECT id, difficult_name, difficult_start_v, '
+                'difficult_bomb_interval, difficult_spawn_pitch, '
+                'difficult_spawn_floor '
+                'FROM difficult '
+                'ORDER BY id')
+        }
+        self.controls = dict(self.execute(
+            'SELECT name_action, key '
+            'FROM controller '
+            'ORDER BY id'))
+
+    def difficult(self, name: str) -> Difficult:
+        """
+        Возвращает уровень сложности по названию
+        :param name: str
+        :return Difficult:
+        """
+        self.load()
+        return self.difficults[name]
+
+    def difficult_names(self) -> List[str]:
+        """
+        Возвращает названия уровней сложности в порядке id
+        :return List[str]:
+        """
+        self.load()
+        return list(self.difficults)
+
+    def control(self, action: str) -> int:
+        """
+        Возвращает клавишу действия
+        :param action: str - name_action таблицы controller
+        :return int:
+        """
+        self.load()
+        return self.controls[action]
+
+    def set_control(self, action: str, key: int) -> None:
+        """
+        Переназначает клавишу действия в памяти и ставит запись в очередь
+        :param action: str
+        :param key: int
+        :return None:
+        """
+        self.load()
+        self.controls[action] = key
+        self.writer.submit('UPDATE controller SET key=? WHERE name_action=?',
+                           (key, action))
+
+    def records_cutoff(self, place: int) -> Optional[int]:
+        """
+        Возвращает итог результата на месте place по убыванию итога
+        :param place: int - место, начиная с 1
+        :return Optional[int]: None, если результатов меньше place
+        """
+        self.load()
+        row = self.execute(
+            'SELECT total FROM records '
+            'ORDER BY total DESC '
+            'LIMIT 1 OFFSET ?', (place - 1,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def records_top(self, size: int) -> List[Record]:
+        """
+        Возвращает лучшие результаты по убыванию итога
+        :param size: int
+        :return List[Record]:
+        """
+        self.load()
+        return self.execute(
+            'SELECT name, score, level, difficult_id, total '
+            'FROM records '
+            'ORDER BY total DESC '
+            'LIMIT ?', (size,)
+        ).fetchall()
+
+    def records_add(self, record: Record) -> None:
+        """
+        Ставит результат в очередь записи
+        :param record: Record
+        :return None:
+        """
+        self.writer.submit(
+            'INSERT INTO records(name, score, level, difficult_id, total) '
+            'VALUES(?, ?, ?, ?, ?)', record)
+
+    def records_clear(self) -> None:
+        """
+        Ставит удаление всех результатов в очередь записи
+        :return None:
+        """
+        self.writer.submit('DELETE FROM records')
+
+    def close(self) -> None:
+        """
+        Закрывает соединение, таблицы настроек остаются в памяти
+        :return None:
+        """
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+
+# база игры
+db = Database()
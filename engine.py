@@ -0,0 +1,762 @@
+import random
+from copy import copy
+from itertools import count
+from typing import List, Optional, Tuple, Union
+
+import pygame
+
+import assets
+import board
+import constants
+import replay
+import spawner
+from profiling import profiler
+
+# изображение и маска кадра героя
+Pose = Tuple[pygame.Surface, pygame.mask.Mask]
+
+color_box = [
+    'box-black.png',
+    'box-blue.png',
+    'box-cyan.png',
+    'box-green.png',
+    'box-pink.png',
+    'box-red.png',
+    'box-yellow.png'
+]
+
+# биты пересечений коробки (Tile.collide): с коробками и с героем
+COLLIDE_LEFT = 1
+COLLIDE_RIGHT = 2
+COLLIDE_TOP = 4
+COLLIDE_BOTTOM = 8
+HERO_COLLIDE_LEFT = 16
+HERO_COLLIDE_RIGHT = 32
+HERO_COLLIDE_TOP = 64
+HERO_COLLIDE_BOTTOM = 128
+HERO_COLLIDE = HERO_COLLIDE_LEFT | HERO_COLLIDE_RIGHT | HERO_COLLIDE_TOP | \
+    HERO_COLLIDE_BOTTOM
+
+
+# игровая логика без окна, звука и интерфейса
+class Engine:
+    """
+    Класс отвечает за игровую логику: поле, героя, коробки, очки и уровень.
+        Не открывает окно, не проигрывает звуки и не использует pygame_gui,
+        поэтому может работать без дисплея (тесты, замеры, повторы).
+        Реакции интерфейса подключаются переопределением методов on_*.
+        Свойства:
+    all_sprites: pygame.sprite.Group
+    board: Union[board.Board, board.ArrayBoard]
+    bomb_interval: int - интервал появления коробок, мс (из spawner)
+    falling_group: pygame.sprite.Group - падающие коробки
+    is_game_over: bool
+    level: int
+    player: Player
+    player_group: pygame.sprite.Group
+    recording: Optional[replay.Recording] - запись сессии, если она ведется
+    rng: random.Random - генератор случайных чисел движка
+    score: int
+    spawner: spawner.SpawnScheduler - расписание появления коробок
+    tile_v: int - скорость падения коробок
+    tiles_group: pygame.sprite.Group
+        Методы:
+    check_game_over - проверяет окончание игры
+    check_line - проверяет нет ли на поле полностью заполненных линий
+    delete_rows - проводит удаление строк со смещением всех объектов
+    increase_speed - увеличивает скорость коробок и частоту их появления
+    on_hit - вызывается при попадании коробки в героя
+    on_jump - вызывается при прыжке героя
+    on_lines - вызывается при удалении строк
+    on_speed - вызывается при смене интервала появления коробок
+    reset_speed - сбрасывает скорости на начальные значения
+    spawn_due - создает коробку, если по расписанию пришло ее время
+    spawn_tile - создает новую коробку
+    step - обрабатывает один кадр игры
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """
+        :param seed: Optional[int] - начальное значение генератора
+                                     случайных чисел
+        """
+        self.all_sprites: pygame.sprite.Group = pygame.sprite.Group()
+        self.tiles_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.falling_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.player_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.board: Union[board.Board, board.ArrayBoard] = board.create()
+        # коробки появляются во время игры, их загружаем заранее
+        assets.cache.preload(color_box)
+        self.rng: random.Random = random.Random(seed)
+        self.recording: Optional[replay.Recording] = None
+        self.spawner: spawner.SpawnScheduler = spawner.SpawnScheduler(
+            self.rng, spawner.current_curve())
+        self.tile_v: int = constants.START_V
+        self.is_game_over: bool = False
+        self.level: int = 0
+        self.score: int = 0
+        self.player: Player = Player(
+            self, assets.cache.get_image("dragon.png"), 8, 2)
+
+    @property
+    def bomb_interval(self) -> int:
+        return self.spawner.interval
+
+    def check_game_over(self) -> None:
+        """
+        Проверка состояния игры на окончание
+        :return None:
+        """
+        self.is_game_over = self.board.is_overflow or not self.player.health
+
+    def check_line(self) -> None:
+        """
+        Если в строке все элементы заполнены, то строка удаляется.
+            Заполненные строки отмечает само поле при записи в клетку
+        :return None:
+        """
+        if self.board.full_rows:
+            self.delete_rows(self.board.full_rows)
+
+    def delete_rows(self, rows: List[int]) -> None:
+        """
+        Принимает номера строк, которые нужно удалить, и удаляет их за раз.
+            Очки и уровень начисляются один раз на всю пачку строк
+        :param rows: List[int]
+        :return None:
+        """
+        # удаляем строки со смещением коробок, затем спрайты
+        count_rows = len(rows)
+        for tile in self.board.clear_rows(rows):
+            tile.kill()
+        self.on_lines(count_rows)
+
+        # увеличиваем счетчик очков и уровень (при необходимости)
+        levels = 0
+        for _ in range(count_rows):
+            self.score += constants.COLUMNS
+            if self.score % constants.LINE_PER_LEVEL == 0:
+                levels += 1
+        if levels:
+            self.level += levels
+            self.increase_speed(levels)
+
+    def increase_speed(self, levels: int = 1) -> None:
+        """
+        Увеличивает скорость коробок, уменьшает интервал их появления
+            и перекрашивает коробки в цвет текущего уровня
+        :param levels: int - на сколько уровней выросла сложность
+        :return None:
+        """
+        self.tile_v += levels
+        self.spawner.set_level(self.level)
+        image = assets.cache.get_image(color_box[self.level % len(color_box)])
+        for tile in self.tiles_group:
+            tile.image = image
+        self.board.touch()
+        self.on_speed()
+
+    def on_hit(self, tile: 'Tile') -> None:
+        """
+        Вызывается после попадания коробки в героя
+        :param tile: Tile - уже удаленная коробка
+        :return None:
+        """
+
+    def on_jump(self) -> None:
+        """
+        Вызывается при прыжке героя
+        :return None:
+        """
+
+    def on_lines(self, count_rows: int) -> None:
+        """
+        Вызывается после удаления заполненных строк
+        :param count_rows: int
+        :return None:
+        """
+
+    def on_speed(self) -> None:
+        """
+        Вызывается при смене интервала появления коробок
+        :return None:
+        """
+
+    def reset_speed(self, start_v: Optional[int] = None,
+                    curve: Optional[spawner.SpawnCurve] = None) -> None:
+        """
+        Сбрасывает скорости на начальные значения (при рестарте
+            и смене сложности)
+        :param start_v: Optional[int] - скорость коробок,
+                        по умолчанию constants.START_V
+        :param curve: Optional[spawner.SpawnCurve] - кривая появления
+                      коробок, по умолчанию кривая выбранной сложности
+        :return None:
+        """
+        self.tile_v = constants.START_V if start_v is None else start_v
+        self.spawner.reset(curve or spawner.current_curve())
+        self.on_speed()
+
+    def spawn_due(self) -> Optional['Tile']:
+        """
+        Продвигает расписание появления коробок на тик симуляции
+            и создает коробку, если пришло ее время
+        :return Optional[Tile]:
+        """
+        col = self.spawner.tick()
+        if col is None:
+            return None
+        return self.spawn_tile(col)
+
+    def spawn_tile(self, col: Optional[int] = None) -> 'Tile':
+        """
+        Создает коробку цвета текущего уровня
+        :param col: Optional[int] - столбец, по умолчанию случайный
+                                    (без крайних, чтобы не было завала)
+        :return Tile:
+        """
+        if col is None:
+            col = self.rng.randrange(1, constants.COLUMNS - 1)
+        if self.recording is not None:
+            self.recording.record_spawn(col)
+        return Tile(self, color_box[self.level % len(color_box)], col)
+
+    def step(self, keys) -> None:
+        """
+        Обрабатывает один кадр игры: движение героя и коробок
+            и удаление заполненных строк
+        :param keys: Sequence[bool] - состояние клавиш
+        :return None:
+        """
+        if self.recording is not None:
+            self.recording.record_step(keys)
+        self.board.index.update(self.tiles_group, self.falling_group,
+                                self.board.version)
+        profiler.lap('index')
+        self.all_sprites.update(keys)
+        profiler.lap('sprites')
+        self.check_line()
+        profiler.lap('check_line')
+
+
+# класс главного героя
+class Player(pygame.sprite.Sprite):
+    """
+    Класс отвечает за настройку и состояние главного героя.
+        Свойства:
+    engine: Engine
+    frames: List[pygame.Surface] - кадры анимации
+    poses: List[Tuple[Pose, Pose]] - для каждого кадра изображение и маска
+                                     без разворота и с разворотом
+        Методы:
+    build_poses - заранее готовит развернутые кадры и их маски
+    cut_sheet - раскадровка из карты спрайта
+    get_coords - возвращает координаты тайла на игровом поле
+    have_border_down - проверяет есть ли под героем объект или край экрана
+    is_can_jump - проверяет возможность прыгнуть вверх
+    is_can_move_left - проверяет возможность пойти налево
+    is_can_move_right - проверяет возможность пойти направо
+    move - управляет перемещением героя по полю
+    update - обновляет состояние главного героя после действий пользователя
+    """
+
+    def __init__(self, engine: 'Engine', sheet: pygame.Surface, columns: int,
+                 rows: int):
+        """
+        :param engine: Engine:
+        :param sheet: pygame.Surface:
+        :param columns: int:
+        :param rows: int:
+        """
+        super().__init__(engine.player_group, engine.all_sprites)
+        self.engine: Engine = engine
+        # количество циклов повторений анимации на экран
+        self.count_animate: int = 4
+        self.frames: List[pygame.Surface] = []
+        self.cut_sheet(sheet, columns, rows)
+        self.poses: List[Tuple[Pose, Pose]] = []
+        self.build_poses()
+        self.cur_frame: int = 0
+        self.gravity: float = constants.GRAVITY
+        self.health: int = constants.HEALTHS
+        self.is_flip: bool = False  # статус разворота спрайта
+        self.image: pygame.Surface
+        self.mask: pygame.mask.Mask
+        self.image, self.mask = self.poses[self.cur_frame][self.is_flip]
+        self.is_in_air: bool = False  # статус прыжка
+        self.jump: float = 1.5 * constants.tile_height
+        self.rect = self.rect.move(
+            constants.SCREEN_WIDTH // 2 - self.image.get_width() // 2,
+            (constants.SCREEN_HEIGHT -
+             self.image.get_height() -
+             constants.DOWN_BORDER)
+        )
+        self.col, self.row = self.get_coords()
+        self.v: int = 1  # скорость
+
+    def build_poses(self) -> None:
+        """
+        Один раз при загрузке готовит для каждого кадра развернутое
+            изображение и маски обоих направлений
+        :return None:
+        """
+        self.poses = []
+        for frame in self.frames:
+            flipped = pygame.transform.flip(frame, True, False)
+            self.poses.append((
+                (frame, pygame.mask.from_surface(frame)),
+                (flipped, pygame.mask.from_surface(flipped)),
+            ))
+
+    def cut_sheet(self, sheet: pygame.Surface, columns: int, rows: int) -> None:
+        """
+        Раскадровка из карты спрайта
+        :param sheet:
+        :param columns:
+        :param rows:
+        :return None:
+        """
+        self.rect = pygame.Rect(0, 0, sheet.get_width() // columns,
+                                sheet.get_height() // rows)
+        for j in range(rows):
+            for i in range(columns):
+                frame_location = (self.rect.w * i, self.rect.h * j)
+                frame = pygame.transform.scale(
+                    sheet.subsurface(pygame.Rect(
+                        frame_location, self.rect.size)
+                    ),
+                    (constants.tile_width, constants.tile_height)
+                )
+                self.frames.append(frame)
+
+    def get_coords(self) -> [int, int]:
+        """
+        Возвращает координаты тайла на игровом поле (в клетках: столбец, строка)
+        :return: tuple[int, int]
+        """
+        return self.rect.x * constants.COLUMNS // constants.SCREEN_WIDTH, \
+            self.rect.y * constants.ROWS // constants.SCREEN_HEIGHT
+
+    def is_can_jump(self) -> bool:
+        """
+        Проверяет возможность прыгнуть вверх
+        :return bool:
+        """
+        return self.rect.top - self.jump > 0 and not self.is_in_air
+
+    def is_can_move_left(self) -> bool:
+        """
+        Проверяет возможность пойти налево
+        :return: bool
+        """
+        collide_tiles = self.engine.board.index.collide(self.rect)
+        ok = False
+        if collide_tiles:
+            collide_tile = collide_tiles[0].rect
+            x = self.rect.left - constants.STEP
+            top = self.rect.top - constants.ERROR_RATE
+            y = self.rect.bottom - constants.ERROR_RATE
+            ok = collide_tile.collidepoint(x + constants.STEP, top) or \
+                 collide_tile.collidepoint(x + constants.STEP, y)
+        return self.col >= 0 and self.rect.left >= 0 and not \
+            self.engine.board[self.row][self.col] and not ok
+
+    def is_can_move_right(self) -> bool:
+        """
+        Проверяет возможность пойти направо
+        :return: bool
+        """
+        collide_tiles = self.engine.board.index.collide(self.rect)
+        ok = False
+        if collide_tiles:
+            collide_tile = collide_tiles[0].rect
+            x = self.rect.right + constants.STEP
+            top = self.rect.top - constants.ERROR_RATE
+            y = self.rect.bottom - constants.ERROR_RATE
+            ok = collide_tile.collidepoint(x + constants.STEP, top) or \
+                 collide_tile.collidepoint(x + constants.STEP, y)
+        right_col = (
+                (self.rect.centerx + self.rect.width // 4) *
+                constants.COLUMNS // constants.SCREEN_WIDTH
+        )
+        return (right_col < constants.COLUMNS and
+                self.rect.right < constants.SCREEN_WIDTH and
+                not self.engine.board[self.row][right_col] and
+                not ok)
+
+    def have_border_down(self) -> bool:
+        """
+        Проверяет есть ли под героем объект или край экрана.
+            Лежащие коробки проверяются по высоте столбца,
+            падающие - по индексу коробок
+        :return: bool
+        """
+        move_rect = copy(self.rect)
+        move_rect.bottom += self.v + self.gravity
+        top = self.engine.board.surface_y(
+            move_rect.centerx // constants.tile_width)
+        ok = top is not None and top < move_rect.bottom
+        if not ok:
+            x = move_rect.centerx
+            y = move_rect.bottom + self.v + self.gravity
+            ok = any(tile.rect.collidepoint(x, y) for tile in
+                     self.engine.board.index.falling.query(move_rect))
+        return ok or not self.rect.colliderect(constants.screen_rect)
+
+    def have_border_up(self) -> bool:
+        """
+        Проверяет есть ли над героем объект на пути прыжка
+            (от новой позиции до прежней)
+        :return: bool
+        """
+        swept_rect = pygame.Rect(self.rect.x, self.rect.y, self.rect.width,
+                                 self.rect.height + self.jump - 1)
+        return bool(self.engine.board.index.collide(swept_rect))
+
+    def move(self, keys: [bool]) -> None:
+        """
+        Управляет перемещением героя по полю
+        :param keys: [bool]
+        :return:
+        """
+        if keys[constants.LEFT_KEY]:
+            self.is_flip = False
+            if self.is_can_move_left():
+                self.rect.x -= constants.STEP
+        if keys[constants.RIGHT_KEY]:
+            self.is_flip = True
+            if self.is_can_move_right():
+                self.rect.x += constants.STEP
+        if keys[constants.UP_KEY]:
+            if self.is_can_jump():
+                self.engine.on_jump()
+                self.rect.y -= self.jump
+                self.is_in_air = True
+                if self.have_border_up():
+                    collide_tiles = pygame.sprite.spritecollide(
+                        self, self.engine.tiles_group, False)
+                    if len(collide_tiles) >= 1:
+                            collide_tiles[0].hit_player()
+
+    def update(self, *args, **kwargs) -> None:
+        """
+        Обновляет состояние главного героя после действий пользователя
+        :param args:
+        :param kwargs:
+        :return None:
+        """
+        self.cur_frame = (self.rect.x * constants.COLUMNS * 4 //
+                          constants.SCREEN_WIDTH) % len(self.frames)
+        self.image, self.mask = self.poses[self.cur_frame][self.is_flip]
+        self.rect.width = constants.tile_width
+        self.rect.height = constants.tile_height
+        self.col, self.row = self.get_coords()
+        if args:
+            self.move(args[0])
+        # маски сравниваются только с коробками, задевающими прямоугольник
+        is_collide_mask = any(
+            pygame.sprite.collide_mask(self, tile)
+            for tile in self.engine.board.index.collide(self.rect)
+        )
+        if not self.have_border_down() and \
+                (not is_collide_mask or (not self.is_can_move_left() and
+                                         not self.is_can_move_right())):
+            self.v += self.gravity
+            self.rect.y += self.v
+        else:
+            self.v = 1
+            self.is_in_air = False
+
+
+# класс тайлов коробочек
+class Tile(pygame.sprite.Sprite):
+    """
+    Класс отвечает за настройку и состояние коробочек на поле
+        Свойства:
+    can_move_left: bool
+    can_move_right: bool
+    col: int
+    collide: int - биты пересечений COLLIDE_* и HERO_COLLIDE_*
+    engine: Engine
+    image: pygame.Surface
+    is_in_air: bool
+    mask: pygame.mask.Mask
+    rect: pygame.Rect
+    row: int
+    serial: int - порядковый номер коробки
+    v: int - скорость падения (общая для всех коробок движка)
+        Методы:
+    get_coords - возвращает координаты тайла на игровом поле
+    have_bottom_collide - Проверка что есть объект снизу
+    have_hero_hit - Проверка что попали на героя сверху
+    have_left_collide - Проверка что есть объект справа
+    have_right_collide - Проверка что есть объект справа
+    have_top_collide - Проверка что есть объект сверху
+    hit_player - наносит урон игроку
+    is_can_move_left - проверяет возможность сдвинуть коробку влево
+    is_can_move_right - проверяет возможность сдвинуть коробку вправо
+    move - управляет перемещением коробок по полю
+    setup_collide - сбрасывает значения пересечений
+    swept_rect - возвращает прямоугольник с путем коробки за шаг падения
+    touch_board - отмечает изменение поля при сдвиге лежащей коробки
+    update - обновляет состояние спрайта
+    """
+
+    # состояние коробки в слотах; у pygame.sprite.Sprite слотов нет,
+    # поэтому в словаре атрибутов остаются только группы спрайта
+    __slots__ = ('can_move_left', 'can_move_right', 'col', 'collide',
+                 'engine', 'image', 'is_in_air', 'mask', 'rect', 'row',
+                 'serial')
+
+    serials = count()
+
+    def __init__(self, engine: 'Engine', tile_type: str, pos_x: int) -> None:
+        """
+        :param engine: Engine
+        :param tile_type: str
+        :param pos_x: int
+        :return None:
+        """
+        super().__init__(engine.tiles_group, engine.falling_group,
+                         engine.all_sprites)
+        self.engine: Engine = engine
+        self.can_move_left: bool = True
+        self.can_move_right: bool = True
+        self.col: int = pos_x
+        self.collide: int = 0
+        self.image: pygame.Surface = assets.cache.get_image(tile_type)
+        self.is_in_air: bool = True
+        self.mask: pygame.mask.Mask = assets.cache.get_mask(tile_type)
+        self.rect: pygame.Rect = self.image.get_rect().move(
+            constants.tile_width * pos_x, 0)
+        self.row: int = 0
+        self.serial: int = next(Tile.serials)
+
+    def get_coords(self) -> [int, int]:
+        """
+        Возвращает координаты тайла на игровом поле (в клетках: столбец, строка)
+        :return tuple[int, int]:
+        """
+        return self.rect.x * constants.COLUMNS // constants.SCREEN_WIDTH, \
+            self.rect.y * constants.ROWS // constants.SCREEN_HEIGHT
+
+    def have_bottom_collide(self, obj: pygame.sprite.Sprite,
+                            swept: pygame.Rect) -> None:
+        """
+        Проверка что есть объект снизу
+        :param obj: pygame.sprite.Sprite:
+        :param swept: pygame.Rect - путь коробки за шаг (swept_rect)
+        :return None:
+        """
+        if obj.rect.right > swept.left and \
+                obj.rect.left < swept.right and \
+                obj.rect.bottom >= (swept.top +
+                                    constants.ERROR_RATE) and \
+                obj.rect.top <= (swept.bottom +
+                                 constants.ERROR_RATE):
+            if not isinstance(obj, Player):
+                self.collide |= COLLIDE_BOTTOM
+
+    def have_hero_hit(self, obj: pygame.sprite.Sprite,
+                      swept: pygame.Rect) -> None:
+        """
+        Проверка что попали на героя сверху
+        :param obj: pygame.sprite.Sprite:
+        :param swept: pygame.Rect - путь коробки за шаг (swept_rect)
+        :return None:
+        """
+        if obj.rect.right > swept.left and \
+                obj.rect.left < swept.right and \
+                obj.rect.top < (swept.bottom +
+                                constants.ERROR_RATE) and \
+                constants.tile_height < obj.rect.top - self.rect.top <= (
+                constants.tile_height +
+                constants.ERROR_RATE):
+            self.collide |= HERO_COLLIDE_BOTTOM
+
+    def have_left_collide(self, obj: pygame.sprite.Sprite) -> None:
+        """
+        Проверка что есть объект справа
+        :param obj: pygame.sprite.Sprite:
+        :return None:
+        """
+        if obj.rect.right > self.rect.left > obj.rect.left and \
+                obj.rect.bottom - self.rect.top <= (constants.tile_height +
+                                                    constants.ERROR_RATE) and \
+                self.rect.bottom - obj.rect.top <= (constants.tile_height +
+                                                    constants.ERROR_RATE):
+            self.collide |= HERO_COLLIDE_LEFT if isinstance(obj, Player) \
+                else COLLIDE_LEFT
+
+    def have_right_collide(self, obj: pygame.sprite.Sprite) -> None:
+        """
+        Проверка что есть объект справа
+        :param obj: pygame.sprite.Sprite:
+        :return None:
+        """
+        if self.rect.right > obj.rect.left > self.rect.left and \
+                obj.rect.bottom - self.rect.top <= (constants.tile_height +
+                                                    constants.ERROR_RATE) and \
+                self.rect.bottom - obj.rect.top <= (constants.tile_height +
+                                                    constants.ERROR_RATE) and \
+                not self.collide & HERO_COLLIDE_BOTTOM:
+            self.collide |= HERO_COLLIDE_RIGHT if isinstance(obj, Player) \
+                else COLLIDE_RIGHT
+
+    def have_top_collide(self, obj: pygame.sprite.Sprite) -> None:
+        """
+        Проверка что есть объект сверху
+        :param obj: pygame.sprite.Sprite:
+        :return None:
+        """
+        if obj.rect.right > self.rect.left and \
+                obj.rect.left < self.rect.right and \
+                obj.rect.bottom <= (self.rect.top +
+                                    constants.ERROR_RATE) and \
+                obj.rect.top <= (self.rect.bottom +
+                                 constants.ERROR_RATE):
+            self.collide |= HERO_COLLIDE_TOP if isinstance(obj, Player) \
+                else COLLIDE_TOP
+
+    def hit_player(self) -> None:
+        """
+        наносит урон игроку
+        :return None:
+        """
+        if not self.is_in_air:
+            return
+        self.engine.player.health -= 1
+        self.col, self.row = self.get_coords()
+        self.engine.board.remove(self.row, self.col)
+        self.kill()
+        self.engine.on_hit(self)
+
+    def is_can_move_left(self) -> bool:
+        """
+        Проверяет возможность сдвинуть коробку влево
+        :return bool:
+        """
+        # слева и сверху нет коробок, а герой толкает справа
+        return self.rect.x > 0 and self.collide & (
+            COLLIDE_LEFT | COLLIDE_TOP | HERO_COLLIDE_RIGHT
+        ) == HERO_COLLIDE_RIGHT
+
+    def is_can_move_right(self) -> bool:
+        """
+        Проверяет возможность сдвинуть коробку вправо
+        :return None:
+        """
+        # справа и сверху нет коробок, а герой толкает слева
+        return self.rect.right < constants.SCREEN_WIDTH and self.collide & (
+            COLLIDE_RIGHT | COLLIDE_TOP | HERO_COLLIDE_LEFT
+        ) == HERO_COLLIDE_LEFT
+
+    def move(self, keys: [bool]) -> None:
+        """
+        Управляет перемещением коробок по полю
+        :param keys: [bool]
+        :return None:
+        """
+        # соседние коробки берутся из индекса, герой проверяется отдельно
+        # (в all_sprites он всегда стоит раньше коробок)
+        # объекты снизу ищутся на всем пути за шаг, чтобы на большой
+        # скорости коробка не проскочила сквозь них
+        swept = self.swept_rect()
+        hits: list = self.engine.board.index.collide(swept)
+        if swept.colliderect(self.engine.player.rect):
+            hits.insert(0, self.engine.player)
+        for obj in hits:
+            if obj == self:
+                continue
+            # Проверка что есть объект справа
+            self.have_right_collide(obj)
+            # Проверка что есть объект слева
+            self.have_left_collide(obj)
+            # Проверка что есть объект сверху
+            self.have_top_collide(obj)
+            # Проверка что есть объект снизу
+            self.have_bottom_collide(obj, swept)
+            # проверяем что не упали на героя
+            self.have_hero_hit(obj, swept)
+            self.can_move_left = self.is_can_move_left()
+            self.can_move_right = self.is_can_move_right()
+
+        if keys[constants.LEFT_KEY] and self.can_move_left:
+            self.rect.x -= constants.tile_width
+            self.touch_board()
+
+        if keys[constants.RIGHT_KEY] and self.can_move_right:
+            self.rect.x += constants.tile_width
+            self.touch_board()
+
+    def setup_collide(self) -> None:
+        """
+        Сбрасывает значения пересечений
+        :return None:
+        """
+        self.collide = 0
+
+    def swept_rect(self) -> pygame.Rect:
+        """
+        Возвращает прямоугольник коробки вместе с путем за шаг падения
+        :return pygame.Rect:
+        """
+        return self.rect.union(self.rect.move(0, self.v))
+
+    def touch_board(self) -> None:
+        """
+        Отмечает изменение поля, если сдвинута лежащая коробка
+            (падающие коробки не входят в слой лежащих и индекс поля)
+        :return None:
+        """
+        if not self.is_in_air:
+            self.engine.board.touch()
+
+    @property
+    def v(self) -> int:
+        """
+        Скорость падения, общая для всех коробок движка
+        :return int:
+        """
+        return self.engine.tile_v
+
+    def update(self, *args, **kwargs) -> None:
+        """
+        Обновляет состояние коробочки после действий пользователя
+        :param args:
+        :param kwargs:
+        :return None:
+        """
+        self.can_move_left = self.is_can_move_left()
+        self.can_move_right = self.is_can_move_right()
+        if args:
+            self.move(args[0])
+        # Проверка что не упали на героя: из пересечений с героем только нижнее
+        if (
+                self.collide & HERO_COLLIDE == HERO_COLLIDE_BOTTOM and
+                len(self.engine.board.index.collide(self.swept_rect())) == 1
+        ):
+            self.hit_player()
+
+        if self.rect.colliderect(constants.screen_rect) and \
+                not self.collide & COLLIDE_BOTTOM:
+            self.rect.y += self.v
+            if not self.is_in_air:
+                # сдвинутая коробка падает вместе со слоем лежащих
+                self.engine.board.touch()
+        else:
+            new_col, new_row = self.get_coords()
+            board = self.engine.board
+            # коробка за границей поля (в том числе отрицательные индексы,
+            # которые выбрали бы клетку с другого края) не укладывается
+            if 0 <= new_row < board.rows and 0 <= new_col < board.columns \
+                    and not board[new_row][new_col]:
+                self.is_in_air = False
+                self.remove(self.engine.falling_group)
+                board.remove(self.row, self.col)
+                board.place(new_row, new_col, self)
+                self.col, self.row = new_col, new_row
+                self.rect.y = constants.tile_height * (
+                        self.row + 1) - constants.DOWN_BORDER
+        self.rect.x = constants.tile_width * self.col
+        self.setup_collide()
@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, Optional
+
+import pygame
+
+
+class GlyphAtlas:
+    """
+    Заранее отрисованные символы одного шрифта и цвета.
+        Строка из этих символов собирается копированием готовых
+        изображений без обращения к FreeType. Символ, которого нет
+        в атласе, отрисовывается шрифтом один раз и добавляется в атлас.
+        Свойства:
+    chars: str - символы, отрисовываемые при создании атласа
+    color: pygame.Color
+    glyphs: Dict[str, pygame.Surface]
+    misses: int - сколько символов пришлось дорисовать
+    size: int - размер шрифта
+        Методы:
+    font - возвращает шрифт атласа
+    render - собирает изображение строки из символов
+    """
+
+    def __init__(self, size: int = 30, color: str = 'white',
+                 chars: str = '0123456789') -> None:
+        """
+        :param size: int
+        :param color: str
+        :param chars: str
+        """
+        self.size: int = size
+        self.color: pygame.Color = pygame.Color(color)
+        self.chars: str = chars
+        self.glyphs: Dict[str, pygame.Surface] = {}
+        self.misses: int = 0
+        # шрифт создается при первом обращении, после pygame.init
+        self._font: Optional[pygame.font.Font] = None
+
+    @property
+    def font(self) -> pygame.font.Font:
+        """
+        Возвращает шрифт атласа, при первом обращении отрисовывает символы
+        :return pygame.font.Font:
+        """
+        if self._font is None:
+            self._font = pygame.font.Font(None, self.size)
+            for char in self.chars:
+                self.glyphs[char] = self._font.render(char, True, self.color)
+        return self._font
+
+    def render(self, text: str) -> pygame.Surface:
+        """
+        Собирает изображение строки из отрисованных символов
+        :param text: str
+        :return pygame.Surface:
+        """
+        font = self.font
+        images = []
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                glyph = self.glyphs[char] = font.render(char, True, self.color)
+                self.misses += 1
+            images.append(glyph)
+        return join(images, font.get_height())
+
+
+def join(images, height: int) -> pygame.Surface:
+    """
+    Склеивает изображения слева направо на прозрачной поверхности
+    :param images: Iterable[pygame.Surface]
+    :param height: int - минимальная высота результата
+    :return pygame.Surface:
+    """
+    images = list(images)
+    surface = pygame.Surface(
+        (sum(image.get_width() for image in images),
+         max([height] + [image.get_height() for image in images])),
+        pygame.SRCALPHA)
+    x = 0
+    for image in images:
+        # символы не перекрываются, поэтому пиксели копируются как есть,
+        # без повторного смешивания сглаженных краев с прозрачным фоном
+        surface.blit(image, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        x += image.get_width()
+    return surface
+
+
+class TextLabel(pygame.sprite.Sprite):
+    """
+    Надпись строки состояния: неизменная подпись и значение.
+        Значение запрашивается каждый кадр, а изображение пересобирается
+        только при его изменении: подпись отрисована шрифтом один раз,
+        значение собирается из символов атласа.
+        Свойства:
+    atlas: GlyphAtlas
+    getter: Callable[[], Any] - возвращает текущее значение
+    hits: int - кадров без перерисовки
+    prefix: str - подпись перед значением
+    renders: int - сколько раз изображение пересобиралось
+    value: Any - отображаемое значение
+        Методы:
+    render - собирает изображение надписи для значения
+    update - пересобирает изображение, если значение изменилось
+    """
+
+    def __init__(self, group: pygame.sprite.AbstractGroup, prefix: str,
+                 getter: Callable[[], Any],
+                 atlas: Optional[GlyphAtlas] = None) -> None:
+        """
+        :param group: pygame.sprite.AbstractGroup
+        :param prefix: str
+        :param getter: Callable[[], Any]
+        :param atlas: Optional[GlyphAtlas] - по умолчанию status_atlas
+        """
+        super().__init__(group)
+        self.atlas: GlyphAtlas = atlas or status_atlas
+        self.prefix: str = prefix
+        self.getter: Callable[[], Any] = getter
+        self.hits: int = 0
+        self.renders: int = 0
+        # значения еще нет, первое обновление всегда перерисовывает
+        self.value: Any = None
+        self._prefix_image: pygame.Surface = self.atlas.font.render(
+            prefix, True, self.atlas.color)
+        self.image: pygame.Surface = self._prefix_image
+        # прямоугольник по подписи: положение надписи не зависит от значения
+        self.rect = self.image.get_rect()
+
+    def render(self, value: Any) -> pygame.Surface:
+        """
+        Собирает изображение надписи для значения
+        :param value: Any
+        :return pygame.Surface:
+        """
+        return join((self._prefix_image, self.atlas.render(str(value))),
+                    self._prefix_image.get_height())
+
+    def update(self, *args, **kwargs) -> None:
+        value = self.getter()
+        if value == self.value:
+            self.hits += 1
+            return
+        self.value = value
+        self.image = self.render(value)
+        self.renders += 1
+
+
+# символы значений строки состояния
+status_atlas = GlyphAtlas()
@@ -17,7 +17,7 @@ from pygame.locals import *
 
 def get_key():
   while 1:
-    event = pygame.event.poll()
+    event = pygame.event.wait()
     if event.type == KEYDOWN:
       return event.key
     else:
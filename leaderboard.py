@@ -0,0 +1,112 @@
+from typing import List, Optional
+
+import constants
+import database
+
+
+class Leaderboard:
+    """
+    Таблица лучших результатов поверх records.
+        Порог попадания в таблицу и сама таблица читаются из базы
+        один раз и дальше хранятся в памяти: добавление и удаление записей
+        меняют их на месте, а запись в базу уходит в поток записи.
+        Запросы к таблице records выполняет модуль database.
+        Свойства:
+    db: database.Database
+    queries: int - сколько запросов чтения выполнено
+    size: int - сколько лучших результатов показывается
+        Методы:
+    add - добавляет результат
+    clear - удаляет все результаты
+    cutoff - возвращает результат, который нужно превзойти
+    invalidate - сбрасывает закэшированные порог и таблицу
+    qualifies - проверяет, попадает ли результат в таблицу
+    top - возвращает лучшие результаты
+    """
+
+    def __init__(self, db: Optional[database.Database] = None,
+                 size: int = constants.LEADERBOARD_SIZE) -> None:
+        """
+        :param db: Optional[database.Database] - по умолчанию database.db
+        :param size: int
+        """
+        self.db: database.Database = db or database.db
+        self.size: int = size
+        self.queries: int = 0
+        # порог еще не прочитан (None - таблица не заполнена)
+        self._cutoff: Optional[int] = None
+        self._is_cutoff: bool = False
+        self._top: Optional[List[database.Record]] = None
+
+    def cutoff(self) -> Optional[int]:
+        """
+        Возвращает итог последнего места таблицы
+        :return Optional[int]: None, если в таблице есть свободные места
+        """
+        if not self._is_cutoff:
+            self._cutoff = self.db.records_cutoff(self.size)
+            self._is_cutoff = True
+            self.queries += 1
+        return self._cutoff
+
+    def qualifies(self, total: int) -> bool:
+        """
+        Проверяет, попадает ли итог в таблицу лучших результатов
+        :param total: int
+        :return bool:
+        """
+        cutoff = self.cutoff()
+        return cutoff is None or total > cutoff
+
+    def top(self) -> List[database.Record]:
+        """
+        Возвращает лучшие результаты по убыванию итога
+        :return List[database.Record]:
+        """
+        if self._top is None:
+            self._top = self.db.records_top(self.size)
+            self.queries += 1
+        return self._top
+
+    def add(self, name: str, score: int, level: int, difficult_id: int,
+            total: int) -> None:
+        """
+        Ставит результат в очередь записи и добавляет его в таблицу в памяти
+        :param name: str
+        :param score: int
+        :param level: int
+        :param difficult_id: int
+        :param total: int
+        :return None:
+        """
+        top = self.top()
+        record: database.Record = (name, score, level, difficult_id, total)
+        self.db.records_add(record)
+        # порядок как в ORDER BY total DESC: новая запись после равных
+        position = next((i for i, row in enumerate(top) if row[4] < total),
+                        len(top))
+        self._top = (top[:position] + [record] + top[position:])[:self.size]
+        self._cutoff = self._top[-1][4] if len(self._top) == self.size \
+            else None
+        self._is_cutoff = True
+
+    def clear(self) -> None:
+        """
+        Ставит удаление всех результатов в очередь записи
+        :return None:
+        """
+        self.db.records_clear()
+        self._top = []
+        self._cutoff = None
+        self._is_cutoff = True
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает закэшированные порог и таблицу, они будут прочитаны
+            при следующем обращении (после записи очереди)
+        :return None:
+        """
+        self.db.writer.flush()
+        self._cutoff = None
+        self._is_cutoff = False
+        self._top = None
@@ -1,48 +1,41 @@
-import os
-import sqlite3
+import argparse
 import sys
-from copy import copy
-from random import choice, randrange
-from typing import List, Union
+import time
+from random import choice
+from typing import Dict, List, Optional, Tuple
 
 import pygame
 import pygame_gui
 
+import assets
 import constants
+import database
+import engine
+import hud
 import inputbox
-
-# инициализация констант
-pygame.mixer.init()
-
-# Загрузка и настройка звуковых эффектов
-sound_main_theme: pygame.mixer.Sound = pygame.mixer.Sound(
-    os.path.join(constants.MUSIC_PATH, "main_theme.ogg"))
-
-sound_jump: pygame.mixer.Sound = pygame.mixer.Sound(
-    os.path.join(constants.MUSIC_PATH, "jump.ogg"))
-sound_jump.set_volume(0.1)
-
-sound_hit: pygame.mixer.Sound = pygame.mixer.Sound(
-    os.path.join(constants.MUSIC_PATH, "hit.ogg"))
-sound_hit.set_volume(0.1)
-
-sound_line: pygame.mixer.Sound = pygame.mixer.Sound(
-    os.path.join(constants.MUSIC_PATH, "line.ogg"))
-sound_line.set_volume(0.1)
-
-sound_gameover: pygame.mixer.Sound = pygame.mixer.Sound(
-    os.path.join(constants.MUSIC_PATH, "gameover.ogg"))
-
-# Настройка игровых параметров
-pygame.init()
-clock: pygame.time.Clock = pygame.time.Clock()
-screen: pygame.Surface = pygame.display.set_mode(constants.SIZE)
-
-screen_game_over: pygame.Surface = pygame.display.set_mode(constants.SIZE)
-BOMBGENERATE: pygame.event = pygame.USEREVENT + 1
-# интервал будет уменьшаться с ростом скорости и уровня
-CURRENT_BOMB_INTERVAL = constants.BOMBS_INTERVALS
-pygame.key.set_repeat(200, 70)
+import leaderboard
+import menu
+import render
+import replay
+import scenes
+import storage
+import timestep
+from profiling import profiler
+
+# звуковые эффекты: файл и громкость, загружаются при первом обращении
+SOUNDS = {
+    'main_theme': ('main_theme.ogg', 0.1),
+    'jump': ('jump.ogg', 0.1),
+    'hit': ('hit.ogg', 0.1),
+    'line': ('line.ogg', 0.1),
+    'gameover': ('gameover.ogg', None),
+}
+
+# окно и часы создаются при запуске (boot), импорт модуля ничего не загружает
+clock: Optional[pygame.time.Clock] = None
+screen: Optional[pygame.Surface] = None
+# время этапов запуска, мс
+boot_timings: Dict[str, float] = {}
 
 
 # Генерация частиц
@@ -59,99 +52,286 @@ def create_particles(position: [int, int]) -> None:
         Particle(position, choice(numbers), choice(numbers))
 
 
+def sound(name: str) -> pygame.mixer.Sound:
+    """
+    Возвращает звуковой эффект из кэша, при первом обращении
+        инициализирует микшер и загружает файл
+    :param name: str - ключ SOUNDS
+    :return pygame.mixer.Sound:
+    """
+    return assets.cache.get_sound(*SOUNDS[name])
+
+
 # загрузка изображений
-def load_image(name: str, color_key: int = None) -> pygame.Surface:
+def load_image(name: str, color_key: int = None,
+               size: Tuple[int, int] = None) -> pygame.Surface:
     """
     Принимает на входе имя файла и необязательны параметр наличия фона.
-        Преобразует файл в объект pygame.image, и удаляет фоновый цвет
+        Преобразует файл в объект pygame.image, и удаляет фоновый цвет.
+        Изображения берутся из общего кэша assets.cache, поэтому
+        возвращаемую поверхность нельзя изменять
     :param name: str
     :param color_key: int
+    :param size: Tuple[int, int] - размер масштабированного варианта
     :return image: pygame.Surface
     """
-    fullname: str = os.path.join(constants.IMAGES_PATH, name)
-    try:
-        image = pygame.image.load(fullname).convert()
-    except pygame.error as message:
-        print('Cannot load image:', name)
-        raise SystemExit(message)
-    except FileNotFoundError as message:
-        print('Cannot found file:', name)
-        raise SystemExit(message)
-
-    if color_key is not None:
-        if color_key == -1:
-            color_key = image.get_at((0, 0))
-        image.set_colorkey(color_key)
-    else:
-        image = image.convert_alpha()
-    return image
-
-
-all_sprites = pygame.sprite.Group()
+    return assets.cache.get_image(name, color_key, size)
+
+
 gameover_group = pygame.sprite.Group()
 game_status = pygame.sprite.Group()
-tiles_group = pygame.sprite.Group()
-player_group = pygame.sprite.Group()
+particles_group = pygame.sprite.Group()
 cursor_group = pygame.sprite.Group()
 
-color_box = [
-    'box-black.png',
-    'box-blue.png',
-    'box-cyan.png',
-    'box-green.png',
-    'box-pink.png',
-    'box-red.png',
-    'box-yellow.png'
-]
-
 
 # выход из программы
 def terminate() -> None:
     """
-    Выход из программы
+    Выход из программы, ожидающие записи в базу дописываются,
+        недописанная запись сессии сохраняется
     :return None:
     """
+    if game is not None:
+        game.save_recording()
+    storage.writer.close()
+    database.db.close()
     pygame.quit()
     sys.exit()
 
 
+# экраны меню собираются один раз и открываются повторно
+def build_game_over_scene(scene: scenes.Scene) -> None:
+    """
+    Собирает экран конца игры
+    :param scene: scenes.Scene
+    :return None:
+    """
+    fon: pygame.Surface = load_image(
+        'gameover.png',
+        size=(constants.SCREEN_WIDTH,
+              load_image('gameover.png').get_height())
+    )
+    scene.background = fon
+    y = constants.SCREEN_HEIGHT // 2 - fon.get_height() // 2
+    scene.widgets['restart'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             y + fon.get_height()),
+            (100, 50)
+        ),
+        text='Restart',
+        manager=scene.manager
+    )
+    scene.widgets['results'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 2 - 50,
+             y + fon.get_height()),
+            (100, 50)
+        ),
+        text='Results',
+        manager=scene.manager
+    )
+    scene.widgets['exit'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (3 * constants.SCREEN_WIDTH // 4 - 50,
+             y + fon.get_height()),
+            (100, 50)
+        ),
+        text='Quit',
+        manager=scene.manager
+    )
+
+
+def build_pause_scene(scene: scenes.Scene) -> None:
+    """
+    Собирает экран паузы
+    :param scene: scenes.Scene
+    :return None:
+    """
+    scene.background = load_image('background-start.jpg', size=constants.SIZE)
+    scene.widgets['control'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (3 * constants.SCREEN_WIDTH // 4 - 50,
+             3.5 * constants.SCREEN_HEIGHT // 4),
+            (150, 50)
+        ),
+        text='Setup controller',
+        manager=scene.manager
+    )
+    scene.widgets['restart'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             3 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Restart',
+        manager=scene.manager
+    )
+    scene.widgets['resume'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             2.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Resume',
+        manager=scene.manager
+    )
+    scene.widgets['exit'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             3.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Quit',
+        manager=scene.manager
+    )
+
+
+def build_result_scene(scene: scenes.Scene) -> None:
+    """
+    Собирает экран результатов (таблица заполняется при открытии)
+    :param scene: scenes.Scene
+    :return None:
+    """
+    scene.background = load_image('results.jpg', size=constants.SIZE)
+    scene.widgets['back'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4,
+             2.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Back',
+        manager=scene.manager
+    )
+    scene.widgets['clear'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4,
+             3 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Clear',
+        manager=scene.manager
+    )
+    scene.widgets['exit'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4,
+             3.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Quit',
+        manager=scene.manager
+    )
+
+
+def build_start_scene(scene: scenes.Scene) -> None:
+    """
+    Собирает стартовый экран
+    :param scene: scenes.Scene
+    :return None:
+    """
+    intro_text: list = [
+        'Правила игры:',
+        'С неба сбрасывают коробки. Герой должен расставлять',
+        'их в линию, чтобы не дать вырасти столбикам до неба.',
+        'При попадании по персонажу коробкой теряются жизни',
+        '', '',
+        '      Уровень сложности:'
+    ]
+    # заголовок и правила не меняются, их рисуем на фоне один раз
+    scene.background = menu.compose(
+        load_image('background-start.jpg', size=constants.SIZE),
+        [(['Коробочки'], 35, None, 10, 0),
+         (intro_text, 25, 10, 30, 5)]
+    )
+    item_list = database.db.difficult_names()
+    scene.widgets['control'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (3 * constants.SCREEN_WIDTH // 4 - 50,
+             3.5 * constants.SCREEN_HEIGHT // 4),
+            (150, 50)
+        ),
+        text='Setup controller',
+        manager=scene.manager
+    )
+    scene.widgets['difficult_state'] = pygame_gui.elements.UISelectionList(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             1.5 * constants.SCREEN_HEIGHT // 4 + 5),
+            (100, 108)
+        ),
+        item_list=item_list,
+        manager=scene.manager
+    )
+    scene.widgets['start'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             2.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Start',
+        manager=scene.manager
+    )
+    scene.widgets['results'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             3 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Results',
+        manager=scene.manager
+    )
+    scene.widgets['exit'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(
+            (constants.SCREEN_WIDTH // 4 - 50,
+             3.5 * constants.SCREEN_HEIGHT // 4),
+            (100, 50)
+        ),
+        text='Quit',
+        manager=scene.manager
+    )
+
+
+scenes.registry.register('game_over', build_game_over_scene)
+scenes.registry.register('pause', build_pause_scene)
+scenes.registry.register('result', build_result_scene)
+scenes.registry.register('start', build_start_scene)
+
+
 # класс игры
-class Game:
+class Game(engine.Engine):
     """
-    Класс отвечающий за состояние игры.
+    Класс отвечающий за состояние игры: окно, звук и экраны поверх
+        игровой логики engine.Engine.
         Свойства:
-    player: Player
-    board: List[List[Union[int, Tile]]]
     game_over_screen: GameOver
+    leaderboard: leaderboard.Leaderboard - таблица рекордов
     status_health: List[StatusHearts]
-    is_game_over: bool
     is_paused: bool
         Методы:
-    check_line - проверяет нет ли на поле полностью заполненных линий
-    check_game_over - проверяет окончание игры
-    delete_row - проводит удаление строки со смещением всех объектов
+    on_hit - звук, частицы и потеря жизни при попадании коробки в героя
+    on_jump - звук прыжка
+    on_lines - звук удаления строк
     reset_game - cбрасывает игру на начальные настройки перед рестартом
+    save_recording - сохраняет запись сессии
     set_difficult - Настраивает игровой процесс
                     в соответствии с уровнем сложности
     screen_game_over - игровой цикл экрана конца игры
     screen_pause - игровой цикл экрана паузы
     screen_result - игровой цикл экрана результатов
     screen_start - игровой цикл стартового экрана
-    update - метод для обновления состояния игры
+    draw - отрисовка игрового мира с промежуточным положением спрайтов
+    show_screens - открывает экран меню, если игра не идет
+    simulate - шаг симуляции
+    update - кадр из одного шага симуляции
     """
 
     def __init__(self):
-        self.board: List[List[Union[int, Tile]]] = [[0] * constants.COLUMNS
-                                                    for _ in
-                                                    range(constants.ROWS)]
-        self.con: sqlite3.connect = sqlite3.connect(constants.DB_NAME)
+        super().__init__()
+        self.leaderboard: leaderboard.Leaderboard = \
+            leaderboard.Leaderboard(database.db)
         self.difficult_id = None
-        self.level: int = 0
-        self.is_game_over: bool = False
         self.is_paused: bool = False
         self.is_start_screen: bool = True
-        self.player: Player = Player(load_image("dragon.png"), 8, 2)
-        self.score: int = 0
         self.status_health: List[StatusHearts] = [StatusHearts() for _ in
                                                   range(self.player.health)]
         self.status_score: StatusScore = StatusScore()
@@ -161,85 +341,60 @@ class Game:
             obj.rect.x = obj.rect.width * i * 0.5
             obj.rect.y = 10
 
-    def check_game_over(self) -> None:
+    def on_hit(self, tile: engine.Tile) -> None:
         """
-        Проверка состояния игры на окончание
+        Звук, частицы и потеря сердечка при попадании коробки в героя
+        :param tile: engine.Tile
         :return None:
         """
-        self.is_game_over = any(self.board[1]) or not self.player.health
+        sound('hit').play()
+        create_particles((tile.rect.centerx, tile.rect.top))
+        self.status_health.pop().kill()
 
-    def check_line(self) -> None:
+    def on_jump(self) -> None:
         """
-        Если в строке все элементы заполнены, то строка удаляется
+        Звук прыжка героя
         :return None:
         """
-        for i, row in enumerate(self.board):
-            if all(row):
-                self.delete_row(i)
+        sound('jump').play()
 
-    def delete_row(self, row: int) -> None:
+    def on_lines(self, count_rows: int) -> None:
         """
-        Принимает номер строки, которую нужно удалить.
-            Перед удалением строки, все элементы удаляются из групп спрайтов
-        :param row:int
+        Звук удаления строк
+        :param count_rows: int
         :return None:
         """
-        # очищаем строку, удаляем спрайты
-        for i in range(constants.COLUMNS):
-            self.board[row][i].kill()
-            self.board[row][i] = 0
-
-        sound_line.play()
-
-        # удаляем нужную строку
-        del self.board[row]
-
-        # увеличиваем счетчик очков и уровень (при необходимости)
-        self.score += constants.COLUMNS
-        if self.score % constants.LINE_PER_LEVEL == 0:
-            self.level += 1
-            Tile.increase_speed()
-
-        # создаем новое игровое поле после удаления строки
-        new_board = []
-        for r in range(constants.ROWS - 1):
-            line = []
-            for tile in self.board[r]:
-                if tile:
-                    # смещаем спрайт на нужное расстояние
-                    tile.rect.y = constants.tile_height * r - \
-                                  constants.DOWN_BORDER
-                line.append(tile)
-            new_board.append(line)
-        # добавляем пустую верхнюю строку
-        new_board.append([0] * constants.COLUMNS)
-        self.board.clear()
-        for r in new_board:
-            self.board.append(r)
+        sound('line').play()
 
     def reset_game(self) -> None:
         """
         Сбрасывает игру на начальные настройки перед рестартом
         :return None:
         """
-        sound_main_theme.stop()
-        self.player.kill()
-        self.board: List[List[Union[int, Tile]]] = [[0] * constants.COLUMNS
-                                                    for _ in
-                                                    range(constants.ROWS)]
+        # рестарт с экрана паузы не должен терять запись прерванной сессии
+        self.save_recording()
+        sound('main_theme').stop()
         for obj in self.status_health:
             obj.kill()
         self.status_score.kill()
         self.status_level.kill()
-        self.score: int = 0
-        self.level: int = 0
-        for i, obj in enumerate(self.status_health):
-            obj.rect.x = obj.rect.width * i * 0.5
-            obj.rect.y = 10
-        for obj in tiles_group:
-            obj.kill()
-        Tile.reset_v()
+        # движок пересоздает группы и поле, прежние спрайты уходят вместе
+        # с ними; фон для того же режима экрана остается собранным
+        render.layers.invalidate_settled()
         self.__init__()
+        self.reset_speed()
+
+    def save_recording(self) -> Optional[str]:
+        """
+        Сохраняет запись сессии, если она велась, и прекращает запись
+        :return Optional[str]: путь к файлу записи, None - запись не велась
+        """
+        if self.recording is None:
+            return None
+        self.recording.score = self.score
+        path = self.recording.save()
+        self.recording = None
+        return path
 
     def set_difficult(self, difficult_name) -> None:
         """
@@ -247,20 +402,13 @@ class Game:
         :param difficult_name: str
         :return None:
         """
-        difficult_name = difficult_name or constants.DEFAULT_DIFFICULT
-        cur = self.con.cursor()
-        difficult_line = cur.execute(
-            'SELECT * '
-            'FROM difficult '
-            f'WHERE difficult_name="{difficult_name}" '
-        ).fetchone()
-        self.difficult_id, _, start_v, interval = difficult_line
-        constants.START_V = start_v
-        constants.BOMBS_INTERVALS = int(interval)
-        global CURRENT_BOMB_INTERVAL
-        CURRENT_BOMB_INTERVAL = constants.BOMBS_INTERVALS
-        pygame.time.set_timer(BOMBGENERATE, 0)
-        Tile.reset_v()
+        difficult = database.db.difficult(
+            difficult_name or constants.DEFAULT_DIFFICULT)
+        self.difficult_id = difficult.id
+        constants.START_V = difficult.start_v
+        constants.BOMBS_INTERVALS = difficult.bomb_interval
+        constants.SPAWN_CURVE = (difficult.spawn_pitch, difficult.spawn_floor)
+        self.reset_speed()
 
     # игровой цикл экрана конца игры
     def screen_game_over(self) -> None:
@@ -268,50 +416,20 @@ class Game:
         Запускает игровой цикл для отрисовки окна проигрыша
         :return None:
         """
-        manager: pygame_gui.UIManager = pygame_gui.UIManager(constants.SIZE)
-
-        fon: pygame.Surface = pygame.transform.scale(
-            load_image('gameover.png'), (
-                constants.SCREEN_WIDTH,
-                load_image('gameover.png').get_height()
-            )
-        )
+        scene: scenes.Scene = scenes.registry.enter('game_over')
+        manager: pygame_gui.UIManager = scene.manager
+        fon: pygame.Surface = scene.background
         x = -fon.get_width()
         y = constants.SCREEN_HEIGHT // 2 - fon.get_height() // 2
         screen.blit(fon, (x, y))
         speed = 5
-        restart_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 y + fon.get_height()),
-                (100, 50)
-            ),
-            text='Restart',
-            manager=manager
-        )
-        results_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 2 - 50,
-                 y + fon.get_height()),
-                (100, 50)
-            ),
-            text='Results',
-            manager=manager
-        )
-        exit_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (3 * constants.SCREEN_WIDTH // 4 - 50,
-                 y + fon.get_height()),
-                (100, 50)
-            ),
-            text='Quit',
-            manager=manager
-        )
+        restart_button = scene['restart']
+        results_button = scene['results']
+        exit_button = scene['exit']
         name = None
-        que = 'INSERT INTO records(name, score, level, difficult_id, total) ' \
-              'VALUES(?, ?, ?, ?, ?)'
+        loop = menu.MenuLoop()
         while True:
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     terminate()
                 if event.type == pygame.MOUSEMOTION:
@@ -329,26 +447,21 @@ class Game:
                         if event.ui_element == exit_button:
                             terminate()
                 manager.process_events(event)
+            if speed:
+                # пока картинка выезжает, экран перерисовывается каждый кадр
+                loop.keep_active()
+            elif not loop.is_active():
+                continue
             if x + fon.get_width() >= constants.SCREEN_WIDTH:
                 speed = 0
                 total = self.score * self.difficult_id
-                minimum_cur = self.con.cursor()
-                current_minimum_top = minimum_cur.execute(
-                    'SELECT MIN(total) '
-                    'FROM records '
-                    'ORDER BY total DESC '
-                    'LIMIT 7'
-                ).fetchone()[0]
-                if not name and total > current_minimum_top:
+                # порог читается из базы один раз, дальше берется из кэша
+                if not name and self.leaderboard.qualifies(total):
                     name = inputbox.ask(screen, 'Your name')
                     if not name:
                         continue
-                    cur = self.con.cursor()
-                    cur.execute(
-                        que,
-                        (name, self.score, self.level, self.difficult_id, total)
-                    )
-                    self.con.commit()
+                    self.leaderboard.add(name, self.score, self.level,
+                                         self.difficult_id, total)
                 manager.update(constants.FPS)
                 manager.draw_ui(screen)
             x += speed
@@ -361,8 +474,7 @@ class Game:
             ) and pygame.mouse.get_focused():
                 cursor_group.draw(screen)
                 cursor_group.update()
-            pygame.display.flip()
-            clock.tick(constants.FPS)
+            loop.present()
 
     # игровой цикл экрана паузы
     def screen_pause(self) -> None:
@@ -370,68 +482,24 @@ class Game:
         Запускает игровой цикл для отрисовки окна паузы
         :return None:
         """
-        manager: pygame_gui.UIManager = pygame_gui.UIManager(constants.SIZE)
-        control_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (3 * constants.SCREEN_WIDTH // 4 - 50,
-                 3.5 * constants.SCREEN_HEIGHT // 4),
-                (150, 50)
-            ),
-            text='Setup controller',
-            manager=manager
-        )
-        restart_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 3 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Restart',
-            manager=manager
-        )
-        resume_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 2.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Resume',
-            manager=manager
-        )
-        exit_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 3.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Quit',
-            manager=manager
-        )
+        scene: scenes.Scene = scenes.registry.enter('pause')
+        manager: pygame_gui.UIManager = scene.manager
+        control_button = scene['control']
+        restart_button = scene['restart']
+        resume_button = scene['resume']
+        exit_button = scene['exit']
         intro_text: list = [
             'Пауза', '',
             f'Score: {self.score}',
             f'Осталось жизней: {len(self.status_health)}',
         ]
 
-        fon: pygame.Surface = pygame.transform.scale(
-            load_image('background-start.jpg'), (
-                constants.SCREEN_WIDTH,
-                constants.SCREEN_HEIGHT
-            )
-        )
+        # текст не меняется, пока открыта пауза
+        fon: pygame.Surface = menu.compose(scene.background,
+                                           [(intro_text, 35, 10, 50, 10)])
+        loop = menu.MenuLoop()
         while True:
-            screen.blit(fon, (0, 0))
-            font = pygame.font.Font(None, 35)
-            text_coord: int = 50
-            for line in intro_text:
-                string_rendered = font.render(line, True, pygame.Color('white'))
-                intro_rect = string_rendered.get_rect()
-                text_coord += 10
-                intro_rect.top = text_coord
-                intro_rect.x = 10
-                text_coord += intro_rect.height
-                screen.blit(string_rendered, intro_rect)
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     terminate()
                 if event.type == pygame.MOUSEMOTION:
@@ -455,13 +523,15 @@ class Game:
                         if event.ui_element == exit_button:
                             terminate()
                 manager.process_events(event)
+            if not loop.is_active():
+                continue
+            screen.blit(fon, (0, 0))
             manager.update(constants.FPS)
             manager.draw_ui(screen)
             if pygame.mouse.get_focused():
                 cursor_group.draw(screen)
                 cursor_group.update()
-            pygame.display.flip()
-            clock.tick(constants.FPS)
+            loop.present()
 
     # игровой цикл экрана результатов
     def screen_result(self) -> None:
@@ -469,78 +539,24 @@ class Game:
         Запускает игровой цикл для отрисовки окна результатов
         :return None:
         """
-        screen_result = pygame.display.set_mode(constants.SIZE)
-        manager: pygame_gui.UIManager = pygame_gui.UIManager(constants.SIZE)
+        screen_result = screen
+        scene: scenes.Scene = scenes.registry.enter('result')
+        manager: pygame_gui.UIManager = scene.manager
         item_list = ['Name    Score    Level    Difficult    Total']
-        item_list += [
-            ''.join([str(x).ljust(13, ' ') for x in difficult_name[1:]]) for
-            difficult_name in
-            self.con.cursor().execute(
-                'SELECT * '
-                'FROM records '
-                'ORDER BY total DESC '
-                'LIMIT 7'
-            ).fetchall()]
+        item_list += [''.join([str(x).ljust(13, ' ') for x in record])
+                      for record in self.leaderboard.top()]
         cancel_button_text = '#confirmation_dialog.#cancel_button'
         confirm_button_text = '#confirmation_dialog.#confirm_button'
-        back_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4,
-                 2.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Back',
-            manager=manager
-        )
-        clear_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4,
-                 3 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Clear',
-            manager=manager
-        )
-        exit_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4,
-                 3.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Quit',
-            manager=manager
-        )
-        fon: pygame.Surface = pygame.transform.scale(
-            load_image('results.jpg'), (
-                constants.SCREEN_WIDTH,
-                constants.SCREEN_HEIGHT
-            )
-        )
-        screen_result.blit(fon, (0, 0))
-        font = pygame.font.Font(None, 25)
-        text_coord: int = 100
-        for line in item_list:
-            string_rendered = font.render(line, True, pygame.Color('white'))
-            intro_rect = string_rendered.get_rect()
-            text_coord += 5
-            intro_rect.top = text_coord
-            intro_rect.x = 150
-            text_coord += intro_rect.height
-            screen_result.blit(string_rendered, intro_rect)
+        back_button = scene['back']
+        clear_button = scene['clear']
+        exit_button = scene['exit']
+        background: pygame.Surface = scene.background
+        # таблица меняется только при очистке базы
+        fon: pygame.Surface = menu.compose(background,
+                                           [(item_list, 25, 150, 100, 5)])
+        loop = menu.MenuLoop()
         while True:
-            screen.fill('black')
-            screen_result.blit(fon, (0, 0))
-            font = pygame.font.Font(None, 25)
-            text_coord: int = 100
-            for line in item_list:
-                string_rendered = font.render(line, True, pygame.Color('white'))
-                intro_rect = string_rendered.get_rect()
-                text_coord += 5
-                intro_rect.top = text_coord
-                intro_rect.x = 150
-                text_coord += intro_rect.height
-                screen_result.blit(string_rendered, intro_rect)
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     terminate()
                 if event.type == pygame.MOUSEMOTION:
@@ -565,54 +581,47 @@ class Game:
                         if event.ui_object_id == confirm_button_text:
                             item_list = [
                                 'Name    Score    Level    Difficult    Total']
-                            self.con.cursor().execute(
-                                'DELETE FROM records'
-                            ).connection.commit()
+                            fon = menu.compose(background,
+                                               [(item_list, 25, 150, 100, 5)])
+                            self.leaderboard.clear()
                         if event.ui_object_id == cancel_button_text:
                             pass
                         if event.ui_element == exit_button:
                             terminate()
                 manager.process_events(event)
+            if not loop.is_active():
+                continue
+            screen_result.blit(fon, (0, 0))
             manager.update(constants.FPS)
             manager.draw_ui(screen)
             if pygame.mouse.get_focused():
                 cursor_group.draw(screen)
                 cursor_group.update()
-            pygame.display.flip()
-            clock.tick(constants.FPS)
+            loop.present()
 
     def screen_setup_control(self):
         control_image = {
-            'control-right.jpg': constants.RIGHT_KEY,
-            'control-left.jpg': constants.LEFT_KEY,
-            'control-jump.jpg': constants.UP_KEY,
+            'control-right.jpg': 'move_right',
+            'control-left.jpg': 'move_left',
+            'control-jump.jpg': 'move_up',
         }
-        for filename, const_key in control_image.items():
-            fon: pygame.Surface = pygame.transform.scale(
-                load_image(filename), (
-                    constants.SCREEN_WIDTH,
-                    constants.SCREEN_HEIGHT
-                )
-            )
+        for filename, action in control_image.items():
+            fon: pygame.Surface = load_image(filename, size=constants.SIZE)
             running = True
+            loop = menu.MenuLoop()
             while running:
-                screen.fill('black')
-                screen.blit(fon, (0, 0))
-                for event in pygame.event.get():
+                for event in loop.events():
                     if event.type == pygame.QUIT:
                         terminate()
                     if event.type == pygame.KEYDOWN:
                         running = False
-                        cur = self.con.cursor()
-                        cur.execute(
-                            'UPDATE controller '
-                            f'SET key={event.key} '
-                            f'WHERE key={const_key}'
-                        )
-                        self.con.commit()
-                pygame.display.flip()
-                clock.tick(constants.FPS)
-        constants.setup_controller()
+                        database.db.set_control(action, event.key)
+                if not loop.is_active():
+                    continue
+                screen.fill('black')
+                screen.blit(fon, (0, 0))
+                loop.present()
+        constants.setup_controller(database.db.controls)
 
     # игровой цикл стартового экрана
     def screen_start(self) -> None:
@@ -620,94 +629,17 @@ class Game:
         Запускает игровой цикл для отрисовки стартового окна
         :return None:
         """
-        manager: pygame_gui.UIManager = pygame_gui.UIManager(constants.SIZE)
-        item_list = [difficult_name[0] for difficult_name in
-                     self.con.cursor().execute(
-                         'SELECT difficult_name '
-                         'FROM difficult '
-                         'ORDER BY id ASC'
-                     ).fetchall()]
-        control_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (3 * constants.SCREEN_WIDTH // 4 - 50,
-                 3.5 * constants.SCREEN_HEIGHT // 4),
-                (150, 50)
-            ),
-            text='Setup controller',
-            manager=manager
-        )
-        difficult_state = pygame_gui.elements.ui_selection_list.UISelectionList(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 1.5 * constants.SCREEN_HEIGHT // 4 + 5),
-                (100, 108)
-            ),
-            item_list=item_list,
-            manager=manager
-        )
-        start_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 2.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Start',
-            manager=manager
-        )
-        results_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 3 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Results',
-            manager=manager
-        )
-        exit_button = pygame_gui.elements.UIButton(
-            relative_rect=pygame.Rect(
-                (constants.SCREEN_WIDTH // 4 - 50,
-                 3.5 * constants.SCREEN_HEIGHT // 4),
-                (100, 50)
-            ),
-            text='Quit',
-            manager=manager
-        )
-        intro_text: list = [
-            'Правила игры:',
-            'С неба сбрасывают коробки. Герой должен расставлять',
-            'их в линию, чтобы не дать вырасти столбикам до неба.',
-            'При попадании по персонажу коробкой теряются жизни',
-            '', '',
-            '      Уровень сложности:'
-        ]
-
-        fon: pygame.Surface = pygame.transform.scale(
-            load_image('background-start.jpg'), (
-                constants.SCREEN_WIDTH,
-                constants.SCREEN_HEIGHT
-            )
-        )
-
+        scene: scenes.Scene = scenes.registry.enter('start')
+        manager: pygame_gui.UIManager = scene.manager
+        control_button = scene['control']
+        difficult_state = scene['difficult_state']
+        start_button = scene['start']
+        results_button = scene['results']
+        exit_button = scene['exit']
+        fon: pygame.Surface = scene.background
+        loop = menu.MenuLoop()
         while True:
-            screen.blit(fon, (0, 0))
-            font = pygame.font.Font(None, 35)
-            string_rendered = font.render('Коробочки', True,
-                                          pygame.Color('white'))
-            intro_rect = string_rendered.get_rect()
-            intro_rect.centerx = constants.SCREEN_WIDTH // 2
-            intro_rect.y = 10
-            screen.blit(string_rendered, intro_rect)
-            font = pygame.font.Font(None, 25)
-            text_coord: int = 30
-            for line in intro_text:
-                string_rendered = font.render(line, True, pygame.Color('white'))
-                intro_rect = string_rendered.get_rect()
-                text_coord += 5
-                intro_rect.top = text_coord
-                intro_rect.x = 10
-                text_coord += intro_rect.height
-                screen.blit(string_rendered, intro_rect)
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     terminate()
                 if event.type == pygame.MOUSEMOTION:
@@ -719,8 +651,10 @@ class Game:
                         if event.ui_element == start_button:
                             self.set_difficult(
                                 difficult_state.get_single_selection())
-                            sound_main_theme.play(loops=-1)
-                            sound_main_theme.set_volume(0.1)
+                            if constants.REPLAY_RECORD:
+                                replay.start(self)
+                            warm_up()
+                            sound('main_theme').play(loops=-1)
                             self.is_start_screen = False
                             return
                         if event.ui_element == results_button:
@@ -730,262 +664,83 @@ class Game:
                         if event.ui_element == exit_button:
                             terminate()
                 manager.process_events(event)
+            if not loop.is_active():
+                continue
+            screen.blit(fon, (0, 0))
             manager.update(constants.FPS)
             manager.draw_ui(screen)
             if pygame.mouse.get_focused():
                 cursor_group.draw(screen)
                 cursor_group.update()
-            pygame.display.flip()
-            clock.tick(constants.FPS)
+            loop.present()
 
-    def update(self, keys: [bool] = None, *args, **kwargs) -> None:
+    def show_screens(self) -> bool:
         """
-        Отрисовка игрового мира
-        :param keys: Sequence [bool]
-        :param args:
-        :param kwargs:
-        :return None:
+        Открывает экран меню, если игра не идет: конец игры,
+            стартовый экран или пауза
+        :return bool: был ли открыт экран
         """
         self.check_game_over()
         if self.is_game_over:
-            sound_main_theme.stop()
-            sound_gameover.play()
+            self.save_recording()
+            sound('main_theme').stop()
+            sound('gameover').play()
             self.screen_game_over()
-            return
-        if self.is_start_screen:
+        elif self.is_start_screen:
             self.screen_start()
-            return
-        if self.is_paused:
+        elif self.is_paused:
             self.screen_pause()
-            return
-        fon = pygame.transform.scale(load_image('background.png'),
-                                     (constants.SCREEN_WIDTH,
-                                      constants.SCREEN_HEIGHT))
-        screen.blit(fon, (0, 0))
-        tiles_group.draw(screen)
-        player_group.draw(screen)
-        game_status.draw(screen)
-        if not self.is_paused:
-            game_status.update()
-            all_sprites.update(keys)
-        self.check_line()
-
-
-# класс главного героя
-class Player(pygame.sprite.Sprite):
-    """
-    Класс отвечает за настройку и состояние главного героя.
-        Методы:
-    cut_sheet - раскадровка из карты спрайта
-    get_coords - возвращает координаты тайла на игровом поле
-    have_border_down - проверяет есть ли под героем объект или край экрана
-    is_can_jump - проверяет возможность прыгнуть вверх
-    is_can_move_left - проверяет возможность пойти налево
-    is_can_move_right - проверяет возможность пойти направо
-    move - управляет перемещением героя по полю
-    update - обновляет состояние главного героя после действий пользователя
-    """
+        else:
+            return False
+        render.renderer.invalidate()
+        return True
 
-    def __init__(self, sheet: pygame.Surface, columns: int, rows: int):
+    def simulate(self, keys: [bool] = None) -> None:
         """
-        :param sheet: pygame.Surface:
-        :param columns: int:
-        :param rows: int:
-        """
-        super().__init__(player_group, all_sprites)
-        # количество циклов повторений анимации на экран
-        self.count_animate: int = 4
-        self.frames = []
-        self.cut_sheet(sheet, columns, rows)
-        self.cur_frame: int = 0
-        self.gravity: float = constants.GRAVITY
-        self.health: int = constants.HEALTHS
-        self.image: pygame.Surface = self.frames[self.cur_frame]
-        self.is_flip: bool = False  # статус разворота спрайта
-        self.is_in_air: bool = False  # статус прыжка
-        self.jump: float = 1.5 * constants.tile_height
-        self.mask: pygame.mask = pygame.mask.from_surface(self.image)
-        self.rect = self.rect.move(
-            screen.get_rect().centerx - self.image.get_width() // 2,
-            (screen.get_rect().bottom -
-             self.image.get_height() -
-             constants.DOWN_BORDER)
-        )
-        self.col, self.row = self.get_coords()
-        self.v: int = 1  # скорость
-
-    def cut_sheet(self, sheet: pygame.Surface, columns: int, rows: int) -> None:
-        """
-        Раскадровка из карты спрайта
-        :param sheet:
-        :param columns:
-        :param rows:
+        Один шаг симуляции: герой, коробки и частицы
+        :param keys: Sequence [bool]
         :return None:
         """
-        self.rect = pygame.Rect(0, 0, sheet.get_width() // columns,
-                                sheet.get_height() // rows)
-        for j in range(rows):
-            for i in range(columns):
-                frame_location = (self.rect.w * i, self.rect.h * j)
-                frame = pygame.transform.scale(
-                    sheet.subsurface(pygame.Rect(
-                        frame_location, self.rect.size)
-                    ),
-                    (constants.tile_width, constants.tile_height)
-                )
-                self.frames.append(frame)
-
-    def get_coords(self) -> [int, int]:
-        """
-        Возвращает координаты тайла на игровом поле (в клетках: столбец, строка)
-        :return: tuple[int, int]
-        """
-        return self.rect.x * constants.COLUMNS // constants.SCREEN_WIDTH, \
-            self.rect.y * constants.ROWS // constants.SCREEN_HEIGHT
+        render.interpolator.capture((self.falling_group, self.player_group,
+                                     particles_group))
+        self.step(keys)
+        particles_group.update()
+        profiler.lap('particles')
 
-    def is_can_jump(self) -> bool:
+    def draw(self, alpha: float = 1.0) -> None:
         """
-        Проверяет возможность прыгнуть вверх
-        :return bool:
+        Отрисовка игрового мира между последними шагами симуляции
+        :param alpha: float - доля шага после последнего шага (1 - без
+                              промежуточного положения)
+        :return None:
         """
-        return self.rect.top - self.jump > 0 and not self.is_in_air
+        render.layers.stats.begin_frame()
+        # лежащие коробки уже нарисованы на слое поверх фона
+        background = render.layers.settled(screen, self.tiles_group,
+                                           self.board.version)
+        profiler.lap('layers')
+        moving = (self.falling_group, self.player_group, particles_group)
+        moved = render.interpolator.apply(moving, alpha)
+        render.renderer.draw(screen, background, moving + (game_status,),
+                             render.layers.settled_dirty)
+        render.interpolator.restore(moved)
+        profiler.lap('draw')
+        game_status.update()
+        profiler.lap('hud')
 
-    def is_can_move_left(self) -> bool:
-        """
-        Проверяет возможность пойти налево
-        :return: bool
-        """
-        indx = self.rect.collidelist(
-            [tile.rect for tile in tiles_group])
-        ok = False
-        if indx >= 0:
-            collide_tile = [tile.rect for tile in tiles_group][indx]
-            x = self.rect.left - constants.STEP
-            top = self.rect.top - constants.ERROR_RATE
-            y = self.rect.bottom - constants.ERROR_RATE
-            ok = collide_tile.collidepoint(x + constants.STEP, top) or \
-                 collide_tile.collidepoint(x + constants.STEP, y)
-        return self.col >= 0 and self.rect.left >= 0 and not \
-            game.board[self.row][self.col] and not ok
-
-    def is_can_move_right(self) -> bool:
-        """
-        Проверяет возможность пойти направо
-        :return: bool
-        """
-        indx = self.rect.collidelist(
-            [tile.rect for tile in tiles_group])
-        ok = False
-        if indx >= 0:
-            collide_tile = [tile.rect for tile in tiles_group][indx]
-            x = self.rect.right + constants.STEP
-            top = self.rect.top - constants.ERROR_RATE
-            y = self.rect.bottom - constants.ERROR_RATE
-            ok = collide_tile.collidepoint(x + constants.STEP, top) or \
-                 collide_tile.collidepoint(x + constants.STEP, y)
-        right_col = (
-                (self.rect.centerx + self.rect.width // 4) *
-                constants.COLUMNS // constants.SCREEN_WIDTH
-        )
-        return (right_col < constants.COLUMNS and
-                self.rect.right < constants.SCREEN_WIDTH and
-                not game.board[self.row][right_col] and
-                not ok)
-
-    def have_border_down(self) -> bool:
-        """
-        Проверяет есть ли под героем объект или край экрана
-        :return: bool
-        """
-        move_rect = copy(self.rect)
-        move_rect.bottom += self.v + self.gravity
-        indx = move_rect.collidelist(
-            [tile.rect for tile in tiles_group])
-        ok = False
-        if indx >= 0:
-            collide_tile = [tile.rect for tile in tiles_group][indx]
-            x = move_rect.centerx
-            y = move_rect.bottom
-            ok = collide_tile.collidepoint(x, y + self.v + self.gravity)
-        return ok or not self.rect.colliderect(constants.screen_rect)
-
-    def have_border_up(self) -> int:
-        """
-        Проверяет есть ли над героем объект
-        :return: bool
-        """
-        move_rect = copy(self.rect)
-        tmp = move_rect.top
-        indx = 0
-        while move_rect.top != tmp + self.jump:
-            indx = move_rect.collidelist(
-                [tile.rect for tile in tiles_group])
-            move_rect.top += 1
-            if indx >= 0:
-                break
-        ok = -1
-        if indx >= 0:
-            collide_tile = [tile.rect for tile in tiles_group][indx]
-            x = move_rect.centerx
-            y = move_rect.top
-            ok = collide_tile.collidepoint(x, y)
-        return ok
-
-    def move(self, keys: [bool]) -> None:
-        """
-        Управляет перемещением героя по полю
-        :param keys: [bool]
-        :return:
-        """
-        if keys[constants.LEFT_KEY]:
-            self.is_flip = False
-            if self.is_can_move_left():
-                self.rect.x -= constants.STEP
-        if keys[constants.RIGHT_KEY]:
-            self.is_flip = True
-            if self.is_can_move_right():
-                self.rect.x += constants.STEP
-        if keys[constants.UP_KEY]:
-            if self.is_can_jump():
-                sound_jump.play()
-                self.rect.y -= self.jump
-                self.is_in_air = True
-                if self.have_border_up() >= 0:
-                    collide_tiles = pygame.sprite.spritecollide(self,
-                                                                tiles_group,
-                                                                False)
-                    if len(collide_tiles) >= 1:
-                            collide_tiles[0].hit_player()
-
-    def update(self, *args, **kwargs) -> None:
+    def update(self, keys: [bool] = None, *args, **kwargs) -> None:
         """
-        Обновляет состояние главного героя после действий пользователя
+        Кадр из одного шага симуляции без накопления времени:
+            отрисовка и шаг (воспроизведение записей, замеры)
+        :param keys: Sequence [bool]
         :param args:
         :param kwargs:
         :return None:
         """
-        self.cur_frame = (self.rect.x * constants.COLUMNS * 4 //
-                          constants.SCREEN_WIDTH) % len(self.frames)
-        self.image = self.frames[self.cur_frame]
-        if self.is_flip:
-            self.image = pygame.transform.flip(self.image, True, False)
-        self.mask = pygame.mask.from_surface(self.image)
-        self.rect.width = constants.tile_width
-        self.rect.height = constants.tile_height
-        self.col, self.row = self.get_coords()
-        if args:
-            self.move(args[0])
-        is_collide_mask = any(
-            [pygame.sprite.collide_mask(self, tile) for tile in tiles_group]
-        )
-        if not self.have_border_down() and \
-                (not is_collide_mask or (not self.is_can_move_left() and
-                                         not self.is_can_move_right())):
-            self.v += self.gravity
-            self.rect.y += self.v
-        else:
-            self.v = 1
-            self.is_in_air = False
+        if self.show_screens():
+            return
+        self.draw()
+        self.simulate(keys)
 
 
 class StatusHearts(pygame.sprite.Sprite):
@@ -996,377 +751,49 @@ class StatusHearts(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__(game_status)
         self.image: pygame.Surface = load_image("heart.png", color_key=-1)
-        self.image = pygame.transform.scale(
-            self.image, (self.image.get_width(),
-                         self.image.get_height())
-        )
         self.rect = self.image.get_rect()
 
 
-class StatusScore(pygame.sprite.Sprite):
+class StatusScore(hud.TextLabel):
     """
     Класс отвечающий за отрисовку набранных очков
     """
 
     def __init__(self):
-        super().__init__(game_status)
-        self.font: pygame.font.Font = pygame.font.Font(None, 30)
-        self.image: pygame.Surface = self.font.render('Score: ',
-                                                      True,
-                                                      pygame.Color('white'))
-        self.rect = self.image.get_rect()
+        super().__init__(game_status, 'Score: ', lambda: game.score)
         self.rect.right = constants.SCREEN_WIDTH - self.rect.width
         self.rect.top = constants.MARGIN_STATUS
 
-    def update(self, *args, **kwargs) -> None:
-        self.image = self.font.render(f'Score: {game.score}', True,
-                                      pygame.Color('white'))
-        self.rect.right = constants.SCREEN_WIDTH - self.rect.width
-
 
-class StatusLevel(pygame.sprite.Sprite):
+class StatusLevel(hud.TextLabel):
     """
     Класс отвечающий за отрисовку текущего уровня
     """
 
     def __init__(self):
-        super().__init__(game_status)
-        self.font: pygame.font.Font = pygame.font.Font(None, 30)
-        self.image: pygame.Surface = self.font.render('Level: ',
-                                                      True,
-                                                      pygame.Color('white'))
-        self.rect = self.image.get_rect()
+        super().__init__(game_status, 'Level: ', lambda: game.level)
         self.rect.right = constants.SCREEN_WIDTH - 3 * self.rect.width
         self.rect.top = constants.MARGIN_STATUS
 
-    def update(self, *args, **kwargs) -> None:
-        self.image = self.font.render(f'Level: {game.level}', True,
-                                      pygame.Color('white'))
-        self.rect.right = constants.SCREEN_WIDTH - 3 * self.rect.width
-
-
-# создаём игровое окружение
-game = Game()
-
-
-# класс тайлов коробочек
-class Tile(pygame.sprite.Sprite):
-    """
-    Класс отвечает за настройку и состояние коробочек на поле
-        Свойства:
-    can_move_left: bool
-    can_move_right: bool
-    col: int
-    image: pygame.Surface
-    is_collide_bottom: bool
-    is_collide_left: bool
-    is_collide_right: bool
-    is_collide_top: bool
-    is_hero_collide_bottom: bool
-    is_hero_collide_left: bool
-    is_hero_collide_right: bool
-    is_hero_collide_top: bool
-    is_in_air: bool
-    row: int
-    sprite_copy: pygame.sprite.Sprite
-    v: int
-        Методы:
-    get_coords - возвращает координаты тайла на игровом поле
-    have_bottom_collide - Проверка что есть объект снизу
-    have_hero_hit - Проверка что попали на героя сверху
-    have_left_collide - Проверка что есть объект справа
-    have_right_collide - Проверка что есть объект справа
-    have_top_collide - Проверка что есть объект сверху
-    hit_player - наносит урон игроку
-    increase_speed (@classmethod) - Меняет настройки скорости тайлов и
-                                    сбрасывает таймер генерации коробок
-    is_can_move_left - проверяет возможность сдвинуть коробку влево
-    is_can_move_right - проверяет возможность сдвинуть коробку вправо
-    move - управляет перемещением коробок по полю
-    reset_v - сбрасывает скорости на начальные значения при рестарте
-    setup_collide - сбрасывает значения пересечений
-    update - обновляет состояние спрайта
-    """
 
-    v: int = constants.START_V
-
-    def __init__(self, tile_type: str, pos_x: int) -> None:
-        """
-        :param tile_type: str
-        :param pos_x: int
-        :return None:
-        """
-        super().__init__(tiles_group, all_sprites)
-        self.can_move_left: bool = True
-        self.can_move_right: bool = True
-        self.col: int = pos_x
-        self.image: pygame.Surface = load_image(tile_type)
-        self.is_collide_bottom: bool = False
-        self.is_collide_left: bool = False
-        self.is_collide_right: bool = False
-        self.is_collide_top: bool = False
-        self.is_hero_collide_bottom: bool = False
-        self.is_hero_collide_left: bool = False
-        self.is_hero_collide_right: bool = False
-        self.is_hero_collide_top: bool = False
-        self.is_in_air: bool = True
-        self.mask = pygame.mask.from_surface(self.image)
-        self.rect = self.image.get_rect().move(constants.tile_width * pos_x,
-                                               screen.get_rect().top)
-        self.row: int = 0
-        self.setup_collide()
-        # копия объекта с увеличенной координатой y, для коррекции пересечений
-        # на разных скоростях с нижними объектами
-        self.sprite_copy: pygame.sprite.Sprite = copy(self)
-        self.sprite_copy.rect.height += Tile.v
-
-    def get_coords(self) -> [int, int]:
-        """
-        Возвращает координаты тайла на игровом поле (в клетках: столбец, строка)
-        :return tuple[int, int]:
-        """
-        return self.rect.x * constants.COLUMNS // constants.SCREEN_WIDTH, \
-            self.rect.y * constants.ROWS // constants.SCREEN_HEIGHT
-
-    def have_bottom_collide(self, obj: pygame.sprite.Sprite) -> None:
-        """
-        Проверка что есть объект снизу
-        :param obj: pygame.sprite.Sprite:
-        :return None:
-        """
-        if obj.rect.right > self.rect.left and \
-                obj.rect.left < self.rect.right and \
-                obj.rect.bottom >= (self.rect.top +
-                                    constants.ERROR_RATE) and \
-                obj.rect.top <= (self.rect.bottom +
-                                 constants.ERROR_RATE):
-            if not isinstance(obj, Player):
-                self.is_collide_bottom = True
-
-    def have_hero_hit(self, obj: pygame.sprite.Sprite) -> None:
-        """
-        Проверка что попали на героя сверху
-        :param obj: pygame.sprite.Sprite:
-        :return None:
-        """
-        if obj.rect.right > self.rect.left and \
-                obj.rect.left < self.rect.right and \
-                obj.rect.top < (self.rect.bottom +
-                                constants.ERROR_RATE) and \
-                constants.tile_height < obj.rect.top - self.rect.top <= (
-                constants.tile_height +
-                constants.ERROR_RATE):
-            self.is_hero_collide_bottom = True
-
-    def have_left_collide(self, obj: pygame.sprite.Sprite) -> None:
-        """
-        Проверка что есть объект справа
-        :param obj: pygame.sprite.Sprite:
-        :return None:
-        """
-        if obj.rect.right > self.rect.left > obj.rect.left and \
-                obj.rect.bottom - self.rect.top <= (constants.tile_height +
-                                                    constants.ERROR_RATE) and \
-                self.rect.bottom - obj.rect.top <= (constants.tile_height +
-                                                    constants.ERROR_RATE):
-            if isinstance(obj, Player):
-                self.is_hero_collide_left = True
-            else:
-                self.is_collide_left = True
-
-    def have_right_collide(self, obj: pygame.sprite.Sprite) -> None:
-        """
-        Проверка что есть объект справа
-        :param obj: pygame.sprite.Sprite:
-        :return None:
-        """
-        if self.rect.right > obj.rect.left > self.rect.left and \
-                obj.rect.bottom - self.rect.top <= (constants.tile_height +
-                                                    constants.ERROR_RATE) and \
-                self.rect.bottom - obj.rect.top <= (constants.tile_height +
-                                                    constants.ERROR_RATE) and \
-                not self.is_hero_collide_bottom:
-            if isinstance(obj, Player):
-                self.is_hero_collide_right = True
-            else:
-                self.is_collide_right = True
-
-    def have_top_collide(self, obj: pygame.sprite.Sprite) -> None:
-        """
-        Проверка что есть объект сверху
-        :param obj: pygame.sprite.Sprite:
-        :return None:
-        """
-        if obj.rect.right > self.rect.left and \
-                obj.rect.left < self.rect.right and \
-                obj.rect.bottom <= (self.rect.top +
-                                    constants.ERROR_RATE) and \
-                obj.rect.top <= (self.rect.bottom +
-                                 constants.ERROR_RATE):
-            if isinstance(obj, Player):
-                self.is_hero_collide_top = True
-            else:
-                self.is_collide_top = True
-
-    def hit_player(self) -> None:
-        """
-        наносит урон игроку
-        :return None:
-        """
-        if not self.is_in_air:
-            return
-        game.player.health -= 1
-        sound_hit.play()
-        self.col, self.row = self.get_coords()
-        game.board[self.row][self.col] = 0
-        self.kill()
-        create_particles((self.rect.centerx, self.rect.top))
-        game.status_health.pop().kill()
-
-    @classmethod
-    def increase_speed(cls) -> None:
-        """
-        Меняет настройки скорости тайлов и сбрасывает таймер генерации коробок
-        :return None:
-        """
-        global CURRENT_BOMB_INTERVAL
-        cls.v += 1
-        CURRENT_BOMB_INTERVAL -= constants.INSTERVALS_PITCH
-        pygame.time.set_timer(BOMBGENERATE, CURRENT_BOMB_INTERVAL)
-        for tile in tiles_group:
-            tile.image = load_image(color_box[game.level % len(color_box)])
-
-    def is_can_move_left(self) -> bool:
-        """
-        Проверяет возможность сдвинуть коробку влево
-        :return bool:
-        """
-        is_can = (
-                self.rect.x > 0 and
-                not self.is_collide_left and
-                not self.is_collide_top and
-                self.is_hero_collide_right
-        )
-        return is_can
-
-    def is_can_move_right(self) -> bool:
-        """
-        Проверяет возможность сдвинуть коробку вправо
-        :return None:
-        """
-        is_can = (
-                self.rect.right < constants.SCREEN_WIDTH and
-                not self.is_collide_right and
-                not self.is_collide_top and
-                self.is_hero_collide_left
-        )
-        return is_can
-
-    def move(self, keys: [bool]) -> None:
-        """
-        Управляет перемещением коробок по полю
-        :param keys: [bool]
-        :return None:
-        """
-        hits: list = pygame.sprite.spritecollide(self, all_sprites, False)
-        for obj in hits:
-            if obj == self:
-                continue
-            # Проверка что есть объект справа
-            self.have_right_collide(obj)
-            # Проверка что есть объект слева
-            self.have_left_collide(obj)
-            # Проверка что есть объект сверху
-            self.have_top_collide(obj)
-            # Проверка что есть объект снизу
-            self.have_bottom_collide(obj)
-            # проверяем что не упали на героя
-            self.have_hero_hit(obj)
-            self.can_move_left = self.is_can_move_left()
-            self.can_move_right = self.is_can_move_right()
-
-        if keys[constants.LEFT_KEY] and self.can_move_left:
-            self.rect.x -= constants.tile_width
-
-        if keys[constants.RIGHT_KEY] and self.can_move_right:
-            self.rect.x += constants.tile_width
-
-    @classmethod
-    def reset_v(cls) -> None:
-        """
-        Сбрасывает скорости на начальные значения при рестарте
-        :return None:
-        """
-        global CURRENT_BOMB_INTERVAL
-        cls.v = constants.START_V
-        CURRENT_BOMB_INTERVAL = constants.BOMBS_INTERVALS
-        pygame.time.set_timer(BOMBGENERATE, CURRENT_BOMB_INTERVAL)
-
-    def setup_collide(self) -> None:
-        """
-        Сбрасывает значения пересечений
-        :return None:
-        """
-        self.is_collide_left: bool = False
-        self.is_collide_right: bool = False
-        self.is_collide_top: bool = False
-        self.is_collide_bottom: bool = False
-        self.is_hero_collide_right: bool = False
-        self.is_hero_collide_left: bool = False
-        self.is_hero_collide_top: bool = False
-        self.is_hero_collide_bottom: bool = False
-
-    def update(self, *args, **kwargs) -> None:
-        """
-        Обновляет состояние коробочки после действий пользователя
-        :param args:
-        :param kwargs:
-        :return None:
-        """
-        self.can_move_left = self.is_can_move_left()
-        self.can_move_right = self.is_can_move_right()
-        if args:
-            self.move(args[0])
-        # Проверка что не упали на героя
-        if (
-                self.is_hero_collide_bottom and
-                not self.is_hero_collide_left and
-                not self.is_hero_collide_right and
-                not self.is_hero_collide_top and
-                len(pygame.sprite.spritecollide(self, tiles_group, False)) == 1
-        ):
-            self.hit_player()
-
-        if self.sprite_copy.rect.colliderect(
-                constants.screen_rect) and not self.is_collide_bottom:
-            self.rect.y += self.v
-        else:
-            new_col, new_row = self.get_coords()
-            try:
-                if game.board[new_row][new_col] == 0:
-                    self.is_in_air = False
-                    game.board[new_row][new_col], game.board[self.row][
-                        self.col] = self, 0
-                    self.col, self.row = new_col, new_row
-                    self.rect.y = constants.tile_height * (
-                            self.row + 1) - constants.DOWN_BORDER
-            except IndexError as e:
-                # При вылете за границы смотрим в чем проблема
-                print(e, (new_row, new_col), constants.ROWS, constants.COLUMNS)
-        self.rect.x = constants.tile_width * self.col
-        self.setup_collide()
+# игровое окружение создается при запуске (boot)
+game: Optional[Game] = None
 
 
 class Particle(pygame.sprite.Sprite):
     """
     Частицы для анимации попадания в героя
     """
-    fire = [choice(game.player.frames)]
-    for scale in (5, 10, 20, 30):
-        fire.append(pygame.transform.scale(fire[0], (scale, scale)))
+    # изображения частиц готовятся при первом попадании
+    fire: List[pygame.Surface] = []
 
     def __init__(self, pos, dx, dy):
-        super().__init__(all_sprites, player_group)
+        super().__init__(particles_group)
+        if not Particle.fire:
+            Particle.fire = [choice(game.player.frames)]
+            for scale in (5, 10, 20, 30):
+                Particle.fire.append(
+                    pygame.transform.scale(Particle.fire[0], (scale, scale)))
         self.image: pygame.Surface = choice(self.fire)
         self.rect = self.image.get_rect()
         self.velocity = [dx, dy]
@@ -1382,15 +809,99 @@ class Particle(pygame.sprite.Sprite):
 
 
 cursor = pygame.sprite.Sprite(cursor_group)
-cursor.image = load_image("arrow.png")
-cursor.rect = cursor.image.get_rect()
 
-keys = pygame.key.get_pressed()
-is_paused = False
+
+def boot() -> None:
+    """
+    Запускает подсистемы, нужные для первого кадра стартового экрана,
+        и записывает время каждого этапа в boot_timings.
+        Звуки и остальные экраны загружаются позже (warm_up)
+    :return None:
+    """
+    global clock, screen, game
+    start = time.perf_counter()
+
+    def stage(name: str) -> None:
+        nonlocal start
+        now = time.perf_counter()
+        boot_timings[name] = (now - start) * 1000
+        start = now
+
+    # микшер не запускаем: его инициализирует первый звук
+    pygame.display.init()
+    pygame.font.init()
+    pygame.key.set_repeat(200, 70)
+    stage('pygame')
+    # настройки из базы читаются один раз за запуск
+    database.db.load()
+    constants.setup_controller(database.db.controls)
+    stage('database')
+    screen = pygame.display.set_mode(constants.SIZE)
+    clock = pygame.time.Clock()
+    stage('display')
+    cursor.image = load_image("arrow.png")
+    cursor.rect = cursor.image.get_rect()
+    stage('cursor')
+    game = Game()
+    stage('game')
+    scenes.registry.build('start')
+    stage('start_scene')
+    if constants.BOOT_LOG:
+        print('Boot:', ', '.join(f'{name} {ms:.1f} ms'
+                                 for name, ms in boot_timings.items()))
+
+
+def warm_up() -> None:
+    """
+    Загружает звуки и собирает экраны меню перед началом игры,
+        чтобы они не задерживали игровые кадры
+    :return None:
+    """
+    start = time.perf_counter()
+    for name in SOUNDS:
+        sound(name)
+    scenes.registry.build()
+    boot_timings['warm_up'] = (time.perf_counter() - start) * 1000
+
+
+def play_replay(path: str, fast: bool = False) -> int:
+    """
+    Воспроизводит запись сессии в окне игры
+    :param path: str - файл записи
+    :param fast: bool - без ограничения частоты кадров
+    :return int: сколько кадров воспроизведено
+    """
+    recording = replay.Recording.load(path)
+    game.is_start_screen = False
+
+    def frame(keys: replay.Keys) -> None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                terminate()
+        game.update(keys)
+        render.renderer.present()
+
+    return replay.play(game, recording, realtime=not fast, frame=frame)
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Коробочки')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='воспроизвести запись сессии')
+    parser.add_argument('--fast', action='store_true',
+                        help='воспроизводить без ограничения частоты кадров')
+    args = parser.parse_args()
+    boot()
+    if args.replay:
+        play_replay(args.replay, args.fast)
+        terminate()
     pygame.mouse.set_visible(False)
+    keys = pygame.key.get_pressed()
+    # симуляция идет шагами постоянной длины, отрисовка - с частотой экрана
+    simulation = timestep.FixedTimestep()
+    elapsed = 0
     while True:
-        generation = False
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 terminate()
@@ -1398,15 +909,35 @@ if __name__ == '__main__':
                 x, y = event.pos
                 cursor.rect.x = x
                 cursor.rect.y = y
-            if event.type == BOMBGENERATE and not is_paused:
-                generation = True
+            if event.type == pygame.KEYDOWN:
+                if event.key == constants.PROFILER_KEY:
+                    profiler.toggle_overlay()
+                if event.key == constants.PROFILER_DUMP_KEY:
+                    profiler.dump_csv()
             keys = pygame.key.get_pressed()
             if keys[pygame.K_ESCAPE]:
                 game.is_paused = not game.is_paused
-        if generation:
-            # ограничиваем крайние столбики, чтобы не было завала
-            col = randrange(1, constants.COLUMNS - 1)
-            Tile(color_box[game.level % len(color_box)], col)
-        game.update(keys)
-        pygame.display.flip()
-        clock.tick(constants.FPS)
+        profiler.lap('events')
+        if game.show_screens():
+            # время, проведенное в меню, не симулируется
+            simulation.reset()
+            clock.tick()
+            elapsed = 0
+            continue
+        for _ in range(simulation.advance(elapsed)):
+            game.check_game_over()
+            if game.is_game_over:
+                break
+            game.spawn_due()
+            profiler.lap('spawn')
+            game.simulate(keys)
+        game.draw(simulation.alpha)
+        if profiler.is_overlay:
+            # таблица не спрайт, поэтому кадр выводится целиком
+            profiler.draw(screen)
+            render.renderer.invalidate()
+        render.renderer.present()
+        profiler.lap('present')
+        elapsed = clock.tick(constants.RENDER_FPS)
+        profiler.lap('tick')
+        profiler.end_frame()
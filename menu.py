@@ -0,0 +1,128 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+import constants
+
+
+class MenuLoop:
+    """
+    Цикл экрана меню, который не перерисовывает экран без причины.
+        После любого события экран перерисовывается с частотой FPS
+        в течение active_ms (чтобы кнопки успели отрисовать наведение
+        и нажатие), затем цикл засыпает в pygame.event.wait до следующего
+        события. Анимацию экрана можно продлить методом keep_active.
+        Свойства:
+    active_ms: int - сколько перерисовывать после последнего события, мс
+    fps: int
+    idle_waits: int - сколько раз цикл засыпал в ожидании событий
+    redraws: int - сколько раз экран был перерисован
+    timeout: int - наибольшее время ожидания события, мс
+        Методы:
+    events - возвращает события, при простое ожидая их
+    is_active - нужно ли перерисовать экран в этом проходе цикла
+    keep_active - продлевает перерисовку (анимация на экране)
+    present - выводит кадр на дисплей
+    """
+
+    def __init__(self, fps: int = constants.FPS,
+                 active_ms: int = constants.MENU_ACTIVE_MS,
+                 timeout: int = constants.MENU_IDLE_TIMEOUT) -> None:
+        """
+        :param fps: int
+        :param active_ms: int
+        :param timeout: int
+        """
+        self.fps: int = fps
+        self.active_ms: int = active_ms
+        self.timeout: int = timeout
+        self.idle_waits: int = 0
+        self.redraws: int = 0
+        self._clock: pygame.time.Clock = pygame.time.Clock()
+        # первый кадр экрана рисуется всегда
+        self._active_until: int = pygame.time.get_ticks() + active_ms
+
+    def events(self) -> List[pygame.event.Event]:
+        """
+        Возвращает накопившиеся события. Если экран не перерисовывается,
+            блокируется до прихода события (но не дольше timeout)
+        :return List[pygame.event.Event]:
+        """
+        if self.is_active():
+            events = pygame.event.get()
+        else:
+            self.idle_waits += 1
+            event = pygame.event.wait(self.timeout)
+            events = [] if event.type == pygame.NOEVENT else \
+                [event] + pygame.event.get()
+        if events:
+            self.keep_active()
+        return events
+
+    def is_active(self) -> bool:
+        """
+        Проверяет, нужно ли перерисовывать экран
+        :return bool:
+        """
+        return pygame.time.get_ticks() < self._active_until
+
+    def keep_active(self, ms: int = None) -> None:
+        """
+        Продлевает перерисовку экрана
+        :param ms: int - на сколько, по умолчанию active_ms
+        :return None:
+        """
+        self._active_until = pygame.time.get_ticks() + \
+            (self.active_ms if ms is None else ms)
+
+    def present(self) -> None:
+        """
+        Выводит кадр на дисплей и выдерживает частоту кадров
+        :return None:
+        """
+        pygame.display.flip()
+        self.redraws += 1
+        self._clock.tick(self.fps)
+
+
+# шрифты меню по размеру, создаются один раз
+_fonts: Dict[int, pygame.font.Font] = {}
+
+
+def font(size: int) -> pygame.font.Font:
+    """
+    Возвращает шрифт стандартной гарнитуры указанного размера
+    :param size: int
+    :return pygame.font.Font:
+    """
+    if size not in _fonts:
+        _fonts[size] = pygame.font.Font(None, size)
+    return _fonts[size]
+
+
+def compose(background: pygame.Surface,
+            blocks: Iterable[Tuple[Iterable[str], int, Optional[int], int,
+                                   int]]) -> pygame.Surface:
+    """
+    Один раз рисует неизменный текст экрана поверх копии фона.
+        Блок текста: (строки, размер шрифта, x, начальная y, отступ строк),
+        x = None выравнивает строки по центру экрана
+    :param background: pygame.Surface
+    :param blocks: Iterable[Tuple[Iterable[str], int, Optional[int], int, int]]
+    :return pygame.Surface:
+    """
+    surface = background.copy()
+    for lines, size, x, text_coord, spacing in blocks:
+        for line in lines:
+            string_rendered = font(size).render(line, True,
+                                                pygame.Color('white'))
+            intro_rect = string_rendered.get_rect()
+            text_coord += spacing
+            intro_rect.top = text_coord
+            if x is None:
+                intro_rect.centerx = surface.get_width() // 2
+            else:
+                intro_rect.x = x
+            text_coord += intro_rect.height
+            surface.blit(string_rendered, intro_rect)
+    return surface
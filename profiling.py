@@ -0,0 +1,190 @@
+import csv
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import pygame
+
+import constants
+
+
+class FrameProfiler:
+    """
+    Замер длительности фаз кадра.
+        Кадр делится отметками lap: каждая отметка относит время,
+        прошедшее с предыдущей, к фазе с указанным именем. Последние
+        capacity кадров хранятся в кольцевом буфере, по ним считаются
+        перцентили. Выключенный профилировщик только проверяет флаг.
+        Свойства:
+    capacity: int - сколько последних кадров хранится
+    enabled: bool - идет ли сбор замеров
+    frames: Deque[Dict[str, float]] - длительности фаз кадров, мс
+    is_overlay: bool - показывается ли таблица поверх экрана
+    last_dump: Optional[str] - путь последнего сохраненного CSV-файла
+               (показывается в таблице)
+    phases: List[str] - имена фаз в порядке первого появления
+        Методы:
+    begin_frame - начинает замер кадра
+    draw - рисует таблицу перцентилей поверх экрана
+    dump_csv - сохраняет буфер в CSV-файл
+    end_frame - завершает замер кадра и кладет его в буфер
+    lap - относит прошедшее время к фазе
+    percentiles - возвращает p50/p95/p99 каждой фазы
+    toggle_overlay - показывает или прячет таблицу
+    """
+
+    # перцентили для таблицы и отчета
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, capacity: int = constants.PROFILER_FRAMES,
+                 enabled: bool = constants.PROFILER_ENABLED) -> None:
+        """
+        :param capacity: int
+        :param enabled: bool - собирать замеры без показа таблицы
+        """
+        self.capacity: int = capacity
+        self.enabled: bool = enabled
+        self.frames: Deque[Dict[str, float]] = deque(maxlen=capacity)
+        self.is_overlay: bool = False
+        self.last_dump: Optional[str] = None
+        self.phases: List[str] = []
+        self._always: bool = enabled
+        self._current: Dict[str, float] = {}
+        self._frame_start: float = 0.0
+        self._last: float = 0.0
+        self._font: Optional[pygame.font.Font] = None
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_age: int = 0
+
+    def begin_frame(self) -> None:
+        """
+        Начинает замер кадра
+        :return None:
+        """
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        Относит время с предыдущей отметки к фазе
+            (повторные отметки одной фазы в кадре суммируются)
+        :param phase: str
+        :return None:
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + \
+            (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self) -> None:
+        """
+        Завершает замер кадра и кладет его в кольцевой буфер
+        :return None:
+        """
+        if not self.enabled:
+            return
+        frame = self._current
+        frame['frame'] = (time.perf_counter() - self._frame_start) * 1000
+        for phase in frame:
+            if phase not in self.phases:
+                self.phases.append(phase)
+        self.frames.append(frame)
+        self._current = {}
+
+    def percentiles(self) -> Dict[str, Dict[int, float]]:
+        """
+        Возвращает перцентили длительности каждой фазы по буферу, мс
+        :return Dict[str, Dict[int, float]]: {фаза: {50: .., 95: .., 99: ..}}
+        """
+        result = {}
+        for phase in self.phases:
+            values = sorted(frame.get(phase, 0.0) for frame in self.frames)
+            if not values:
+                continue
+            # ранг ближайшего значения: ceil(n * p / 100)
+            result[phase] = {
+                p: values[max(0, -(-len(values) * p // 100) - 1)]
+                for p in self.PERCENTILES
+            }
+        return result
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """
+        Рисует таблицу перцентилей в левом нижнем углу экрана.
+            Таблица пересобирается раз в полсекунды
+        :param surface: pygame.Surface
+        :return None:
+        """
+        if not self.is_overlay:
+            return
+        if self._overlay is None or self._overlay_age >= constants.FPS // 2:
+            self._overlay = self._render_overlay()
+            self._overlay_age = 0
+        self._overlay_age += 1
+        rect = self._overlay.get_rect(bottomleft=surface.get_rect().bottomleft)
+        surface.blit(self._overlay, rect)
+
+    def _render_overlay(self) -> pygame.Surface:
+        """
+        Собирает поверхность таблицы перцентилей
+        :return pygame.Surface:
+        """
+        if self._font is None:
+            self._font = pygame.font.Font(None, 20)
+        lines = ['phase          p50    p95    p99 ms']
+        for phase, values in self.percentiles().items():
+            lines.append(f'{phase:<12}' + ''.join(
+                f'{values[p]:7.2f}' for p in self.PERCENTILES))
+        if self.last_dump is not None:
+            lines.append(f'saved {os.path.basename(self.last_dump)}')
+        images = [self._font.render(line, True, pygame.Color('white'))
+                  for line in lines]
+        height = self._font.get_linesize()
+        overlay = pygame.Surface(
+            (max(image.get_width() for image in images) + 10,
+             height * len(images) + 10), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for i, image in enumerate(images):
+            overlay.blit(image, (5, 5 + i * height))
+        return overlay
+
+    def toggle_overlay(self) -> None:
+        """
+        Показывает или прячет таблицу. Пока таблица видна,
+            замеры собираются, даже если профилировщик выключен
+        :return None:
+        """
+        self.is_overlay = not self.is_overlay
+        self.enabled = self.is_overlay or self._always
+        self._overlay = None
+        # включение посреди кадра: отсчет идет с момента переключения
+        self._current = {}
+        self._frame_start = self._last = time.perf_counter()
+
+    def dump_csv(self, path: Optional[str] = None) -> str:
+        """
+        Сохраняет кадры из буфера в CSV-файл (одна строка на кадр).
+            Имя файла выводится последней строкой таблицы
+        :param path: Optional[str] - по умолчанию имя с текущим временем
+        :return str: путь к файлу
+        """
+        if path is None:
+            path = time.strftime(constants.PROFILER_CSV)
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame_no'] + self.phases)
+            for index, frame in enumerate(self.frames):
+                writer.writerow([index] + [f'{frame.get(phase, 0.0):.3f}'
+                                           for phase in self.phases])
+        self.last_dump = path
+        self._overlay = None
+        return path
+
+
+# профилировщик фаз кадра игрового цикла
+profiler = FrameProfiler()
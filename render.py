@@ -0,0 +1,405 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+import assets
+import constants
+
+
+class RenderStats:
+    """
+    Счетчики памяти, выделенной на этапе отрисовки.
+        Свойства:
+    frame_allocations: int - число поверхностей, созданных за текущий кадр
+    frame_bytes: int - байт выделено за текущий кадр
+    frames: int - количество отрисованных кадров
+    total_allocations: int
+    total_bytes: int
+        Методы:
+    allocate - учитывает созданную поверхность
+    begin_frame - сбрасывает счетчики текущего кадра
+    """
+
+    def __init__(self) -> None:
+        self.frame_allocations: int = 0
+        self.frame_bytes: int = 0
+        self.frames: int = 0
+        self.total_allocations: int = 0
+        self.total_bytes: int = 0
+
+    def allocate(self, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Учитывает поверхность, созданную во время отрисовки
+        :param surface: pygame.Surface
+        :return surface: pygame.Surface
+        """
+        size = surface.get_width() * surface.get_height() * \
+            surface.get_bytesize()
+        self.frame_allocations += 1
+        self.frame_bytes += size
+        self.total_allocations += 1
+        self.total_bytes += size
+        return surface
+
+    def begin_frame(self) -> None:
+        """
+        Сбрасывает счетчики текущего кадра
+        :return None:
+        """
+        self.frames += 1
+        self.frame_allocations = 0
+        self.frame_bytes = 0
+
+
+class RenderLayers:
+    """
+    Статические слои игрового экрана.
+        Фон собирается один раз для режима экрана (размер, глубина цвета)
+        и темы, хранится в формате экрана и пересобирается только при их смене.
+        Поверх копии фона один раз на каждое изменение игрового поля
+        рисуются лежащие коробки, поэтому в кадре они выводятся одним blit.
+        Свойства:
+    rebuilds: int - сколько раз собирался фон
+    settled_dirty: Optional[List[pygame.Rect]] - изменившиеся при последней
+                   сборке области слоя коробок (None - весь слой)
+    settled_rebuilds: int - сколько раз собирался слой коробок
+    stats: RenderStats
+    theme: str - имя файла фона
+        Методы:
+    background - возвращает готовый фон для поверхности экрана
+    invalidate - сбрасывает собранные слои
+    invalidate_settled - сбрасывает только слой коробок
+    set_theme - меняет тему фона
+    settled - возвращает фон с нарисованными лежащими коробками
+    """
+
+    def __init__(self, theme: str = constants.BACKGROUND_IMAGE) -> None:
+        """
+        :param theme: str
+        """
+        self.theme: str = theme
+        self.rebuilds: int = 0
+        self.stats: RenderStats = RenderStats()
+        self.settled_dirty: Optional[List[pygame.Rect]] = None
+        self.settled_rebuilds: int = 0
+        self._background: Optional[pygame.Surface] = None
+        self._mode: Optional[Tuple] = None
+        self._settled: Optional[pygame.Surface] = None
+        self._settled_key: Optional[Tuple] = None
+        self._settled_tiles: Dict[pygame.sprite.Sprite,
+                                  Tuple[pygame.Rect, pygame.Surface]] = {}
+
+    def background(self, target: pygame.Surface) -> pygame.Surface:
+        """
+        Возвращает фон в формате экрана, собирая его при смене режима
+        :param target: pygame.Surface - поверхность экрана
+        :return pygame.Surface:
+        """
+        mode = (target.get_size(), target.get_bitsize(), self.theme)
+        if mode != self._mode:
+            # масштабированная копия нужна только на время преобразования
+            scaled = self.stats.allocate(pygame.transform.scale(
+                assets.cache.get_image(self.theme), target.get_size()))
+            self._background = self.stats.allocate(scaled.convert())
+            self._mode = mode
+            self.rebuilds += 1
+        return self._background
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает собранные слои, они будут собраны при следующем кадре
+        :return None:
+        """
+        self._background = None
+        self._mode = None
+        self._settled = None
+        self.invalidate_settled()
+
+    def invalidate_settled(self) -> None:
+        """
+        Сбрасывает слой коробок, фон остается собранным.
+            Нужен при замене игрового поля: версия нового поля
+            снова начинается с нуля
+        :return None:
+        """
+        self._settled_key = None
+        self._settled_tiles = {}
+
+    def settled(self, target: pygame.Surface, tiles: pygame.sprite.Group,
+                version: int) -> pygame.Surface:
+        """
+        Возвращает фон с нарисованными на нем лежащими коробками.
+            Слой пересобирается только при смене версии игрового поля
+            или режима экрана, изменившиеся области сохраняются
+            в settled_dirty
+        :param target: pygame.Surface - поверхность экрана
+        :param tiles: pygame.sprite.Group - все коробки
+        :param version: int - версия игрового поля
+        :return pygame.Surface:
+        """
+        background = self.background(target)
+        key = (version, self._mode)
+        if key == self._settled_key:
+            self.settled_dirty = []
+            return self._settled
+        if self._settled is None or \
+                self._settled.get_size() != background.get_size():
+            self._settled = self.stats.allocate(background.copy())
+            self.settled_dirty = None
+        elif self._settled_key is None or self._settled_key[1] != self._mode:
+            # сменился сам фон, меняется весь слой
+            self._settled.blit(background, (0, 0))
+            self.settled_dirty = None
+        else:
+            self._settled.blit(background, (0, 0))
+            self.settled_dirty = []
+        settled_tiles = {}
+        for tile in tiles:
+            if tile.is_in_air:
+                continue
+            rect = tile.image.get_rect(topleft=tile.rect.topleft)
+            self._settled.blit(tile.image, rect)
+            settled_tiles[tile] = (rect, tile.image)
+        if self.settled_dirty is not None:
+            for tile, state in settled_tiles.items():
+                old = self._settled_tiles.pop(tile, None)
+                if old is None or old[0] != state[0] or old[1] is not state[1]:
+                    if old is not None:
+                        self.settled_dirty.append(old[0])
+                    self.settled_dirty.append(state[0])
+            self.settled_dirty.extend(
+                rect for rect, _ in self._settled_tiles.values())
+        self._settled_tiles = settled_tiles
+        self._settled_key = key
+        self.settled_rebuilds += 1
+        return self._settled
+
+    def set_theme(self, theme: str) -> None:
+        """
+        Меняет тему фона
+        :param theme: str
+        :return None:
+        """
+        if theme != self.theme:
+            self.theme = theme
+            self.invalidate()
+
+
+class SpriteRenderer:
+    """
+    Отрисовка групп спрайтов игрового экрана.
+        В режиме грязных прямоугольников запоминает положение и изображение
+        каждого спрайта, перерисовывает только изменившиеся области и
+        обновляет на дисплее только их. Если изменилась слишком большая
+        часть экрана, выполняется полная перерисовка.
+        Свойства:
+    full_frames: int - кадров с полной перерисовкой
+    max_dirty_fraction: float - доля экрана для перехода на полную перерисовку
+    partial_frames: int - кадров с частичной перерисовкой
+    rects: Optional[List[pygame.Rect]] - области для вывода (None - весь экран)
+    use_dirty_rects: bool
+        Методы:
+    draw - рисует группы спрайтов поверх фона
+    invalidate - требует полной перерисовки следующего кадра
+    present - выводит нарисованный кадр на дисплей
+    """
+
+    def __init__(self, use_dirty_rects: bool = constants.DIRTY_RECTS,
+                 max_dirty_fraction: float = constants.DIRTY_MAX_FRACTION
+                 ) -> None:
+        """
+        :param use_dirty_rects: bool
+        :param max_dirty_fraction: float
+        """
+        self.use_dirty_rects: bool = use_dirty_rects
+        self.max_dirty_fraction: float = max_dirty_fraction
+        self.full_frames: int = 0
+        self.partial_frames: int = 0
+        self.rects: Optional[List[pygame.Rect]] = None
+        self._is_full: bool = True
+        self._states: Dict[pygame.sprite.Sprite,
+                           Tuple[pygame.Rect, pygame.Surface]] = {}
+
+    def _collect_dirty(self, groups) -> List[pygame.Rect]:
+        """
+        Сравнивает спрайты с предыдущим кадром и собирает изменившиеся области
+        :param groups: Iterable[pygame.sprite.Group]
+        :return List[pygame.Rect]:
+        """
+        dirty: List[pygame.Rect] = []
+        states = {}
+        for group in groups:
+            for sprite in group:
+                old = self._states.pop(sprite, None)
+                # изображение рисуется от левого верхнего угла rect
+                # и может быть больше самого rect
+                rect = sprite.image.get_rect(topleft=sprite.rect.topleft)
+                if old is None or old[0] != rect or \
+                        old[1] is not sprite.image:
+                    if old is not None:
+                        dirty.append(old[0])
+                    dirty.append(rect)
+                    states[sprite] = (rect, sprite.image)
+                else:
+                    states[sprite] = old
+        # удаленные спрайты оставляют после себя область для очистки
+        dirty.extend(rect for rect, _ in self._states.values())
+        self._states = states
+        return dirty
+
+    def _draw_full(self, surface: pygame.Surface, background: pygame.Surface,
+                   groups) -> None:
+        """
+        Полностью перерисовывает экран
+        :param surface: pygame.Surface
+        :param background: pygame.Surface
+        :param groups: Iterable[Iterable[pygame.sprite.Sprite]]
+        :return None:
+        """
+        surface.blit(background, (0, 0))
+        for group in groups:
+            for sprite in group:
+                surface.blit(sprite.image, sprite.rect)
+        self.rects = None
+        self.full_frames += 1
+
+    def draw(self, surface: pygame.Surface, background: pygame.Surface,
+             groups: Iterable[Iterable[pygame.sprite.Sprite]],
+             background_dirty: Optional[Iterable[pygame.Rect]] = ()) -> None:
+        """
+        Рисует группы спрайтов поверх фона в указанном порядке
+        :param surface: pygame.Surface
+        :param background: pygame.Surface
+        :param groups: Iterable[Iterable[pygame.sprite.Sprite]]
+        :param background_dirty: Optional[Iterable[pygame.Rect]] - изменившиеся
+                                 с прошлого кадра области фона
+                                 (None - фон изменился целиком)
+        :return None:
+        """
+        if not self.use_dirty_rects:
+            self._draw_full(surface, background, groups)
+            return
+        groups = list(groups)
+        screen_rect = surface.get_rect()
+        dirty = self._collect_dirty(groups)
+        if background_dirty is None:
+            self._is_full = True
+        else:
+            dirty.extend(background_dirty)
+        dirty = [rect.clip(screen_rect) for rect in dirty]
+        area = sum(rect.w * rect.h for rect in dirty)
+        if self._is_full or \
+                area > self.max_dirty_fraction * screen_rect.w * screen_rect.h:
+            self._draw_full(surface, background, groups)
+            self._is_full = False
+            return
+        # области перекрываются, поэтому каждая перерисовывается целиком:
+        # фон и все задевающие ее спрайты в порядке групп
+        drawn = [self._states[sprite] for group in groups for sprite in group]
+        rects = [rect for rect, _ in drawn]
+        for dirty_rect in dirty:
+            surface.blit(background, dirty_rect, dirty_rect)
+            for index in dirty_rect.collidelistall(rects):
+                rect, image = drawn[index]
+                clip = rect.clip(dirty_rect)
+                surface.blit(image, clip, clip.move(-rect.x, -rect.y))
+        # области копятся до вывода кадра на дисплей
+        if self.rects is not None:
+            self.rects.extend(dirty)
+        self.partial_frames += 1
+
+    def invalidate(self) -> None:
+        """
+        Требует полной перерисовки следующего кадра
+            (например, после возврата из меню)
+        :return None:
+        """
+        self._is_full = True
+        self.rects = None
+
+    def present(self) -> None:
+        """
+        Выводит кадр на дисплей: только изменившиеся области
+            или весь экран целиком
+        :return None:
+        """
+        if self.rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects)
+        self.rects = []
+
+
+class Interpolator:
+    """
+    Положение спрайтов между двумя шагами симуляции.
+        Перед каждым шагом запоминаются положения спрайтов, при отрисовке
+        rect временно сдвигается в точку между прошлым и текущим
+        положением (alpha - доля шага, прошедшая после последнего шага)
+        и затем возвращается на место. Спрайты, которых не было
+        до шага, рисуются в текущем положении.
+        Свойства:
+    previous: Dict[pygame.sprite.Sprite, Tuple[int, int]] - положения
+              спрайтов перед последним шагом
+        Методы:
+    apply - сдвигает спрайты в промежуточное положение
+    capture - запоминает положения перед шагом симуляции
+    restore - возвращает спрайты в положение симуляции
+    """
+
+    def __init__(self) -> None:
+        self.previous: Dict[pygame.sprite.Sprite, Tuple[int, int]] = {}
+
+    def capture(self, groups: Iterable[Iterable[pygame.sprite.Sprite]]
+                ) -> None:
+        """
+        Запоминает положения спрайтов перед шагом симуляции
+        :param groups: Iterable[Iterable[pygame.sprite.Sprite]]
+        :return None:
+        """
+        self.previous = {sprite: sprite.rect.topleft
+                         for group in groups for sprite in group}
+
+    def apply(self, groups: Iterable[Iterable[pygame.sprite.Sprite]],
+              alpha: float) -> List[Tuple[pygame.sprite.Sprite,
+                                          Tuple[int, int]]]:
+        """
+        Сдвигает спрайты в промежуточное положение
+        :param groups: Iterable[Iterable[pygame.sprite.Sprite]]
+        :param alpha: float - от 0 (прошлый шаг) до 1 (текущий шаг)
+        :return List[Tuple[pygame.sprite.Sprite, Tuple[int, int]]]:
+            сдвинутые спрайты и их положения в симуляции
+        """
+        moved = []
+        if alpha >= 1:
+            return moved
+        for group in groups:
+            for sprite in group:
+                previous = self.previous.get(sprite)
+                current = sprite.rect.topleft
+                if previous is None or previous == current:
+                    continue
+                moved.append((sprite, current))
+                sprite.rect.topleft = (
+                    round(previous[0] + (current[0] - previous[0]) * alpha),
+                    round(previous[1] + (current[1] - previous[1]) * alpha))
+        return moved
+
+    @staticmethod
+    def restore(moved: List[Tuple[pygame.sprite.Sprite, Tuple[int, int]]]
+                ) -> None:
+        """
+        Возвращает сдвинутые спрайты в положение симуляции
+        :param moved: List[Tuple[pygame.sprite.Sprite, Tuple[int, int]]]
+        :return None:
+        """
+        for sprite, current in moved:
+            sprite.rect.topleft = current
+
+
+# слои игрового экрана
+layers = RenderLayers()
+# отрисовка спрайтов игрового экрана
+renderer = SpriteRenderer()
+# промежуточные положения спрайтов между шагами симуляции
+interpolator = Interpolator()
@@ -0,0 +1,204 @@
+"""
+Запись и воспроизведение игровых сессий.
+    Запись хранит начальное значение генератора, настройки сложности,
+    по байту нажатых клавиш на каждый кадр игры и журнал появления коробок.
+    Воспроизведение повторяет сессию кадр в кадр: в реальном времени
+    или без ограничения частоты кадров (для замеров и регрессий).
+"""
+import os
+import random
+import struct
+import time
+from typing import Callable, List, Optional, Tuple
+
+import pygame
+
+import constants
+import spawner
+
+MAGIC = b'PBRP'
+VERSION = 1
+# заголовок: сигнатура, версия, начальное значение генератора, скорость
+# коробок, интервал появления, частота кадров, итоговые очки,
+# число кадров и число записей журнала появления
+HEADER = struct.Struct('<4sHIHIHIII')
+# запись журнала появления: кадр, столбец
+SPAWN = struct.Struct('<IB')
+
+# биты клавиш в байте кадра
+LEFT = 1
+RIGHT = 2
+UP = 4
+
+
+class Keys:
+    """
+    Состояние клавиш кадра записи в виде, который ждут Player и Tile
+        (индексация кодом клавиши из constants)
+    """
+
+    def __init__(self, mask: int) -> None:
+        """
+        :param mask: int - биты LEFT, RIGHT, UP
+        """
+        self.mask: int = mask
+
+    def __getitem__(self, key: int) -> bool:
+        if key == constants.LEFT_KEY:
+            return bool(self.mask & LEFT)
+        if key == constants.RIGHT_KEY:
+            return bool(self.mask & RIGHT)
+        if key == constants.UP_KEY:
+            return bool(self.mask & UP)
+        return False
+
+
+class Recording:
+    """
+    Запись игровой сессии.
+        Кадр записи соответствует одному вызову Engine.step, коробки,
+        появившиеся до него, относятся к этому кадру.
+        Свойства:
+    bomb_interval: int - интервал появления коробок сложности, мс
+    fps: int - частота кадров записи
+    frames: bytearray - нажатые клавиши кадров (биты LEFT, RIGHT, UP)
+    score: int - очки в конце записи
+    seed: int - начальное значение генератора движка
+    spawns: List[Tuple[int, int]] - кадр и столбец каждой коробки
+    start_v: int - начальная скорость коробок сложности
+        Методы:
+    load - читает запись из файла
+    record_spawn - добавляет коробку в журнал
+    record_step - добавляет кадр
+    save - сохраняет запись в файл
+    """
+
+    def __init__(self, seed: int, start_v: int, bomb_interval: int,
+                 fps: int = constants.FPS) -> None:
+        """
+        :param seed: int
+        :param start_v: int
+        :param bomb_interval: int
+        :param fps: int
+        """
+        self.seed: int = seed
+        self.start_v: int = start_v
+        self.bomb_interval: int = bomb_interval
+        self.fps: int = fps
+        self.score: int = 0
+        self.frames: bytearray = bytearray()
+        self.spawns: List[Tuple[int, int]] = []
+
+    def record_step(self, keys) -> None:
+        """
+        Добавляет кадр с состоянием клавиш управления
+        :param keys: Sequence[bool]
+        :return None:
+        """
+        self.frames.append(LEFT * bool(keys[constants.LEFT_KEY]) |
+                           RIGHT * bool(keys[constants.RIGHT_KEY]) |
+                           UP * bool(keys[constants.UP_KEY]))
+
+    def record_spawn(self, col: int) -> None:
+        """
+        Добавляет в журнал коробку, появившуюся перед следующим кадром
+        :param col: int
+        :return None:
+        """
+        self.spawns.append((len(self.frames), col))
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Сохраняет запись в двоичный файл
+        :param path: Optional[str] - по умолчанию имя с текущим временем
+        :return str: путь к файлу
+        """
+        if path is None:
+            path = time.strftime(constants.REPLAY_PATH)
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(
+                MAGIC, VERSION, self.seed, self.start_v, self.bomb_interval,
+                self.fps, self.score, len(self.frames), len(self.spawns)))
+            file.write(self.frames)
+            for spawn in self.spawns:
+                file.write(SPAWN.pack(*spawn))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        """
+        Читает запись из файла
+        :param path: str
+        :return Recording:
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        (magic, version, seed, start_v, bomb_interval, fps, score,
+         frames, spawns) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a replay of version {VERSION}')
+        recording = cls(seed, start_v, bomb_interval, fps)
+        recording.score = score
+        offset = HEADER.size
+        recording.frames = bytearray(data[offset:offset + frames])
+        offset += frames
+        recording.spawns = [SPAWN.unpack_from(data, offset + i * SPAWN.size)
+                            for i in range(spawns)]
+        return recording
+
+
+def start(engine) -> Recording:
+    """
+    Начинает запись сессии движка: задает генератору новое
+        начальное значение и подключает запись к движку.
+        Сложность берется текущая (после set_difficult)
+    :param engine: engine.Engine
+    :return Recording:
+    """
+    seed = random.randrange(2 ** 32)
+    engine.rng.seed(seed)
+    # столбцы, выбранные прежним генератором, выбираются заново
+    engine.spawner.reset()
+    engine.recording = Recording(seed, constants.START_V,
+                                 constants.BOMBS_INTERVALS)
+    return engine.recording
+
+
+def play(engine, recording: Recording, realtime: bool = False,
+         frame: Optional[Callable] = None) -> int:
+    """
+    Воспроизводит запись на новом движке.
+        Настройки сложности берутся из записи, столбцы коробок -
+        из журнала появления
+    :param engine: engine.Engine
+    :param recording: Recording
+    :param realtime: bool - выдерживать частоту кадров записи
+    :param frame: Optional[Callable] - обработка кадра по состоянию клавиш,
+                                       по умолчанию engine.step
+    :return int: сколько кадров воспроизведено
+    """
+    # настройки записи передаются движку, выбранная в игре сложность
+    # (constants) не меняется
+    curve = spawner.current_curve()._replace(start=recording.bomb_interval)
+    engine.reset_speed(recording.start_v, curve)
+    engine.rng.seed(recording.seed)
+    frame = frame or engine.step
+    clock = pygame.time.Clock() if realtime else None
+    spawns = iter(recording.spawns)
+    spawn = next(spawns, None)
+    played = 0
+    for index, mask in enumerate(recording.frames):
+        while spawn is not None and spawn[0] == index:
+            engine.spawn_tile(spawn[1])
+            spawn = next(spawns, None)
+        engine.check_game_over()
+        if engine.is_game_over:
+            break
+        frame(Keys(mask))
+        played += 1
+        if clock is not None:
+            clock.tick(recording.fps)
+    return played
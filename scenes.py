@@ -0,0 +1,141 @@
+from typing import Callable, Dict, Optional
+
+import pygame
+import pygame_gui
+
+import constants
+
+
+class Scene:
+    """
+    Экран меню, собранный один раз: менеджер интерфейса, виджеты и фон.
+        При повторном открытии экрана меняется только изменяемое
+        содержимое (текст, таблица результатов), виджеты остаются прежними,
+        а временные окна и состояние виджетов сбрасываются методом reset.
+        Свойства:
+    background: Optional[pygame.Surface] - фон экрана нужного размера
+    entries: int - сколько раз экран открывался
+    manager: pygame_gui.UIManager
+    name: str
+    widgets: Dict[str, pygame_gui.core.UIElement]
+        Методы:
+    reset - возвращает экран в исходное состояние перед открытием
+    """
+
+    def __init__(self, name: str, size=constants.SIZE) -> None:
+        """
+        :param name: str
+        :param size: Tuple[int, int] - размер экрана
+        """
+        self.name: str = name
+        self.manager: pygame_gui.UIManager = pygame_gui.UIManager(size)
+        self.widgets: Dict[str, pygame_gui.core.UIElement] = {}
+        self.background: Optional[pygame.Surface] = None
+        self.entries: int = 0
+
+    def __getitem__(self, key: str) -> pygame_gui.core.UIElement:
+        return self.widgets[key]
+
+    def reset(self) -> None:
+        """
+        Возвращает экран в исходное состояние: закрывает временные окна
+            (диалоги, открытые при прошлом показе) и снимает с кнопок
+            наведение и нажатие. Выбор в списках сохраняется
+        :return None:
+        """
+        widgets = set(self.widgets.values())
+        for window in list(self.manager.get_window_stack().get_stack()):
+            if window not in widgets:
+                window.kill()
+        for element in self.manager.get_sprite_group():
+            if not isinstance(element, pygame_gui.elements.UIButton):
+                continue
+            element.held = False
+            element.pressed = False
+            element.pressed_event = False
+            element.hovered = False
+            element.hover_time = 0.0
+            if element.tool_tip is not None:
+                element.tool_tip.kill()
+                element.tool_tip = None
+            if element.is_enabled:
+                element.drawable_shape.set_active_state(
+                    'selected' if element.is_selected else 'normal')
+        self.manager.set_focus_set(None)
+
+
+class SceneRegistry:
+    """
+    Реестр экранов меню.
+        Экран собирается функцией-сборщиком при первом открытии
+        (или заранее методом build) и дальше используется повторно.
+        Свойства:
+    builders: Dict[str, Callable[[Scene], None]]
+    builds: int - сколько раз собирались экраны
+    scenes: Dict[str, Scene] - собранные экраны
+        Методы:
+    build - собирает экраны заранее
+    clear - забывает собранные экраны (например, при смене режима экрана)
+    enter - возвращает собранный экран для открытия
+    register - регистрирует сборщик экрана
+    """
+
+    def __init__(self) -> None:
+        self.builders: Dict[str, Callable[[Scene], None]] = {}
+        self.builds: int = 0
+        self.scenes: Dict[str, Scene] = {}
+
+    def _get(self, name: str) -> Scene:
+        """
+        Возвращает экран, собирая его при первом обращении
+        :param name: str
+        :return Scene:
+        """
+        scene = self.scenes.get(name)
+        if scene is None:
+            scene = Scene(name)
+            self.builders[name](scene)
+            self.scenes[name] = scene
+            self.builds += 1
+        return scene
+
+    def build(self, *names: str) -> None:
+        """
+        Собирает экраны заранее, чтобы первое открытие не задерживало игру
+        :param names: str - имена экранов, по умолчанию все
+        :return None:
+        """
+        for name in names or list(self.builders):
+            self._get(name)
+
+    def clear(self) -> None:
+        """
+        Забывает собранные экраны, они будут собраны при следующем открытии
+        :return None:
+        """
+        self.scenes.clear()
+
+    def enter(self, name: str) -> Scene:
+        """
+        Возвращает экран для открытия, сбросив состояние прошлого показа
+        :param name: str
+        :return Scene:
+        """
+        scene = self._get(name)
+        scene.reset()
+        scene.entries += 1
+        return scene
+
+    def register(self, name: str, builder: Callable[[Scene], None]) -> None:
+        """
+        Регистрирует сборщик экрана
+        :param name: str
+        :param builder: Callable[[Scene], None] - заполняет виджеты и фон
+        :return None:
+        """
+        self.builders[name] = builder
+        self.scenes.pop(name, None)
+
+
+# экраны меню игры
+registry = SceneRegistry()
@@ -0,0 +1,141 @@
+import random
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+import constants
+
+
+class SpawnCurve(NamedTuple):
+    """
+    Интервал появления коробок в зависимости от уровня:
+        start - pitch * level, но не меньше floor (все значения в мс)
+    """
+    start: int
+    pitch: int
+    floor: int
+
+    def interval(self, level: int) -> int:
+        """
+        Возвращает интервал появления коробок на уровне
+        :param level: int
+        :return int: мс
+        """
+        return max(self.floor, self.start - self.pitch * level)
+
+
+def current_curve() -> SpawnCurve:
+    """
+    Кривая выбранной сложности (constants.BOMBS_INTERVALS и SPAWN_CURVE)
+    :return SpawnCurve:
+    """
+    return SpawnCurve(constants.BOMBS_INTERVALS, *constants.SPAWN_CURVE)
+
+
+class SpawnScheduler:
+    """
+    Расписание появления коробок по тикам симуляции.
+        Интервал кривой переводится из миллисекунд в тики при частоте
+        симуляции fps, поэтому коробки появляются одинаково в реальном
+        времени, без окна и при воспроизведении без ограничения частоты.
+        Столбцы ближайших коробок выбираются заранее генератором движка
+        и доступны через upcoming.
+        Свойства:
+    curve: SpawnCurve
+    fps: int - тиков симуляции в секунду
+    interval: int - текущий интервал появления, мс
+    level: int - уровень, для которого посчитан интервал
+    lookahead: int - сколько ближайших коробок показывает upcoming
+    rng: random.Random - генератор столбцов
+    spawned: int - сколько коробок выдано
+    ticks: int - сколько тиков прошло
+        Методы:
+    period - интервал появления в тиках
+    reset - начинает расписание заново (рестарт, смена сложности)
+    set_level - пересчитывает интервал при смене уровня
+    tick - продвигает расписание на тик
+    upcoming - ближайшие коробки: через сколько тиков и в каком столбце
+    """
+
+    def __init__(self, rng: random.Random, curve: SpawnCurve,
+                 fps: int = constants.FPS,
+                 lookahead: int = constants.SPAWN_LOOKAHEAD) -> None:
+        """
+        :param rng: random.Random
+        :param curve: SpawnCurve
+        :param fps: int
+        :param lookahead: int
+        """
+        self.rng: random.Random = rng
+        self.fps: int = fps
+        self.lookahead: int = lookahead
+        self.spawned: int = 0
+        self.ticks: int = 0
+        self.curve: SpawnCurve = curve
+        self.level: int = 0
+        self.interval: int = curve.interval(0)
+        # столбцы выбираются при первом обращении к очереди, чтобы
+        # новое начальное значение генератора успело вступить в силу
+        self._columns: Deque[int] = deque()
+        self._countdown: int = self.period()
+
+    def period(self) -> int:
+        """
+        Возвращает интервал появления в тиках (не меньше одного)
+        :return int:
+        """
+        return max(1, round(self.interval * self.fps / 1000))
+
+    def reset(self, curve: Optional[SpawnCurve] = None) -> None:
+        """
+        Начинает расписание заново с нулевого уровня
+        :param curve: Optional[SpawnCurve] - новая кривая, по умолчанию прежняя
+        :return None:
+        """
+        if curve is not None:
+            self.curve = curve
+        self._columns.clear()
+        self.set_level(0)
+
+    def set_level(self, level: int) -> None:
+        """
+        Пересчитывает интервал для уровня. Отсчет до следующей коробки
+            начинается заново, как при перезапуске таймера
+        :param level: int
+        :return None:
+        """
+        self.level = level
+        self.interval = self.curve.interval(level)
+        self._countdown = self.period()
+
+    def _fill(self) -> None:
+        """
+        Выбирает столбцы ближайших коробок (без крайних, чтобы не было завала)
+        :return None:
+        """
+        while len(self._columns) < max(1, self.lookahead):
+            self._columns.append(
+                self.rng.randrange(1, constants.COLUMNS - 1))
+
+    def tick(self) -> Optional[int]:
+        """
+        Продвигает расписание на один тик симуляции
+        :return Optional[int]: столбец коробки, если она появляется в этот тик
+        """
+        self.ticks += 1
+        self._countdown -= 1
+        if self._countdown > 0:
+            return None
+        self._countdown = self.period()
+        self._fill()
+        self.spawned += 1
+        return self._columns.popleft()
+
+    def upcoming(self) -> List[Tuple[int, int]]:
+        """
+        Возвращает ближайшие коробки при текущем интервале
+        :return List[Tuple[int, int]]: (через сколько тиков, столбец)
+        """
+        self._fill()
+        period = self.period()
+        return [(self._countdown + i * period, col)
+                for i, col in enumerate(self._columns)][:self.lookahead]
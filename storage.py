@@ -0,0 +1,114 @@
+import queue
+import sqlite3
+import threading
+from typing import Optional
+
+import constants
+
+
+class Writer:
+    """
+    Запись в базу в отдельном потоке.
+        Игровой цикл только кладет запросы в ограниченную очередь,
+        поток записи забирает их пачками и выполняет каждую пачку одной
+        транзакцией. База переводится в режим WAL с synchronous=NORMAL,
+        поэтому фиксация не ждет сброса на диск и не мешает чтению.
+        Поток запускается при первом запросе.
+        Свойства:
+    batch: int - наибольшее число запросов в одной транзакции
+    commits: int - сколько транзакций зафиксировано
+    errors: int - сколько транзакций не удалось выполнить
+    path: str
+    queue: queue.Queue - запросы, ожидающие записи
+    writes: int - сколько запросов выполнено
+        Методы:
+    close - дописывает очередь и останавливает поток
+    flush - ждет, пока очередь будет записана
+    submit - ставит запрос в очередь
+    """
+
+    def __init__(self, path: str = constants.DB_NAME,
+                 maxsize: int = constants.WRITER_QUEUE,
+                 batch: int = constants.WRITER_BATCH) -> None:
+        """
+        :param path: str - файл базы
+        :param maxsize: int - длина очереди (при заполнении submit ждет)
+        :param batch: int
+        """
+        self.path: str = path
+        self.batch: int = batch
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.commits: int = 0
+        self.errors: int = 0
+        self.writes: int = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, query: str, params: tuple = ()) -> None:
+        """
+        Ставит запрос на запись в очередь
+        :param query: str
+        :param params: tuple
+        :return None:
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='db-writer',
+                                            daemon=True)
+            self._thread.start()
+        self.queue.put((query, params))
+
+    def flush(self) -> None:
+        """
+        Ждет, пока все поставленные запросы будут записаны
+        :return None:
+        """
+        if self._thread is not None:
+            self.queue.join()
+
+    def close(self) -> None:
+        """
+        Дописывает очередь и останавливает поток (вызывается при выходе)
+        :return None:
+        """
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """
+        Цикл потока записи: ждет запрос, добирает пачку из очереди
+            и выполняет ее одной транзакцией
+        :return None:
+        """
+        con = sqlite3.connect(self.path)
+        con.execute('PRAGMA journal_mode=WAL')
+        con.execute('PRAGMA synchronous=NORMAL')
+        is_running = True
+        while is_running:
+            batch = [self.queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            is_running = batch[-1] is not None
+            writes = batch if is_running else batch[:-1]
+            try:
+                if writes:
+                    with con:
+                        for query, params in writes:
+                            con.execute(query, params)
+                    self.commits += 1
+                    self.writes += len(writes)
+            except sqlite3.Error as message:
+                self.errors += 1
+                print('Cannot write to database:', message)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        con.close()
+
+
+# поток записи в базу игры
+writer = Writer()
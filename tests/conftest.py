@@ -0,0 +1,146 @@
+import json
+import os
+import platform
+import shutil
+import sys
+from typing import Callable
+
+# тесты работают без окна и звука
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# пути к данным в constants заданы относительно корня проекта
+os.chdir(ROOT)
+
+import pygame  # noqa: E402
+import pytest  # noqa: E402
+
+import constants  # noqa: E402
+import database  # noqa: E402
+import engine  # noqa: E402
+import storage  # noqa: E402
+
+# результаты замеров за сессию
+BENCHMARK_RESULTS = []
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption('--benchmark', action='store_true', default=False,
+                     help='запустить замеры (тесты с меткой benchmark)')
+    parser.addoption('--benchmark-json', action='store', default=None,
+                     metavar='PATH',
+                     help='запустить замеры и сохранить результаты '
+                          'в JSON-файл')
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    """
+    Замеры долгие, поэтому без --benchmark (или --benchmark-json)
+        они пропускаются
+    """
+    if config.getoption('--benchmark') or \
+            config.getoption('--benchmark-json'):
+        return
+    skip = pytest.mark.skip(reason='замеры запускаются с --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:
+    """
+    Выводит таблицу замеров и сохраняет их в JSON, если указан путь
+    """
+    if not BENCHMARK_RESULTS:
+        return
+    terminalreporter.section('benchmarks')
+    for result in BENCHMARK_RESULTS:
+        terminalreporter.write_line(
+            f"{result['name']:<28} {result['fixture']:<16} "
+            f"median {result['median_us']:>10.1f} us  "
+            f"min {result['min_us']:>10.1f} us  "
+            f"calls {result['calls']}"
+        )
+    path = config.getoption('--benchmark-json')
+    if path:
+        report = {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'results': BENCHMARK_RESULTS,
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        terminalreporter.write_line(f'benchmark results saved to {path}')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def pygame_session():
+    pygame.init()
+    yield
+    pygame.quit()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def game_database(tmp_path_factory):
+    """
+    База игры для тестов, запускающих main: копия data/db.db, поэтому
+        миграция схемы и записи не меняют файл репозитория
+    """
+    path = str(tmp_path_factory.mktemp('game') / 'db.db')
+    shutil.copy(constants.DB_NAME, path)
+    storage.writer = storage.Writer(path)
+    database.db = database.Database(path)
+    yield database.db
+    storage.writer.close()
+    database.db.close()
+
+
+@pytest.fixture
+def db(tmp_path) -> database.Database:
+    """
+    База с потоком записи на копии data/db.db
+    """
+    path = str(tmp_path / 'db.db')
+    shutil.copy(constants.DB_NAME, path)
+    writer = storage.Writer(path)
+    db = database.Database(path, writer=writer)
+    yield db
+    writer.close()
+    db.close()
+
+
+@pytest.fixture
+def screen() -> pygame.Surface:
+    """
+    Поверхность окна, окно открывается при первом обращении
+    """
+    return pygame.display.get_surface() or \
+        pygame.display.set_mode(constants.SIZE)
+
+
+@pytest.fixture
+def settle() -> Callable[[engine.Engine, int, int], engine.Tile]:
+    """
+    Возвращает функцию, кладущую коробку в клетку поля, минуя падение
+    """
+    def settle(game: engine.Engine, row: int, col: int) -> engine.Tile:
+        tile = game.spawn_tile(col)
+        tile.is_in_air = False
+        tile.remove(game.falling_group)
+        tile.col, tile.row = col, row
+        tile.rect.y = constants.tile_height * (row + 1) - \
+            constants.DOWN_BORDER
+        game.board.place(row, col, tile)
+        return tile
+    return settle
+
+
+@pytest.fixture
+def record_benchmark():
+    """
+    Возвращает функцию, добавляющую результат замера в отчет сессии
+    """
+    return BENCHMARK_RESULTS.append
@@ -0,0 +1,42 @@
+"""
+Общий кэш изображений и звуков (модуль assets)
+"""
+import pygame
+
+import assets
+import constants
+
+
+def test_image_is_cached_per_key(tmp_path):
+    cache = assets.AssetCache(bundle_path=str(tmp_path / 'none.bundle'))
+    image = cache.get_image('dragon.png')
+    assert cache.get_image('dragon.png') is image
+    scaled = cache.get_image('dragon.png', size=(10, 10))
+    assert scaled.get_size() == (10, 10)
+    assert cache.get_image('dragon.png', size=(10, 10)) is scaled
+    # масштабированный вариант строится из оригинала, взятого из кэша
+    assert cache.hits == 3
+    assert cache.get_mask('dragon.png') is cache.get_mask('dragon.png')
+
+
+def test_image_loaded_before_display_is_converted_after_it(tmp_path):
+    pygame.display.quit()
+    pygame.display.init()
+    cache = assets.AssetCache(bundle_path=str(tmp_path / 'none.bundle'))
+    cache.preload(['background.png'])
+    headless = cache.get_image('background.png')
+    screen = pygame.display.set_mode(constants.SIZE)
+    # после открытия окна поверхность загружается заново в формате экрана
+    image = cache.get_image('background.png')
+    assert image is not headless
+    assert image.get_bitsize() == screen.get_bitsize()
+    assert image.get_masks()[:3] == screen.get_masks()[:3]
+    assert cache.get_image('background.png') is image
+    assert cache.misses == 2
+
+
+def test_stats_does_not_open_bundle(tmp_path):
+    cache = assets.AssetCache(bundle_path=str(tmp_path / 'none.bundle'))
+    assert cache.stats()['bundled'] == 0
+    assert cache._bundle is None
+    assert not cache._is_bundle_opened
@@ -0,0 +1,386 @@
+"""
+Замеры горячих участков кадра на заранее построенных состояниях поля.
+    Здесь только замеры времени, правильность проверяют тесты модулей.
+    Запуск: python -m pytest tests/test_benchmarks.py --benchmark
+    (с сохранением результатов: --benchmark-json out.json)
+"""
+import random
+import shutil
+import sqlite3
+import statistics
+import time
+from typing import Callable, List
+
+import pytest
+
+import assets
+import bundle
+import constants
+import database
+import engine
+import leaderboard
+import replay
+import storage
+
+pytestmark = pytest.mark.benchmark
+
+SEED = 2021
+# количество замеренных кадров на одно построение поля
+FRAMES = 30
+# количество построений поля для каждого замера
+REPEATS = 5
+# скорость коробок для состояния с падающими коробками
+HIGH_V = 20
+# столбец, в котором стоит герой: его оставляем свободным
+PLAYER_COL = constants.COLUMNS // 2
+FLOOR_ROW = constants.ROWS - 2
+
+
+class ScriptedKeys:
+    """
+    Нажатия клавиш управления из генератора с фиксированным начальным значением
+    """
+
+    def __init__(self, rng: random.Random) -> None:
+        self.pressed: dict = {
+            constants.LEFT_KEY: rng.random() < 0.3,
+            constants.RIGHT_KEY: rng.random() < 0.3,
+            constants.UP_KEY: rng.random() < 0.1,
+        }
+
+    def __getitem__(self, key: int) -> bool:
+        return self.pressed.get(key, False)
+
+
+def fill_rows(game: engine.Engine, settle: Callable, top: int) -> None:
+    """
+    Заполняет строки от top до пола, оставляя свободным столбец героя
+    :param game: engine.Engine
+    :param settle: Callable - фикстура settle
+    :param top: int
+    :return None:
+    """
+    for row in range(top, FLOOR_ROW + 1):
+        for col in range(constants.COLUMNS):
+            if col != PLAYER_COL:
+                settle(game, row, col)
+
+
+def build_empty(game: engine.Engine, settle: Callable) -> None:
+    pass
+
+
+def build_half_full(game: engine.Engine, settle: Callable) -> None:
+    fill_rows(game, settle, constants.ROWS // 2)
+
+
+def build_near_game_over(game: engine.Engine, settle: Callable) -> None:
+    # следующая коробка в строке OVERFLOW_ROW заканчивает игру
+    fill_rows(game, settle, constants.OVERFLOW_ROW + 1)
+
+
+def build_airborne(game: engine.Engine, settle: Callable) -> None:
+    game.tile_v = HIGH_V
+    for col in range(constants.COLUMNS):
+        for k in range(2):
+            tile = game.spawn_tile(col)
+            tile.rect.y = k * 3 * constants.tile_height + \
+                col % 3 * constants.tile_height // 3
+
+
+BOARDS = {
+    'empty': build_empty,
+    'half_full': build_half_full,
+    'near_game_over': build_near_game_over,
+    'airborne': build_airborne,
+}
+
+
+def new_engine() -> engine.Engine:
+    return engine.Engine(seed=SEED)
+
+
+def new_game():
+    """
+    Возвращает сброшенную игру из main (с окном, звуком и интерфейсом)
+    """
+    try:
+        import main
+    except SystemExit as message:
+        pytest.skip(f'main cannot be imported: {message}')
+    if main.game is None:
+        main.boot()
+    game = main.game
+    game.reset_game()
+    game.is_start_screen = False
+    game.is_paused = False
+    game.rng.seed(SEED)
+    return game
+
+
+def report(name: str, board_name: str, samples: List[float]) -> dict:
+    """
+    Собирает статистику замеров в микросекундах
+    :param name: str
+    :param board_name: str
+    :param samples: List[float] - длительности вызовов в секундах
+    :return dict:
+    """
+    micro = sorted(sample * 1e6 for sample in samples)
+    return {
+        'name': name,
+        'fixture': board_name,
+        'calls': len(micro),
+        'seed': SEED,
+        'mean_us': statistics.mean(micro),
+        'median_us': statistics.median(micro),
+        'min_us': micro[0],
+        'p95_us': micro[int(0.95 * (len(micro) - 1))],
+        'max_us': micro[-1],
+    }
+
+
+def frame_game_update(game, keys, samples) -> None:
+    start = time.perf_counter()
+    game.update(keys)
+    samples.append(time.perf_counter() - start)
+
+
+def frame_game_draw(game, keys, samples) -> None:
+    # отрисовка посередине между шагами: спрайты сдвигаются и возвращаются
+    game.simulate(keys)
+    start = time.perf_counter()
+    game.draw(0.5)
+    samples.append(time.perf_counter() - start)
+
+
+def frame_engine_step(game, keys, samples) -> None:
+    start = time.perf_counter()
+    game.step(keys)
+    samples.append(time.perf_counter() - start)
+
+
+def frame_sprites(method: str) -> Callable:
+    """
+    Возвращает кадр Engine.step, в котором замеряется каждый вызов
+        метода method у коробок
+    :param method: str - имя метода Tile
+    :return Callable:
+    """
+    def frame(game, keys, samples) -> None:
+        game.board.index.update(game.tiles_group, game.falling_group,
+                                game.board.version)
+        for sprite in game.all_sprites.sprites():
+            if not sprite.alive():
+                continue
+            if isinstance(sprite, engine.Tile):
+                start = time.perf_counter()
+                getattr(sprite, method)(keys)
+                samples.append(time.perf_counter() - start)
+                if method == 'move':
+                    sprite.update()
+            else:
+                sprite.update(keys)
+        game.check_line()
+    return frame
+
+
+def frame_player_update(game, keys, samples) -> None:
+    game.board.index.update(game.tiles_group, game.falling_group,
+                            game.board.version)
+    for sprite in game.all_sprites.sprites():
+        if sprite is game.player:
+            start = time.perf_counter()
+            sprite.update(keys)
+            samples.append(time.perf_counter() - start)
+        elif sprite.alive():
+            sprite.update(keys)
+    game.check_line()
+
+
+def frame_check_line(game, keys, samples) -> None:
+    game.board.index.update(game.tiles_group, game.falling_group,
+                            game.board.version)
+    game.all_sprites.update(keys)
+    start = time.perf_counter()
+    game.check_line()
+    samples.append(time.perf_counter() - start)
+
+
+FRAME_BENCHMARKS = {
+    'Game.update': (new_game, frame_game_update),
+    'Game.draw': (new_game, frame_game_draw),
+    'Engine.step': (new_engine, frame_engine_step),
+    'Tile.update': (new_engine, frame_sprites('update')),
+    'Tile.move': (new_engine, frame_sprites('move')),
+    'Player.update': (new_engine, frame_player_update),
+    'Engine.check_line': (new_engine, frame_check_line),
+}
+# на пустом поле нет коробок, замерять у них нечего
+CASES = [(name, board_name)
+         for name in FRAME_BENCHMARKS for board_name in BOARDS
+         if not (name.startswith('Tile.') and board_name == 'empty')]
+
+
+@pytest.mark.parametrize('name, board_name', CASES)
+def test_frame(name, board_name, settle, record_benchmark):
+    make_game, frame = FRAME_BENCHMARKS[name]
+    samples: List[float] = []
+    for repeat in range(REPEATS):
+        game = make_game()
+        BOARDS[board_name](game, settle)
+        rng = random.Random(SEED + repeat)
+        for _ in range(FRAMES):
+            game.check_game_over()
+            if game.is_game_over:
+                break
+            frame(game, ScriptedKeys(rng), samples)
+    record_benchmark(report(name, board_name, samples))
+
+
+@pytest.mark.parametrize('board_name', ['half_full', 'near_game_over'])
+def test_delete_rows(board_name, settle, record_benchmark):
+    samples: List[float] = []
+    for _ in range(REPEATS * FRAMES):
+        game = new_engine()
+        BOARDS[board_name](game, settle)
+        # закрываем столбец героя в нижней строке, чтобы она заполнилась
+        settle(game, FLOOR_ROW, PLAYER_COL)
+        rows = list(game.board.full_rows)
+        start = time.perf_counter()
+        game.delete_rows(rows)
+        samples.append(time.perf_counter() - start)
+    record_benchmark(report('Engine.delete_rows', board_name, samples))
+
+
+# изображения, которые нужны до первого кадра игры
+STARTUP_IMAGES = [
+    ('background-start.jpg', None, constants.SIZE),
+    ('background.png', None, None),
+    ('dragon.png', None, None),
+    ('heart.png', -1, None),
+    ('results.jpg', None, constants.SIZE),
+] + [(name, None, None) for name in engine.color_box]
+
+
+@pytest.mark.parametrize('source', ['files', 'bundle'])
+def test_asset_load(source, tmp_path, record_benchmark):
+    path = str(tmp_path / 'assets.bundle')
+    if source == 'bundle':
+        bundle.build(path)
+    samples: List[float] = []
+    for _ in range(REPEATS):
+        cache = assets.AssetCache(bundle_path=path)
+        start = time.perf_counter()
+        for key in STARTUP_IMAGES:
+            cache.get_image(*key)
+        samples.append(time.perf_counter() - start)
+    record_benchmark(report('AssetCache.get_image', source, samples))
+
+
+# записей в таблице рекордов для замера порога
+RECORDS = 50000
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_leaderboard_cutoff(cached, tmp_path, record_benchmark):
+    path = str(tmp_path / 'records.db')
+    shutil.copy(constants.DB_NAME, path)
+    con = sqlite3.connect(path)
+    con.execute('DELETE FROM records')
+    rng = random.Random(SEED)
+    totals = [rng.randrange(100000) for _ in range(RECORDS)]
+    con.executemany('INSERT INTO records(name, score, level, difficult_id, '
+                    'total) VALUES(?, ?, ?, ?, ?)',
+                    [('bench', total, 1, 1, total) for total in totals])
+    con.commit()
+    writer = storage.Writer(path)
+    db = database.Database(path, writer=writer)
+    board = leaderboard.Leaderboard(db)
+    samples: List[float] = []
+    for _ in range(REPEATS * FRAMES):
+        if not cached:
+            board.invalidate()
+        start = time.perf_counter()
+        board.cutoff()
+        samples.append(time.perf_counter() - start)
+    writer.close()
+    db.close()
+    record_benchmark(report('Leaderboard.cutoff',
+                            'cached' if cached else 'indexed', samples))
+
+
+# длина записанной сессии, кадров
+SESSION_FRAMES = 600
+
+
+def test_replay(tmp_path, record_benchmark):
+    game = new_engine()
+    recording = replay.start(game)
+    rng = random.Random(SEED)
+    for _ in range(SESSION_FRAMES):
+        if rng.random() < 0.05:
+            game.spawn_tile()
+        game.check_game_over()
+        if game.is_game_over:
+            break
+        game.step(ScriptedKeys(rng))
+    loaded = replay.Recording.load(
+        recording.save(str(tmp_path / 'session.rpl')))
+    samples: List[float] = []
+    for _ in range(REPEATS):
+        game = new_engine()
+        start = time.perf_counter()
+        frames = replay.play(game, loaded)
+        samples.append((time.perf_counter() - start) / frames)
+    record_benchmark(report('replay.play', 'per frame', samples))
+
+
+# тиков симуляции для замера расписания появления коробок
+SPAWN_TICKS = 3000
+
+
+def test_spawn_schedule(record_benchmark):
+    game = new_engine()
+    samples: List[float] = []
+    for _ in range(SPAWN_TICKS):
+        start = time.perf_counter()
+        tile = game.spawn_due()
+        samples.append(time.perf_counter() - start)
+        if tile is not None:
+            tile.kill()
+    record_benchmark(report('Engine.spawn_due', 'per tick', samples))
+
+
+def play_board_session(samples: List[float], settle: Callable) -> None:
+    """
+    Играет сессию на наполовину заполненном поле и замеряет шаги движка
+    :param samples: List[float]
+    :param settle: Callable - фикстура settle
+    :return None:
+    """
+    game = new_engine()
+    build_half_full(game, settle)
+    # нижняя строка заполняется сразу, дальше строки собирают коробки
+    settle(game, FLOOR_ROW, PLAYER_COL)
+    rng = random.Random(SEED)
+    for _ in range(SESSION_FRAMES):
+        if rng.random() < 0.05:
+            game.spawn_tile()
+        game.check_game_over()
+        if game.is_game_over:
+            break
+        start = time.perf_counter()
+        game.step(ScriptedKeys(rng))
+        samples.append(time.perf_counter() - start)
+
+
+@pytest.mark.parametrize('backend', ['list', 'numpy'])
+def test_board_backend(backend, monkeypatch, settle, record_benchmark):
+    if backend == 'numpy':
+        pytest.importorskip('numpy')
+    monkeypatch.setattr(constants, 'BOARD_BACKEND', backend)
+    samples: List[float] = []
+    for _ in range(REPEATS):
+        play_board_session(samples, settle)
+    record_benchmark(report('Engine.step', f'{backend} board', samples))
@@ -0,0 +1,152 @@
+"""
+Игровое поле на списках и на массивах numpy (модуль board)
+"""
+import random
+
+import pygame
+import pytest
+
+import board
+import constants
+import engine
+import replay
+
+SEED = 2021
+ROWS, COLUMNS, OVERFLOW_ROW = 6, 4, 1
+
+
+class Box(pygame.sprite.Sprite):
+    """
+    Коробка без изображения: поле меняет только ее строку и rect
+    """
+
+    def __init__(self, row: int, col: int) -> None:
+        super().__init__()
+        self.row, self.col = row, col
+        self.rect = pygame.Rect(col * constants.tile_width, 0,
+                                constants.tile_width, constants.tile_height)
+
+
+@pytest.fixture(params=['list', 'numpy'])
+def field(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        return board.ArrayBoard(ROWS, COLUMNS, OVERFLOW_ROW)
+    return board.Board(ROWS, COLUMNS, OVERFLOW_ROW)
+
+
+def put(field, row: int, col: int) -> Box:
+    box = Box(row, col)
+    field.place(row, col, box)
+    return box
+
+
+def fill_row(field, row: int) -> list:
+    return [put(field, row, col) for col in range(COLUMNS)]
+
+
+def test_heights_follow_place_and_remove(field):
+    assert field.heights == [ROWS] * COLUMNS
+    put(field, 5, 0)
+    put(field, 3, 0)
+    put(field, 4, 2)
+    assert field.heights == [3, ROWS, 4, ROWS]
+    field.remove(3, 0)
+    assert field.heights == [5, ROWS, 4, ROWS]
+    assert field.surface_y(0) == \
+        constants.tile_height * 6 - constants.DOWN_BORDER
+    assert field.surface_y(1) is None
+    assert field.surface_y(COLUMNS) is None
+
+
+def test_full_rows_and_overflow(field):
+    fill_row(field, 5)
+    fill_row(field, 3)
+    assert field.full_rows == [3, 5]
+    assert list(field.row_fill) == [0, 0, 0, COLUMNS, 0, COLUMNS]
+    field.remove(3, 1)
+    assert field.full_rows == [5]
+    assert not field.is_overflow
+    box = put(field, OVERFLOW_ROW, 2)
+    assert field.is_overflow
+    assert field.tile(OVERFLOW_ROW, 2) is box
+    field.remove(OVERFLOW_ROW, 2)
+    assert not field.is_overflow
+    assert field.tile(OVERFLOW_ROW, 2) is None
+
+
+def test_clear_non_contiguous_rows(field):
+    bottom = fill_row(field, 5)
+    middle = put(field, 4, 1)
+    full = fill_row(field, 3)
+    top = put(field, 2, 3)
+    version = field.version
+    removed = field.clear_rows([5, 3])
+    assert set(removed) == set(bottom + full)
+    assert field.version > version
+    # коробки между удаленными строками опускаются на одну строку,
+    # выше обеих - на две
+    assert (middle.row, top.row) == (5, 4)
+    assert field.tile(5, 1) is middle
+    assert field.tile(4, 3) is top
+    assert middle.rect.y == \
+        constants.tile_height * 6 - constants.DOWN_BORDER
+    assert field.heights == [ROWS, 5, ROWS, 4]
+    assert list(field.row_fill) == [0, 0, 0, 0, 1, 1]
+    assert field.full_rows == []
+    assert not field.is_overflow
+
+
+def test_array_board_reuses_tile_ids():
+    pytest.importorskip('numpy')
+    field = board.ArrayBoard(ROWS, COLUMNS, OVERFLOW_ROW)
+    # номера не растут с числом коробок, прошедших через поле
+    for _ in range(1000):
+        fill_row(field, 5)
+        put(field, 4, 0)
+        field.clear_rows([5])
+        field.remove(5, 0)
+    assert int(field.ids.max()) == 0
+    assert not field.tiles
+    fill_row(field, 5)
+    assert 0 < int(field.ids.max()) <= ROWS * COLUMNS
+    # запись в занятую клетку освобождает номер прежней коробки
+    box = put(field, 5, 0)
+    assert field.tile(5, 0) is box
+    assert len(field.tiles) == COLUMNS
+
+
+def play_session(settle) -> tuple:
+    """
+    Играет сессию, в которой удаляются строки: две нижние строки
+        заполнены без последнего столбца, первые коробки падают в него
+    :param settle: Callable - фикстура settle
+    :return tuple: состояние движка в конце сессии
+    """
+    game = engine.Engine(seed=SEED)
+    floor = constants.ROWS - 2
+    for row in (floor, floor - 1):
+        for col in range(constants.COLUMNS - 1):
+            settle(game, row, col)
+    rng = random.Random(SEED)
+    for frame in range(400):
+        if frame % 10 == 0:
+            game.spawn_tile(constants.COLUMNS - 1 if frame < 40 else None)
+        game.check_game_over()
+        if game.is_game_over:
+            break
+        game.step(replay.Keys(rng.randrange(8)))
+    return (tuple(game.player.rect), game.player.health, game.score,
+            sorted(tuple(tile.rect) for tile in game.tiles_group),
+            list(game.board.row_fill), list(game.board.heights),
+            game.board.is_overflow)
+
+
+def test_backends_play_the_same_game(settle, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(constants, 'BOARD_BACKEND', 'list')
+    expected = play_session(settle)
+    # строки удалялись, иначе сравнение ничего не проверяет
+    assert expected[2] > 0
+    monkeypatch.setattr(constants, 'BOARD_BACKEND', 'numpy')
+    assert play_session(settle) == expected
@@ -0,0 +1,80 @@
+"""
+Пакет декодированных ресурсов (модуль bundle)
+"""
+import os
+import shutil
+
+import pygame
+import pytest
+
+import assets
+import bundle
+import constants
+
+IMAGES = ('dragon.png', 'heart.png', 'background-start.jpg')
+SCALED = (('background-start.jpg', (110, 100)),)
+
+
+@pytest.fixture
+def sources(tmp_path) -> dict:
+    """
+    Каталоги с копиями нескольких изображений и пакет, собранный из них
+    """
+    image_path = tmp_path / 'images'
+    sound_path = tmp_path / 'music'
+    image_path.mkdir()
+    sound_path.mkdir()
+    for name in IMAGES:
+        shutil.copy(os.path.join(constants.IMAGES_PATH, name), image_path)
+    path = str(tmp_path / 'assets.bundle')
+    bundle.build(path, str(image_path), str(sound_path), SCALED)
+    return {'bundle': path, 'images': str(image_path)}
+
+
+def pixels(image: pygame.Surface) -> bytes:
+    return pygame.image.tostring(image, 'RGBA')
+
+
+def test_cache_reads_images_from_bundle(sources):
+    files = assets.AssetCache(sources['images'],
+                              bundle_path=sources['bundle'] + '.none')
+    packed = assets.AssetCache(sources['images'],
+                               bundle_path=sources['bundle'])
+    keys = [(name, None, None) for name in IMAGES] + \
+        [('heart.png', -1, None)] + \
+        [(name, None, size) for name, size in SCALED]
+    for key in keys:
+        expected = files.get_image(*key)
+        image = packed.get_image(*key)
+        assert image.get_size() == expected.get_size()
+        assert image.get_colorkey() == expected.get_colorkey()
+        assert pixels(image) == pixels(expected)
+    assert packed.stats()['bundled'] == len(keys)
+    assert files.stats()['bundled'] == 0
+
+
+def test_changed_source_falls_back_to_file(sources):
+    packed = bundle.Bundle.open(sources['bundle'])
+    assert packed.image('dragon.png') is not None
+    source = os.path.join(sources['images'], 'dragon.png')
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    # запись устарела: изображение загружается из исходного файла
+    assert packed.image('dragon.png') is None
+    assert packed.stale == 1
+    cache = assets.AssetCache(sources['images'],
+                              bundle_path=sources['bundle'])
+    assert cache.get_image('dragon.png').get_size() == \
+        pygame.image.load(source).get_size()
+    assert cache.stats()['bundled'] == 0
+
+
+def test_open_rejects_missing_and_other_files(sources, tmp_path):
+    assert bundle.Bundle.open(str(tmp_path / 'missing.bundle')) is None
+    other = tmp_path / 'other.bundle'
+    other.write_bytes(b'\0' * 64)
+    assert bundle.Bundle.open(str(other)) is None
+    packed = bundle.Bundle.open(sources['bundle'])
+    # размера нет в пакете - запрос уходит к исходному файлу
+    assert packed.image('dragon.png', (7, 7)) is None
+    assert packed.image('missing.png') is None
@@ -0,0 +1,109 @@
+"""
+Доступ к базе игры (модуль database)
+"""
+import database
+import leaderboard
+
+
+def test_settings_are_read_once(db):
+    names = db.difficult_names()
+    assert names
+    queries = db.queries
+    for name in names:
+        difficult = db.difficult(name)
+        assert difficult.name == name
+        assert difficult.start_v > 0
+    db.control('move_left')
+    db.load()
+    # таблицы настроек отдаются из памяти
+    assert db.queries == queries
+
+
+def test_migration_adds_spawn_columns_once(db):
+    def columns():
+        return [row[1] for row in db.con.execute(
+            'PRAGMA table_info(difficult)')]
+
+    db.load()
+    assert columns().count('difficult_spawn_floor') == 1
+    floors = {id_: floor for id_, floor in db.con.execute(
+        'SELECT id, difficult_spawn_floor FROM difficult')}
+    assert floors == database.SPAWN_FLOORS
+    # база уже новой версии: повторная миграция ничего не меняет
+    db.migrate()
+    reloaded = database.Database(db.path, writer=db.writer)
+    reloaded.load()
+    reloaded.close()
+    assert columns().count('difficult_spawn_pitch') == 1
+    assert columns().count('difficult_spawn_floor') == 1
+
+
+def test_spawn_curve_is_read_from_difficult_row(db):
+    for name in db.difficult_names():
+        difficult = db.difficult(name)
+        assert difficult.spawn_pitch > 0
+        assert 0 < difficult.spawn_floor <= difficult.bomb_interval
+    # кривая принадлежит строке, а не названию сложности
+    hardest = db.difficult(db.difficult_names()[-1])
+    with db.con:
+        db.con.execute('UPDATE difficult SET difficult_name=? WHERE id=?',
+                       ('renamed', hardest.id))
+    reloaded = database.Database(db.path, writer=db.writer)
+    renamed = reloaded.difficult('renamed')
+    reloaded.close()
+    assert (renamed.spawn_pitch, renamed.spawn_floor) == \
+        (hardest.spawn_pitch, hardest.spawn_floor)
+
+
+def test_set_control_updates_memory_and_table(db):
+    db.set_control('move_up', 119)
+    assert db.control('move_up') == 119
+    db.writer.flush()
+    key, = db.execute('SELECT key FROM controller WHERE name_action=?',
+                      ('move_up',)).fetchone()
+    assert key == 119
+    # новая загрузка читает записанное значение
+    reloaded = database.Database(db.path, writer=db.writer)
+    assert reloaded.control('move_up') == 119
+    reloaded.close()
+
+
+def test_records_queries(db):
+    db.records_clear()
+    db.writer.flush()
+    assert db.records_top(3) == []
+    assert db.records_cutoff(3) is None
+    for total in (10, 30, 20, 40):
+        db.records_add(('player', total, 1, 1, total))
+    db.writer.flush()
+    assert [record[4] for record in db.records_top(3)] == [40, 30, 20]
+    assert db.records_cutoff(3) == 20
+
+
+def test_first_records_query_uses_index(db):
+    # индекс создается при загрузке, а не в очереди потока записи
+    db.records_cutoff(3)
+    assert db.writer.queue.empty() and db.writer.writes == 0
+    plan = ' '.join(str(row) for row in db.con.execute(
+        'EXPLAIN QUERY PLAN SELECT total FROM records '
+        'ORDER BY total DESC LIMIT 1 OFFSET 2'))
+    assert 'records_total' in plan
+
+
+def test_leaderboard_reads_through_database(db):
+    db.records_clear()
+    db.writer.flush()
+    board = leaderboard.Leaderboard(db, size=2)
+    assert board.qualifies(1)
+    board.add('a', 5, 1, 1, 5)
+    board.add('b', 7, 1, 1, 7)
+    assert board.cutoff() == 5
+    assert not board.qualifies(5)
+    # порог и таблица не перечитываются, пока кэш не сброшен
+    queries = db.queries
+    board.top()
+    board.cutoff()
+    assert db.queries == queries
+    board.invalidate()
+    assert board.top() == [('b', 7, 1, 1, 7), ('a', 5, 1, 1, 5)]
+    assert db.queries == queries + 1
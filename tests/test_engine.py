@@ -0,0 +1,151 @@
+"""
+Движок игры без окна (модуль engine)
+"""
+import constants
+import engine
+import replay
+
+SEED = 2021
+FLOOR_ROW = constants.ROWS - 2
+NO_KEYS = replay.Keys(0)
+
+
+def cell_y(row: int) -> int:
+    return constants.tile_height * (row + 1) - constants.DOWN_BORDER
+
+
+def new_engine(hero_col: int) -> engine.Engine:
+    """
+    Движок с героем, стоящим на полу в столбце hero_col
+    :param hero_col: int
+    :return engine.Engine:
+    """
+    game = engine.Engine(seed=SEED)
+    game.player.rect = game.player.image.get_rect(
+        topleft=(constants.tile_width * hero_col, cell_y(FLOOR_ROW)))
+    game.player.rect.size = (constants.tile_width, constants.tile_height)
+    return game
+
+
+def update_index(game: engine.Engine) -> None:
+    game.board.index.update(game.tiles_group, game.falling_group,
+                            game.board.version)
+
+
+def test_tile_rect_matches_image():
+    game = new_engine(0)
+    tile = game.spawn_tile(3)
+    assert tile.rect.size == tile.image.get_size()
+    swept = tile.swept_rect()
+    assert swept.top == tile.rect.top
+    assert swept.height == tile.rect.height + game.tile_v
+    # состояние коробки лежит в слотах, в словаре только группы спрайта
+    assert set(vars(tile)) <= {'_Sprite__g'}
+
+
+def test_falling_tile_lands_on_tile(settle):
+    game = new_engine(0)
+    below = settle(game, FLOOR_ROW, 3)
+    tile = game.spawn_tile(3)
+    # до лежащей коробки меньше пути за шаг
+    tile.rect.y = below.rect.y - constants.tile_height - game.tile_v // 2
+    update_index(game)
+    tile.move(NO_KEYS)
+    # нижний бит героя ставит любой объект снизу, удар засчитывается,
+    # только если кроме самой коробки на ее пути ничего нет
+    assert tile.collide == engine.COLLIDE_BOTTOM | engine.HERO_COLLIDE_BOTTOM
+    health = game.player.health
+    tile.setup_collide()
+    tile.update(NO_KEYS)
+    assert not tile.collide
+    assert game.player.health == health
+    assert not tile.is_in_air
+    assert (tile.row, tile.col) == (FLOOR_ROW - 1, 3)
+    assert tile.rect.y == cell_y(FLOOR_ROW - 1)
+    assert game.board.tile(FLOOR_ROW - 1, 3) is tile
+
+
+def test_falling_tile_hits_hero():
+    game = new_engine(4)
+    tile = game.spawn_tile(4)
+    tile.rect.y = game.player.rect.top - constants.tile_height - \
+        constants.ERROR_RATE // 2
+    update_index(game)
+    tile.move(NO_KEYS)
+    assert tile.collide == engine.HERO_COLLIDE_BOTTOM
+    health = game.player.health
+    tile.setup_collide()
+    tile.update(NO_KEYS)
+    assert game.player.health == health - 1
+    assert not tile.alive()
+
+
+def hero_right_of(game: engine.Engine, col: int) -> None:
+    """
+    Ставит героя вплотную справа от столбца col, заходя на него на шаг
+    :param game: engine.Engine
+    :param col: int
+    :return None:
+    """
+    game.player.rect.x = constants.tile_width * (col + 1) - constants.STEP
+
+
+def test_hero_pushes_tile_into_free_cell(settle):
+    game = new_engine(0)
+    tile = settle(game, FLOOR_ROW, 3)
+    hero_right_of(game, 3)
+    update_index(game)
+    tile.move(replay.Keys(replay.LEFT))
+    assert tile.collide == engine.HERO_COLLIDE_RIGHT
+    assert tile.rect.x == 2 * constants.tile_width
+    tile.update(NO_KEYS)
+    assert (tile.row, tile.col) == (FLOOR_ROW, 2)
+    assert game.board.tile(FLOOR_ROW, 2) is tile
+    assert game.board.tile(FLOOR_ROW, 3) is None
+
+
+def test_pushed_tile_blocked_by_neighbour(settle):
+    game = new_engine(0)
+    neighbour = settle(game, FLOOR_ROW, 2)
+    tile = settle(game, FLOOR_ROW, 3)
+    hero_right_of(game, 3)
+    update_index(game)
+    tile.update(replay.Keys(replay.LEFT))
+    # клетка слева занята: коробка возвращается на свое место
+    assert tile.rect.x == 3 * constants.tile_width
+    assert game.board.tile(FLOOR_ROW, 3) is tile
+    assert game.board.tile(FLOOR_ROW, 2) is neighbour
+
+
+def test_tile_under_landing_tile_is_blocked(settle):
+    game = new_engine(0)
+    tile = settle(game, FLOOR_ROW, 3)
+    above = game.spawn_tile(3)
+    # падающая коробка уже касается лежащей сверху
+    above.rect.y = tile.rect.y - constants.tile_height + \
+        constants.ERROR_RATE // 2
+    hero_right_of(game, 3)
+    update_index(game)
+    tile.move(replay.Keys(replay.LEFT))
+    assert tile.collide == engine.COLLIDE_TOP | engine.HERO_COLLIDE_RIGHT
+    assert not tile.can_move_left
+    assert tile.rect.x == 3 * constants.tile_width
+
+
+def test_check_line_deletes_full_rows_at_once(settle):
+    game = engine.Engine(seed=SEED)
+    for row in (FLOOR_ROW, FLOOR_ROW - 2):
+        for col in range(constants.COLUMNS):
+            settle(game, row, col)
+    middle = settle(game, FLOOR_ROW - 1, 0)
+    top = settle(game, FLOOR_ROW - 3, 1)
+    assert game.board.full_rows == [FLOOR_ROW - 2, FLOOR_ROW]
+    game.check_line()
+    assert not game.board.full_rows
+    assert set(game.tiles_group) == {middle, top}
+    # коробки опускаются на число удаленных строк под ними
+    assert (middle.row, middle.rect.y) == (FLOOR_ROW, cell_y(FLOOR_ROW))
+    assert (top.row, top.rect.y) == (FLOOR_ROW - 1, cell_y(FLOOR_ROW - 1))
+    assert game.board.row_fill[FLOOR_ROW] == 1
+    assert sum(game.board.row_fill) == 2
+    assert game.score == 2 * constants.COLUMNS
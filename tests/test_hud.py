@@ -0,0 +1,49 @@
+"""
+Надписи строки состояния (модуль hud)
+"""
+import pygame
+import pytest
+
+import hud
+
+
+@pytest.fixture(autouse=True)
+def font() -> None:
+    pygame.font.init()
+
+
+def test_atlas_renders_missing_glyphs_once():
+    atlas = hud.GlyphAtlas(chars='0123456789')
+    image = atlas.render('2021')
+    assert atlas.misses == 0
+    assert image.get_height() >= atlas.font.get_height()
+    assert image.get_width() == sum(atlas.glyphs[char].get_width()
+                                    for char in '2021')
+    # символа нет в атласе: дорисовывается один раз
+    atlas.render('-1')
+    atlas.render('-12')
+    assert atlas.misses == 1
+    assert '-' in atlas.glyphs
+
+
+def test_label_renders_only_on_change():
+    values = [0]
+    group = pygame.sprite.Group()
+    label = hud.TextLabel(group, 'Счет: ', lambda: values[-1],
+                          hud.GlyphAtlas())
+    rect = label.rect.copy()
+    for _ in range(3):
+        group.update()
+    assert label.renders == 1
+    assert label.hits == 2
+    image = label.image
+    values.append(15)
+    group.update()
+    group.update()
+    assert label.renders == 2
+    assert label.hits == 3
+    assert label.value == 15
+    assert label.image is not image
+    assert label.image.get_width() > image.get_width()
+    # положение надписи не зависит от значения
+    assert label.rect == rect
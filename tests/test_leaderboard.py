@@ -0,0 +1,51 @@
+"""
+Таблица лучших результатов (модуль leaderboard)
+"""
+import pytest
+
+import leaderboard
+
+SIZE = 3
+
+
+@pytest.fixture
+def board(db) -> leaderboard.Leaderboard:
+    db.records_clear()
+    for total in (50, 10, 40, 30, 20):
+        db.records_add(('player', total, 1, 1, total))
+    db.writer.flush()
+    return leaderboard.Leaderboard(db, size=SIZE)
+
+
+def test_cutoff_is_read_once(board):
+    assert board.cutoff() == 30
+    assert board.cutoff() == 30
+    assert board.queries == 1
+    # после сброса порог читается из базы снова
+    board.invalidate()
+    assert board.cutoff() == 30
+    assert board.queries == 2
+
+
+def test_cutoff_of_table_with_free_places(board):
+    board.clear()
+    assert board.cutoff() is None
+    assert board.qualifies(0)
+    board.add('a', 5, 1, 1, 5)
+    assert board.cutoff() is None
+    assert board.queries == 0
+
+
+def test_add_updates_memory_and_database(board):
+    assert not board.qualifies(30)
+    assert board.qualifies(31)
+    board.add('b', 45, 2, 1, 45)
+    queries = board.queries
+    assert [record[4] for record in board.top()] == [50, 45, 40]
+    assert board.cutoff() == 40
+    assert board.queries == queries
+    # запись дописывается потоком записи и видна новому чтению из базы
+    fresh = leaderboard.Leaderboard(board.db, size=SIZE)
+    fresh.invalidate()
+    assert fresh.top() == board.top()
+    assert fresh.cutoff() == 40
@@ -0,0 +1,51 @@
+"""
+Циклы экранов меню (модуль menu)
+"""
+import pygame
+import pytest
+
+import constants
+import menu
+
+
+@pytest.fixture(autouse=True)
+def display(screen) -> None:
+    pygame.event.clear()
+
+
+def test_loop_redraws_after_events_only():
+    loop = menu.MenuLoop(fps=0, active_ms=0, timeout=10)
+    # событий нет: цикл спит, а не перерисовывает экран
+    assert not loop.is_active()
+    assert loop.events() == []
+    assert loop.idle_waits == 1
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    events = loop.events()
+    assert [event.type for event in events] == [pygame.USEREVENT]
+    assert loop.idle_waits == 2
+    loop.keep_active(1000)
+    assert loop.is_active()
+    # активный цикл забирает события без ожидания
+    assert loop.events() == []
+    assert loop.idle_waits == 2
+    loop.present()
+    assert loop.redraws == 1
+
+
+def test_loop_starts_active():
+    loop = menu.MenuLoop(fps=0, active_ms=1000, timeout=10)
+    assert loop.is_active()
+    assert loop.events() == []
+    assert loop.idle_waits == 0
+
+
+def test_compose_keeps_background():
+    background = pygame.Surface(constants.SIZE)
+    background.fill((0, 0, 0))
+    surface = menu.compose(background, [(['Pixel Boxes'], 50, None, 10, 0)])
+    assert surface is not background
+    # текст нарисован на копии, сам фон не меняется
+    assert pygame.transform.average_color(surface)[:3] != (0, 0, 0)
+    assert pygame.transform.average_color(background)[:3] == (0, 0, 0)
+    # шрифт одного размера создается один раз
+    assert menu.font(50) is menu.font(50)
@@ -0,0 +1,90 @@
+"""
+Замер фаз кадра (модуль profiling)
+"""
+import csv
+
+import pytest
+
+import profiling
+
+
+class FakeClock:
+    """
+    Часы perf_counter, которые идут только по команде теста
+    """
+
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, ms: float) -> None:
+        self.now += ms / 1000
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(profiling.time, 'perf_counter', clock)
+    return clock
+
+
+def play_frame(profiler: profiling.FrameProfiler, clock: FakeClock,
+               laps: list) -> None:
+    profiler.begin_frame()
+    for phase, ms in laps:
+        clock.advance(ms)
+        profiler.lap(phase)
+    profiler.end_frame()
+
+
+def test_end_frame_sums_laps_by_phase(clock):
+    profiler = profiling.FrameProfiler(capacity=3, enabled=True)
+    play_frame(profiler, clock, [('events', 1), ('spawn', 2), ('spawn', 3)])
+    play_frame(profiler, clock, [('draw', 4)])
+    first, second = profiler.frames
+    assert first == pytest.approx({'events': 1, 'spawn': 5, 'frame': 6})
+    assert second == pytest.approx({'draw': 4, 'frame': 4})
+    # фазы перечисляются в порядке первого появления
+    assert profiler.phases == ['events', 'spawn', 'frame', 'draw']
+    # в буфере остаются только последние capacity кадров
+    for _ in range(3):
+        play_frame(profiler, clock, [('draw', 1)])
+    assert len(profiler.frames) == 3
+    assert all(frame['draw'] == pytest.approx(1) for frame in profiler.frames)
+
+
+def test_disabled_profiler_keeps_nothing(clock):
+    profiler = profiling.FrameProfiler(enabled=False)
+    play_frame(profiler, clock, [('draw', 4)])
+    assert not profiler.frames
+    assert profiler.percentiles() == {}
+
+
+def test_percentiles_use_nearest_rank(clock):
+    profiler = profiling.FrameProfiler(capacity=100, enabled=True)
+    for ms in range(1, 101):
+        play_frame(profiler, clock, [('draw', ms)])
+    draw = profiler.percentiles()['draw']
+    assert draw == pytest.approx({50: 50, 95: 95, 99: 99})
+    # фаза, пропущенная в кадре, считается нулевой
+    play_frame(profiler, clock, [('hud', 7)])
+    hud = profiler.percentiles()['hud']
+    assert hud[50] == 0
+    assert hud[99] == pytest.approx(0)
+
+
+def test_dump_csv_reports_path_in_overlay(clock, tmp_path, capsys):
+    profiler = profiling.FrameProfiler(enabled=True)
+    play_frame(profiler, clock, [('events', 1), ('draw', 2)])
+    table = profiler._render_overlay()
+    path = profiler.dump_csv(str(tmp_path / 'profile.csv'))
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert rows == [['frame_no', 'events', 'draw', 'frame'],
+                    ['0', '1.000', '2.000', '3.000']]
+    assert profiler.last_dump == path
+    assert capsys.readouterr().out == ''
+    # путь показывается строкой таблицы, а не в консоли
+    assert profiler._render_overlay().get_height() > table.get_height()
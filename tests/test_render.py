@@ -0,0 +1,220 @@
+"""
+Слои и отрисовка игрового экрана (модуль render)
+"""
+from collections import defaultdict
+
+import pygame
+import pytest
+
+import constants
+import engine
+import render
+
+SEED = 2021
+FLOOR_ROW = constants.ROWS - 2
+
+
+def pressed(key: int) -> defaultdict:
+    """
+    Состояние клавиатуры, в котором нажата только клавиша key
+    :param key: int
+    :return defaultdict:
+    """
+    return defaultdict(bool, {key: True})
+
+
+def block(color: tuple, topleft: tuple, *groups) -> pygame.sprite.Sprite:
+    """
+    Спрайт-квадрат одного цвета размером с клетку
+    :param color: tuple
+    :param topleft: tuple
+    :param groups: pygame.sprite.Group
+    :return pygame.sprite.Sprite:
+    """
+    sprite = pygame.sprite.Sprite(*groups)
+    sprite.image = pygame.Surface((constants.tile_width,
+                                   constants.tile_height))
+    sprite.image.fill(color)
+    sprite.rect = sprite.image.get_rect(topleft=topleft)
+    return sprite
+
+
+@pytest.fixture
+def background() -> pygame.Surface:
+    surface = pygame.Surface(constants.SIZE)
+    surface.fill((0, 0, 255))
+    return surface
+
+
+def test_renderer_without_dirty_rects_redraws_everything(screen, background):
+    renderer = render.SpriteRenderer(use_dirty_rects=False)
+    group = pygame.sprite.Group()
+    block((255, 0, 0), (0, 0), group)
+    for _ in range(3):
+        renderer.draw(screen, background, [group])
+        assert renderer.rects is None
+    assert renderer.full_frames == 3
+    assert renderer.partial_frames == 0
+
+
+def test_renderer_redraws_only_changed_areas(screen, background):
+    renderer = render.SpriteRenderer(use_dirty_rects=True)
+    group = pygame.sprite.Group()
+    sprite = block((255, 0, 0), (0, 0), group)
+    block((0, 255, 0), (200, 200), group)
+    # первый кадр всегда рисуется целиком
+    renderer.draw(screen, background, [group])
+    assert renderer.full_frames == 1
+    renderer.present()
+    # ничего не изменилось - выводить нечего
+    renderer.draw(screen, background, [group])
+    assert renderer.partial_frames == 1
+    assert renderer.rects == []
+    renderer.present()
+    old = sprite.rect.copy()
+    sprite.rect.x += constants.tile_width
+    renderer.draw(screen, background, [group])
+    assert renderer.partial_frames == 2
+    assert renderer.rects == [old, sprite.rect]
+    # старое место закрашено фоном, новое - спрайтом
+    assert screen.get_at(old.topleft) == background.get_at(old.topleft)
+    assert screen.get_at(sprite.rect.center) == (255, 0, 0)
+    renderer.present()
+    sprite.kill()
+    renderer.draw(screen, background, [group])
+    assert renderer.rects == [sprite.rect]
+    assert screen.get_at(sprite.rect.center) == \
+        background.get_at(sprite.rect.center)
+
+
+def test_renderer_falls_back_to_full_redraw(screen, background):
+    renderer = render.SpriteRenderer(use_dirty_rects=True,
+                                     max_dirty_fraction=0.1)
+    group = pygame.sprite.Group()
+    sprites = [block((255, 0, 0), (x, 0), group)
+               for x in range(0, constants.SCREEN_WIDTH,
+                              constants.tile_width)]
+    renderer.draw(screen, background, [group])
+    renderer.present()
+    # сдвинута большая часть экрана
+    for sprite in sprites:
+        sprite.rect.y += constants.tile_height
+    renderer.draw(screen, background, [group])
+    assert renderer.full_frames == 2
+    assert renderer.rects is None
+    renderer.present()
+    # фон изменился целиком
+    renderer.draw(screen, background, [group], background_dirty=None)
+    assert renderer.full_frames == 3
+    renderer.present()
+    renderer.invalidate()
+    renderer.draw(screen, background, [group])
+    assert renderer.full_frames == 4
+    assert renderer.partial_frames == 0
+
+
+def test_settled_layer_rebuilds_on_board_change(screen, settle):
+    game = engine.Engine(seed=SEED)
+    layers = render.RenderLayers()
+    tile = settle(game, FLOOR_ROW, 0)
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 1
+    assert layers.settled_dirty is None
+    # поле не менялось - слой не пересобирается
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 1
+    assert layers.settled_dirty == []
+    # падающие коробки в слой не попадают
+    game.spawn_tile(3)
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 1
+    other = settle(game, FLOOR_ROW, 1)
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 2
+    assert layers.settled_dirty == [
+        other.image.get_rect(topleft=other.rect.topleft)]
+    game.board.remove(FLOOR_ROW, 0)
+    tile.kill()
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_dirty == [
+        tile.image.get_rect(topleft=tile.rect.topleft)]
+
+
+def test_settled_layer_rebuilds_on_mode_change(screen, settle):
+    game = engine.Engine(seed=SEED)
+    layers = render.RenderLayers()
+    settle(game, FLOOR_ROW, 0)
+    layers.settled(screen, game.tiles_group, game.board.version)
+    layers.invalidate()
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 2
+    assert layers.settled_dirty is None
+
+
+def test_settled_layer_rebuilds_for_new_board_keeping_background(screen, settle):
+    layers = render.RenderLayers()
+    game = engine.Engine(seed=SEED)
+    settle(game, FLOOR_ROW, 0)
+    layers.settled(screen, game.tiles_group, game.board.version)
+    # после рестарта у нового поля та же версия, но другие коробки
+    game = engine.Engine(seed=SEED)
+    settle(game, FLOOR_ROW, 1)
+    layers.invalidate_settled()
+    layers.settled(screen, game.tiles_group, game.board.version)
+    assert layers.settled_rebuilds == 2
+    assert layers.settled_dirty is None
+    assert layers.rebuilds == 1
+
+
+def test_falling_tile_push_keeps_board_version():
+    game = engine.Engine(seed=SEED)
+    tile = game.spawn_tile(3)
+    tile.can_move_left = True
+    version = game.board.version
+    tile.move(pressed(constants.LEFT_KEY))
+    assert tile.rect.x == 2 * constants.tile_width
+    # слой лежащих коробок не пересобирается из-за падающей коробки
+    assert game.board.version == version
+
+
+def test_settled_tile_push_touches_board(settle):
+    game = engine.Engine(seed=SEED)
+    tile = settle(game, FLOOR_ROW, 3)
+    tile.can_move_right = True
+    version = game.board.version
+    tile.move(pressed(constants.RIGHT_KEY))
+    assert tile.rect.x == 4 * constants.tile_width
+    assert game.board.version > version
+
+
+def test_interpolator_draws_between_steps():
+    group = pygame.sprite.Group()
+    sprite = block((255, 0, 0), (0, 0), group)
+    still = block((0, 255, 0), (100, 100), group)
+    interpolator = render.Interpolator()
+    interpolator.capture([group])
+    sprite.rect.topleft = (10, 40)
+    moved = interpolator.apply([group], 0.25)
+    # сдвигаются только спрайты, изменившие положение за шаг
+    assert moved == [(sprite, (10, 40))]
+    assert sprite.rect.topleft == (2, 10)
+    assert still.rect.topleft == (100, 100)
+    interpolator.restore(moved)
+    assert sprite.rect.topleft == (10, 40)
+
+
+def test_interpolator_keeps_new_sprites_and_full_step():
+    group = pygame.sprite.Group()
+    sprite = block((255, 0, 0), (0, 0), group)
+    interpolator = render.Interpolator()
+    interpolator.capture([group])
+    sprite.rect.y = 40
+    # шаг пройден целиком - положение симуляции
+    assert interpolator.apply([group], 1.0) == []
+    assert sprite.rect.y == 40
+    # спрайта не было до шага - рисуется на месте
+    new = block((0, 0, 255), (50, 50), group)
+    moved = interpolator.apply([group], 0.5)
+    assert [item[0] for item in moved] == [sprite]
+    assert new.rect.topleft == (50, 50)
+    interpolator.restore(moved)
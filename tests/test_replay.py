@@ -0,0 +1,105 @@
+"""
+Запись и воспроизведение сессий (модуль replay)
+"""
+import os
+
+import pytest
+
+import constants
+import engine
+import replay
+
+SEED = 2021
+
+
+def test_keys_mask():
+    keys = replay.Keys(replay.LEFT | replay.UP)
+    assert keys[constants.LEFT_KEY]
+    assert keys[constants.UP_KEY]
+    assert not keys[constants.RIGHT_KEY]
+    # остальные клавиши в записи не хранятся
+    assert not keys[constants.LEFT_KEY + constants.RIGHT_KEY + 1]
+
+
+def test_recording_round_trip(tmp_path):
+    recording = replay.Recording(7, 3, 2500, 30)
+    recording.record_spawn(4)
+    recording.record_step(replay.Keys(replay.RIGHT))
+    recording.record_step(replay.Keys(0))
+    recording.record_spawn(2)
+    recording.score = 11
+    path = recording.save(str(tmp_path / 'nested' / 'session.rpl'))
+    loaded = replay.Recording.load(path)
+    assert (loaded.seed, loaded.start_v, loaded.bomb_interval, loaded.fps,
+            loaded.score) == (7, 3, 2500, 30, 11)
+    assert loaded.frames == bytearray([replay.RIGHT, 0])
+    assert loaded.spawns == [(0, 4), (2, 2)]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'session.rpl'
+    path.write_bytes(b'\0' * replay.HEADER.size)
+    with pytest.raises(ValueError):
+        replay.Recording.load(str(path))
+
+
+def snapshot(game: engine.Engine) -> tuple:
+    """
+    Состояние движка для сравнения записи и воспроизведения
+    :param game: engine.Engine
+    :return tuple:
+    """
+    return (tuple(game.player.rect), game.player.health, game.score,
+            game.level, [tuple(tile.rect) for tile in game.tiles_group],
+            list(game.board.row_fill))
+
+
+def test_play_repeats_engine_session(tmp_path):
+    game = engine.Engine(seed=SEED)
+    recording = replay.start(game)
+    for frame in range(300):
+        if frame % 20 == 0:
+            game.spawn_tile()
+        # все сочетания клавиш влево, вправо и прыжка
+        game.step(replay.Keys(frame // 7 % 8))
+    state = snapshot(game)
+    loaded = replay.Recording.load(
+        recording.save(str(tmp_path / 'session.rpl')))
+    played = engine.Engine()
+    assert replay.play(played, loaded) == 300
+    assert snapshot(played) == state
+
+
+def test_play_keeps_selected_difficulty():
+    recording = replay.Recording(SEED, constants.START_V + 5,
+                                 constants.BOMBS_INTERVALS + 1000,
+                                 constants.FPS)
+    recording.record_step(replay.Keys(0))
+    selected = (constants.START_V, constants.BOMBS_INTERVALS)
+    game = engine.Engine()
+    replay.play(game, recording)
+    assert game.tile_v == recording.start_v
+    assert game.spawner.curve.start == recording.bomb_interval
+    # следующая игра начинается с выбранной сложностью, а не с записанной
+    assert (constants.START_V, constants.BOMBS_INTERVALS) == selected
+    assert engine.Engine().tile_v == constants.START_V
+
+
+def test_restart_saves_recording(tmp_path, monkeypatch):
+    try:
+        import main
+    except SystemExit as message:
+        pytest.skip(f'main cannot be imported: {message}')
+    if main.game is None:
+        main.boot()
+    monkeypatch.setattr(constants, 'REPLAY_PATH',
+                        str(tmp_path / 'session.rpl'))
+    game = main.game
+    replay.start(game)
+    game.step(replay.Keys(replay.LEFT))
+    # рестарт с экрана паузы сохраняет прерванную сессию
+    game.reset_game()
+    assert game.recording is None
+    assert os.listdir(tmp_path) == ['session.rpl']
+    loaded = replay.Recording.load(str(tmp_path / 'session.rpl'))
+    assert loaded.frames == bytearray([replay.LEFT])
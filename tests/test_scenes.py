@@ -0,0 +1,77 @@
+"""
+Повторно используемые экраны меню (модуль scenes)
+"""
+import pygame
+import pygame_gui
+import pytest
+
+import constants
+import scenes
+
+
+pytestmark = pytest.mark.usefixtures('screen')
+
+
+def build_start(scene: scenes.Scene) -> None:
+    scene.widgets['play'] = pygame_gui.elements.UIButton(
+        relative_rect=pygame.Rect(10, 10, 100, 40), text='Играть',
+        manager=scene.manager)
+    scene.background = pygame.Surface(constants.SIZE)
+
+
+def test_scene_is_built_once():
+    registry = scenes.SceneRegistry()
+    registry.register('start', build_start)
+    first = registry.enter('start')
+    button = first['play']
+    second = registry.enter('start')
+    # повторное открытие использует те же менеджер и виджеты
+    assert second is first
+    assert second['play'] is button
+    assert registry.builds == 1
+    assert first.entries == 2
+
+
+def test_build_ahead_and_clear():
+    registry = scenes.SceneRegistry()
+    registry.register('start', build_start)
+    registry.register('pause', build_start)
+    registry.build()
+    assert registry.builds == 2
+    assert set(registry.scenes) == {'start', 'pause'}
+    scene = registry.enter('pause')
+    assert registry.builds == 2
+    registry.clear()
+    assert registry.enter('pause') is not scene
+    assert registry.builds == 3
+
+
+def test_register_replaces_built_scene():
+    registry = scenes.SceneRegistry()
+    registry.register('start', build_start)
+    scene = registry.enter('start')
+    registry.register('start', build_start)
+    assert registry.enter('start') is not scene
+    assert registry.builds == 2
+
+
+def test_enter_resets_dialogs_and_button_state():
+    registry = scenes.SceneRegistry()
+    registry.register('start', build_start)
+    scene = registry.enter('start')
+    button = scene['play']
+    dialog = pygame_gui.windows.UIConfirmationDialog(
+        rect=pygame.Rect(100, 100, 260, 200), manager=scene.manager,
+        action_long_desc='Удалить?')
+    button.hovered = True
+    button.held = True
+    button.drawable_shape.set_active_state('hovered')
+    scene.manager.update(0.01)
+    # экран закрыли с открытым диалогом и наведенной кнопкой
+    assert registry.enter('start') is scene
+    assert not dialog.alive()
+    assert scene.manager.get_window_stack().get_stack() == []
+    assert button.alive()
+    assert not button.hovered
+    assert not button.held
+    assert button.drawable_shape.active_state.state_id == 'normal'
@@ -0,0 +1,62 @@
+"""
+Расписание появления коробок (модуль spawner)
+"""
+import random
+
+import constants
+import engine
+import spawner
+
+SEED = 2021
+CURVE = spawner.SpawnCurve(start=2500, pitch=200, floor=800)
+
+
+def test_curve_interval_stops_at_floor():
+    assert CURVE.interval(0) == 2500
+    assert CURVE.interval(3) == 1900
+    assert CURVE.interval(9) == 800
+    assert CURVE.interval(1000) == CURVE.floor
+
+
+def test_period_is_counted_in_ticks():
+    schedule = spawner.SpawnScheduler(random.Random(SEED), CURVE, fps=30)
+    assert schedule.period() == 75
+    schedule.set_level(9)
+    assert schedule.period() == 24
+    # даже очень короткий интервал занимает хотя бы один тик
+    schedule.reset(spawner.SpawnCurve(10, 0, 10))
+    assert schedule.period() == 1
+
+
+def test_tiles_appear_on_schedule():
+    schedule = spawner.SpawnScheduler(random.Random(SEED), CURVE, fps=30,
+                                      lookahead=3)
+    upcoming = schedule.upcoming()
+    assert [ticks for ticks, _ in upcoming] == [75, 150, 225]
+    spawned = []
+    for _ in range(300):
+        col = schedule.tick()
+        if col is not None:
+            spawned.append((schedule.ticks, col))
+    # коробки появляются строго по тикам и в предсказанных столбцах
+    assert spawned[:3] == upcoming
+    assert [ticks for ticks, _ in spawned] == [75, 150, 225, 300]
+    assert all(1 <= col < constants.COLUMNS - 1 for _, col in spawned)
+    assert schedule.spawned == 4
+
+
+def test_set_level_restarts_countdown():
+    schedule = spawner.SpawnScheduler(random.Random(SEED), CURVE, fps=30)
+    for _ in range(50):
+        assert schedule.tick() is None
+    schedule.set_level(9)
+    assert schedule.upcoming()[0][0] == 24
+
+
+def test_engine_spawns_due_tiles():
+    game = engine.Engine(seed=SEED)
+    ticks, col = game.spawner.upcoming()[0]
+    tiles = [game.spawn_due() for _ in range(ticks)]
+    assert tiles[:-1] == [None] * (ticks - 1)
+    assert tiles[-1].col == col
+    assert tiles[-1] in game.falling_group
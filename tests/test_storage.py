@@ -0,0 +1,75 @@
+"""
+Поток записи в базу (модуль storage)
+"""
+import sqlite3
+
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    path = str(tmp_path / 'records.db')
+    with sqlite3.connect(path) as con:
+        con.execute('CREATE TABLE records(name TEXT, total INTEGER)')
+    con.close()
+    return path
+
+
+def totals(path: str) -> list:
+    con = sqlite3.connect(path)
+    try:
+        return [total for total, in
+                con.execute('SELECT total FROM records ORDER BY rowid')]
+    finally:
+        con.close()
+
+
+def test_writer_starts_on_first_submit(path):
+    writer = storage.Writer(path)
+    # без запросов поток не запускается, ждать нечего
+    writer.flush()
+    writer.close()
+    assert writer.commits == 0
+    writer.submit('INSERT INTO records VALUES(?, ?)', ('a', 1))
+    writer.flush()
+    assert totals(path) == [1]
+    writer.close()
+
+
+def test_writer_commits_in_batches(path):
+    writer = storage.Writer(path, maxsize=16, batch=4)
+    query = 'INSERT INTO records VALUES(?, ?)'
+    # запросы уже в очереди, когда поток запускается
+    for total in range(9):
+        writer.queue.put((query, ('bench', total)))
+    writer.submit(query, ('bench', 9))
+    writer.flush()
+    assert writer.writes == 10
+    assert writer.commits == 3
+    assert totals(path) == list(range(10))
+    writer.close()
+
+
+def test_writer_close_writes_queue(path):
+    writer = storage.Writer(path)
+    for total in range(5):
+        writer.submit('INSERT INTO records VALUES(?, ?)', ('a', total))
+    writer.close()
+    assert totals(path) == list(range(5))
+    # после остановки поток запускается заново
+    writer.submit('DELETE FROM records')
+    writer.close()
+    assert totals(path) == []
+
+
+def test_writer_survives_failed_batch(path, capsys):
+    writer = storage.Writer(path, batch=1)
+    writer.submit('INSERT INTO missing VALUES(?)', (1,))
+    writer.submit('INSERT INTO records VALUES(?, ?)', ('a', 2))
+    writer.flush()
+    assert writer.errors == 1
+    assert totals(path) == [2]
+    assert 'Cannot write to database' in capsys.readouterr().out
+    writer.close()
@@ -0,0 +1,49 @@
+"""
+Постоянный шаг симуляции (модуль timestep)
+"""
+import pytest
+
+import timestep
+
+
+def test_steps_accumulate_frame_time():
+    sim = timestep.FixedTimestep(rate=50, max_steps=5)
+    assert sim.step_ms == 20
+    # времени меньше шага: шаг не делается, время копится
+    assert sim.advance(15) == 0
+    assert sim.alpha == pytest.approx(0.75)
+    assert sim.advance(15) == 1
+    assert sim.accumulator == pytest.approx(10)
+    assert sim.alpha == pytest.approx(0.5)
+    assert sim.advance(50) == 3
+    assert sim.accumulator == pytest.approx(0)
+    assert sim.steps == 4
+
+
+def test_same_steps_at_any_frame_rate():
+    fast = timestep.FixedTimestep(rate=30)
+    slow = timestep.FixedTimestep(rate=30)
+    for _ in range(600):
+        fast.advance(1000 / 120)
+    for _ in range(50):
+        slow.advance(100)
+    # 5 секунд игры - 150 шагов при любой частоте отрисовки
+    assert fast.steps == slow.steps == 150
+
+
+def test_long_frame_is_capped():
+    sim = timestep.FixedTimestep(rate=50, max_steps=3)
+    assert sim.advance(210) == 3
+    # лишние шаги отброшены, остаток меньше шага сохраняется
+    assert sim.dropped == pytest.approx(140)
+    assert sim.accumulator == pytest.approx(10)
+    assert sim.advance(10) == 1
+
+
+def test_reset_drops_accumulated_time():
+    sim = timestep.FixedTimestep(rate=50)
+    sim.advance(30)
+    sim.reset()
+    assert sim.accumulator == 0
+    assert sim.alpha == 0
+    assert sim.advance(19) == 0
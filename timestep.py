@@ -0,0 +1,72 @@
+import constants
+
+# допуск сравнения накопленного времени с целым числом шагов
+EPSILON = 1e-9
+
+
+class FixedTimestep:
+    """
+    Накопитель времени для симуляции с постоянным шагом.
+        Прошедшее между кадрами время копится и расходуется целыми
+        шагами симуляции, остаток (alpha) используется для
+        промежуточной отрисовки. Если кадр затянулся, за кадр делается
+        не больше max_steps шагов, лишнее время отбрасывается
+        (игра замедляется, но не зависает, догоняя симуляцию).
+        Свойства:
+    accumulator: float - накопленное и еще не просимулированное время, мс
+    dropped: float - сколько времени отброшено, мс
+    max_steps: int - наибольшее число шагов за кадр
+    rate: int - шагов симуляции в секунду
+    step_ms: float - длительность шага, мс
+    steps: int - сколько шагов сделано
+        Методы:
+    advance - добавляет время кадра и возвращает число шагов
+    alpha - доля шага, прошедшая после последнего шага
+    reset - сбрасывает накопленное время (после экранов меню)
+    """
+
+    def __init__(self, rate: int = constants.FPS,
+                 max_steps: int = constants.SIM_MAX_STEPS) -> None:
+        """
+        :param rate: int
+        :param max_steps: int
+        """
+        self.rate: int = rate
+        self.step_ms: float = 1000 / rate
+        self.max_steps: int = max_steps
+        self.accumulator: float = 0.0
+        self.dropped: float = 0.0
+        self.steps: int = 0
+
+    def advance(self, elapsed: float) -> int:
+        """
+        Добавляет время кадра
+        :param elapsed: float - время с прошлого кадра, мс
+        :return int: сколько шагов симуляции сделать в этом кадре
+        """
+        self.accumulator += elapsed
+        # шаг не кратен миллисекунде (1000 / 30), поэтому ошибка округления
+        # не должна съедать шаг, накопленный ровно к этому кадру
+        steps = int(self.accumulator / self.step_ms + EPSILON)
+        self.accumulator = max(0.0, self.accumulator - steps * self.step_ms)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """
+        Доля шага, прошедшая после последнего шага симуляции
+        :return float: от 0 до 1
+        """
+        return min(1.0, self.accumulator / self.step_ms)
+
+    def reset(self) -> None:
+        """
+        Сбрасывает накопленное время, например, после экрана меню,
+            чтобы время, проведенное в меню, не симулировалось
+        :return None:
+        """
+        self.accumulator = 0.0